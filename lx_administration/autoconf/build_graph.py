@@ -0,0 +1,195 @@
+"""
+Build graph of the autoconf pipeline.
+
+Every target (merged vars of a host, the default.nix files rendered from
+them, ...) records its output files and the sha256 of each input file it was
+derived from. On the next run a target whose outputs exist and whose inputs
+hash the same is skipped.
+
+A directory can be an input too; it hashes its file listing (not the file
+contents), so adding or removing e.g. a group_vars file invalidates the
+targets that list the directory.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, PrivateAttr
+
+from .imports.inventory_manifest import InventoryManifest, scan_inventory
+
+BUILD_GRAPH_FILE = "build_graph.json"
+# bumped when targets gain inputs, so graphs recorded without them rebuild
+BUILD_GRAPH_VERSION = 2
+
+
+class BuildTarget(BaseModel):
+    outputs: List[str] = []
+    inputs: Dict[str, str] = {}
+
+
+class BuildGraph(BaseModel):
+    version: int = BUILD_GRAPH_VERSION
+    targets: Dict[str, BuildTarget] = {}
+
+    # hashes of this run, per input path
+    _hashes: Dict[str, str] = PrivateAttr(default_factory=dict)
+    # targets checked or recorded in this run, the others are dropped on save
+    _seen: set = PrivateAttr(default_factory=set)
+
+    @classmethod
+    def load(cls, file: Path) -> "BuildGraph":
+        file = Path(file)
+        if not file.exists():
+            return cls()
+        with open(file, "r") as f:
+            data = json.load(f)
+        if data.get("version", 1) != BUILD_GRAPH_VERSION:
+            return cls()
+        return cls.model_validate(data)
+
+    def save(self, file: Path):
+        file = Path(file)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        targets = {
+            key: target.model_dump()
+            for key, target in sorted(self.targets.items())
+            if key in self._seen
+        }
+        with open(file, "w") as f:
+            json.dump({"version": self.version, "targets": targets}, f, indent=2)
+            f.write("\n")
+
+    def hash_input(self, path: Path) -> str:
+        """sha256 of a file, of a directory listing, or "" if path is missing."""
+        path = Path(path)
+        key = path.as_posix()
+        if key in self._hashes:
+            return self._hashes[key]
+
+        if path.is_file():
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        elif path.is_dir():
+            listing = sorted(p.relative_to(path).as_posix() for p in path.rglob("*"))
+            digest = hashlib.sha256("\n".join(listing).encode()).hexdigest()
+        else:
+            digest = ""
+
+        self._hashes[key] = digest
+        return digest
+
+    def is_current(self, key: str) -> bool:
+        """True if the outputs of target key exist and its inputs did not change."""
+        self._seen.add(key)
+        target = self.targets.get(key)
+        if target is None:
+            return False
+
+        if not all(Path(output).exists() for output in target.outputs):
+            return False
+
+        return all(
+            self.hash_input(Path(path)) == digest
+            for path, digest in target.inputs.items()
+        )
+
+    def get_outputs(self, key: str) -> Optional[List[str]]:
+        target = self.targets.get(key)
+        return target.outputs if target else None
+
+    def record(self, key: str, outputs: Iterable[Path], inputs: Iterable[Path]):
+        """Record the outputs of target key and the current hashes of its inputs."""
+        self._seen.add(key)
+        self.targets[key] = BuildTarget(
+            outputs=[Path(output).as_posix() for output in outputs],
+            inputs={
+                Path(path).as_posix(): self.hash_input(path)
+                for path in sorted(set(inputs))
+            },
+        )
+
+
+def _facts_files_by_host(facts_dir: Path) -> Dict[str, List[Path]]:
+    """
+    cmdb files by hostname, which is the file name up to the first "." (see
+    load_all_host_facts).
+    """
+    by_host = {}
+    try:
+        with os.scandir(facts_dir) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return by_host
+    for entry in entries:
+        by_host.setdefault(entry.name.split(".")[0], []).append(Path(entry.path))
+    return by_host
+
+
+def _files_by_stem(files: List[Path]) -> Dict[str, List[Path]]:
+    by_stem = {}
+    for file in files:
+        by_stem.setdefault(file.stem, []).append(file)
+    return by_stem
+
+
+class InventoryInputs:
+    """
+    Input files of the merged vars of each host of an inventory directory.
+
+    Mirrors the files the AnsibleInventory loaders read: host_vars (without
+    host_vars/home), group_vars, roles/<role>/vars and role_vars/<role>/vars,
+    plus the host's facts in cmdb/ that ansible_etl adds to the inventory.
+    """
+
+    def __init__(self, ansible_root: Path, manifest: InventoryManifest = None):
+        self.ansible_root = ansible_root
+        self.inventory_dir = ansible_root / "inventory"
+        self.host_vars_dir = self.inventory_dir / "host_vars"
+        self.group_vars_dir = self.inventory_dir / "group_vars"
+        self.role_vars_dir = self.inventory_dir / "role_vars"
+        self.roles_dir = ansible_root / "roles"
+        self.facts_dir = ansible_root / "cmdb"
+
+        if manifest is None:
+            manifest = scan_inventory(self.inventory_dir)
+        self.manifest = manifest
+        self.host_vars_files = _files_by_stem(manifest.host_vars)
+        self.group_vars_files = _files_by_stem(manifest.group_vars)
+        self.facts_files = _facts_files_by_host(self.facts_dir)
+
+    def host_inputs(
+        self, hostname: str, group_names: List[str], role_names: List[str]
+    ) -> List[Path]:
+        inputs = [
+            self.inventory_dir / "hosts.ini",
+            self.host_vars_dir,
+            self.group_vars_dir,
+            self.role_vars_dir,
+            self.roles_dir,
+            self.facts_dir,
+        ]
+        inputs += self.host_vars_files.get(hostname, [])
+        inputs += self.facts_files.get(hostname, [])
+        for group_name in group_names:
+            inputs += self.group_vars_files.get(group_name, [])
+        for role_name in role_names:
+            inputs.append(self.roles_dir / role_name / "vars" / "main.yml")
+            inputs.append(self.role_vars_dir / role_name / "vars" / "main.yml")
+        return inputs
+
+    def home_host_inputs(self, hostname: str) -> List[Path]:
+        inputs = [
+            self.inventory_dir / "hosts.ini",
+            self.group_vars_dir,
+            self.host_vars_dir / "home" / f"{hostname}.yml",
+        ]
+        inputs += self.manifest.home_group_vars
+        return inputs
+
+
+def template_inputs(template_dir: Path) -> List[Path]:
+    """All files below a template directory."""
+    return [template_dir] + sorted(p for p in template_dir.rglob("*") if p.is_file())
@@ -1,8 +1,11 @@
 from .ansible_facts import load_all_host_facts
 from .ansible_inventory import load_inventory_hostfile
+from .hosts_ini import HostsIni, parse_hosts_ini
 
 
 __all__ = [
     "load_all_host_facts",
     "load_inventory_hostfile",
+    "HostsIni",
+    "parse_hosts_ini",
 ]
@@ -1,5 +1,6 @@
 import json
-from lx_administration.models import AnsibleFactsModel, BiosModel, NetworkInterfaceModel
+from lx_administration.models.ansible.facts import AnsibleFactsModel
+from lx_administration.models.hardware import BiosModel, NetworkInterfaceModel
 from pathlib import Path
 
 
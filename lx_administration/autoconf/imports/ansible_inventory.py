@@ -4,18 +4,21 @@ from lx_administration.logging import get_logger
 # import pprint
 import logging
 
-from lx_administration.models.ansible import AnsibleInventory
-
 
 def load_inventory_hostfile(
-    file: Path, logger=None, subnet: str = "172.16.255."
-) -> AnsibleInventory:
+    file: Path, logger=None, subnet: str = "172.16.255.", manifest=None
+) -> "AnsibleInventory":  # noqa: F821
     """Load ansiblie hosts.ini file"""
+    # imported here, lx_administration.models imports this package while loading
+    from lx_administration.models.ansible import AnsibleInventory
+
     if not logger:
         logger = get_logger(
             "load_inventory_hostfile", reset=True, log_level=logging.DEBUG
         )
 
-    inventory = AnsibleInventory.load_from_hosts_ini(file, subnet=subnet)
+    inventory = AnsibleInventory.load_from_hosts_ini(
+        file, subnet=subnet, manifest=manifest
+    )
 
     return inventory
@@ -0,0 +1,123 @@
+import os
+from pathlib import Path
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+def _subnet_key(address: str) -> str:
+    """'172.16.255.12', '172.16.255.0' or '172.16.255.' -> '172.16.255.' (/24)"""
+    return ".".join(address.rstrip(".").split(".")[:3]) + "."
+
+
+class HostsIni(BaseModel):
+    """
+    Parsed ansible hosts.ini: host <-> group membership and ansible_host IPs.
+
+    Sections, hosts and the groups of each host keep file order. All
+    lookups are dict lookups.
+    """
+
+    file: str = ""
+    # section names, in file order
+    groups: List[str] = []
+    # hostnames, in order of first appearance
+    hosts: List[str] = []
+    groups_by_host: Dict[str, List[str]] = {}
+    hosts_by_group: Dict[str, List[str]] = {}
+    ansible_hosts: Dict[str, str] = {}
+    # /24 prefix like "172.16.255." -> hostnames
+    hosts_by_subnet: Dict[str, List[str]] = {}
+
+    @classmethod
+    def parse(cls, file: Path) -> "HostsIni":
+        """
+        Parse hosts.ini in one pass.
+
+        Lines are `[group]` headers or `hostname [ansible_host=IP ...]`;
+        empty lines and lines starting with `#` or `;` are skipped.
+
+        Raises:
+            ValueError: If a host is listed before the first group header.
+        """
+        groups_by_host: Dict[str, List[str]] = {}
+        hosts_by_group: Dict[str, List[str]] = {}
+        ansible_hosts: Dict[str, str] = {}
+        group_name = None
+
+        with open(file, "r") as f:
+            for i, raw_line in enumerate(f, start=1):
+                line = raw_line.strip()
+
+                if not line or line.startswith(";") or line.startswith("#"):
+                    continue
+
+                if line.startswith("[") and line.endswith("]"):
+                    group_name = line[1:-1]
+                    hosts_by_group.setdefault(group_name, [])
+                    continue
+
+                if group_name is None:
+                    raise ValueError(f"{file}:{i}: host outside of a group: {line}")
+
+                hostname, *host_vars = line.split()
+                host_groups = groups_by_host.setdefault(hostname, [])
+                if group_name not in host_groups:
+                    host_groups.append(group_name)
+                    hosts_by_group[group_name].append(hostname)
+
+                for host_var in host_vars:
+                    if host_var.startswith("ansible_host="):
+                        ansible_hosts[hostname] = host_var.split("=", 1)[1]
+
+        hosts_by_subnet: Dict[str, List[str]] = {}
+        for hostname, address in ansible_hosts.items():
+            hosts_by_subnet.setdefault(_subnet_key(address), []).append(hostname)
+
+        return cls(
+            file=Path(file).as_posix(),
+            groups=list(hosts_by_group),
+            hosts=list(groups_by_host),
+            groups_by_host=groups_by_host,
+            hosts_by_group=hosts_by_group,
+            ansible_hosts=ansible_hosts,
+            hosts_by_subnet=hosts_by_subnet,
+        )
+
+    def groups_of_host(self, hostname: str) -> List[str]:
+        return self.groups_by_host.get(hostname, [])
+
+    def hosts_in_group(self, group_name: str) -> List[str]:
+        return self.hosts_by_group.get(group_name, [])
+
+    def hosts_in_subnet(self, subnet: str) -> List[str]:
+        """Hosts whose ansible_host is in the /24 subnet, e.g. "172.16.255."."""
+        return self.hosts_by_subnet.get(_subnet_key(subnet), [])
+
+    def get_ansible_host(self, hostname: str) -> Optional[str]:
+        return self.ansible_hosts.get(hostname)
+
+
+_parsed: Dict[str, Tuple[int, int, HostsIni]] = {}
+_parsed_lock = threading.Lock()
+
+
+def parse_hosts_ini(file: Path) -> HostsIni:
+    """
+    HostsIni.parse, memoized per file until its mtime or size change, so the
+    inventory and the home vars loaders share one parse. Treat the result as
+    read-only.
+    """
+    key = os.path.abspath(file)
+    stat = os.stat(key)
+
+    with _parsed_lock:
+        entry = _parsed.get(key)
+    if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+        return entry[2]
+
+    hosts_ini = HostsIni.parse(file)
+    with _parsed_lock:
+        _parsed[key] = (stat.st_mtime_ns, stat.st_size, hosts_ini)
+    return hosts_ini
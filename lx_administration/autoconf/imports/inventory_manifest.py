@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class InventoryManifest(BaseModel):
+    """
+    The vars files of an ansible inventory directory, by kind.
+
+    Built by one os.scandir pass (scan_inventory) and shared by the loaders
+    in autoconf.imports.utils and the AnsibleInventory load_* methods.
+    All lists are sorted by path.
+    """
+
+    inventory_dir: Path
+    # host_vars/**/*.yml, without host_vars/home
+    host_vars: List[Path] = []
+    # host_vars/home/*.yml
+    home_host_vars: List[Path] = []
+    # group_vars/*
+    group_vars: List[Path] = []
+    # group_vars/group_home_*.yml
+    home_group_vars: List[Path] = []
+    # role_vars/<role>/vars/main.yml, by role
+    role_vars: Dict[str, Path] = {}
+
+
+def _scan_files(directory: Path) -> List[os.DirEntry]:
+    try:
+        with os.scandir(directory) as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def _scan_yml_recursive(directory: Path, skip_dirs=()) -> List[Path]:
+    files = []
+    for entry in _scan_files(directory):
+        if entry.is_dir():
+            if entry.name not in skip_dirs:
+                files.extend(_scan_yml_recursive(Path(entry.path)))
+        elif entry.is_file() and entry.name.endswith(".yml"):
+            files.append(Path(entry.path))
+    return files
+
+
+def scan_inventory(ansible_inventory_dir: Path) -> InventoryManifest:
+    """Collect the vars files below ansible_inventory_dir in a single pass."""
+    host_vars_dir = ansible_inventory_dir / "host_vars"
+    group_vars_dir = ansible_inventory_dir / "group_vars"
+    role_vars_dir = ansible_inventory_dir / "role_vars"
+
+    host_vars = _scan_yml_recursive(host_vars_dir, skip_dirs=("home",))
+    home_host_vars = [
+        Path(entry.path)
+        for entry in _scan_files(host_vars_dir / "home")
+        if entry.is_file() and entry.name.endswith(".yml")
+    ]
+
+    group_vars = []
+    home_group_vars = []
+    for entry in _scan_files(group_vars_dir):
+        if not entry.is_file():
+            continue
+        group_vars.append(Path(entry.path))
+        if entry.name.startswith("group_home_") and entry.name.endswith(".yml"):
+            home_group_vars.append(Path(entry.path))
+
+    role_vars = {}
+    for entry in _scan_files(role_vars_dir):
+        vars_file = Path(entry.path) / "vars" / "main.yml"
+        if entry.is_dir() and vars_file.is_file():
+            role_vars[entry.name] = vars_file
+
+    return InventoryManifest(
+        inventory_dir=ansible_inventory_dir,
+        host_vars=host_vars,
+        home_host_vars=home_host_vars,
+        group_vars=group_vars,
+        home_group_vars=home_group_vars,
+        role_vars=role_vars,
+    )
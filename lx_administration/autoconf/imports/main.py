@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 import yaml
 from . import (
     load_all_host_facts,
@@ -8,6 +9,7 @@ import warnings
 from lx_administration.autoconf.imports.utils import is_home_only_host
 
 from lx_administration.logging import log_heading, get_logger
+from lx_administration.logging.spans import span
 from lx_administration.models import MergedHostVars
 from lx_administration.yaml.dump import dump_yaml, ansible_lint, format_yaml
 
@@ -15,8 +17,26 @@ from lx_administration.autoconf.imports.utils import _load_config
 from lx_administration.models import MergedHostVars
 from lx_administration.yaml.dump import dump_yaml, format_yaml
 from lx_administration.autoconf.imports.utils import is_home_only_host
+from lx_administration.autoconf.build_graph import BuildGraph, InventoryInputs
+from lx_administration.autoconf.imports.inventory_manifest import (
+    InventoryManifest,
+    scan_inventory,
+)
 
-def home_etl(ansible_root: Path, autoconf_out: Path, logger=None):
+@span("home_etl")
+def home_etl(
+    ansible_root: Path,
+    autoconf_out: Path,
+    logger=None,
+    build_graph: Optional[BuildGraph] = None,
+    manifest: Optional[InventoryManifest] = None,
+):
+    """
+    Write home_merged_vars/<host>.yml for every host in host_vars/home.
+
+    With a build_graph, hosts whose inputs did not change are skipped.
+    manifest is the scan of ansible_root/inventory, scanned if not given.
+    """
     if not logger:
         logger = get_logger("home_etl", reset=True)
 
@@ -27,17 +47,34 @@ def home_etl(ansible_root: Path, autoconf_out: Path, logger=None):
     #print("here is the issue in : lx_administration/autoconf/imports/main.py -res")
     # Load the fully merged vars per host
     ansible_inventory_dir = ansible_root / "inventory"
-    home_host_vars = load_home_host_vars(ansible_inventory_dir)
+    if manifest is None:
+        manifest = scan_inventory(ansible_inventory_dir)
+    home_host_vars = load_home_host_vars(ansible_inventory_dir, manifest=manifest)
+    inventory_inputs = InventoryInputs(ansible_root, manifest=manifest)
 
 
     for hostname, merged_dict in home_host_vars.items():
-        try:
-            merged_vars = MergedHostVars(**merged_dict)
-        except Exception as e:
-            logger.warning(f"Invalid home vars for {hostname}: {e}")
+        key = f"home_merged_vars/{hostname}"
+        home_merged_vars_file = home_merged_vars_out / f"{hostname}.yml"
+        if build_graph is not None and build_graph.is_current(key):
+            logger.info(f"Up to date: {home_merged_vars_file}")
             continue
 
-        dump_yaml(merged_dict, home_merged_vars_out / f"{hostname}.yml", format_yaml)
+        with span("home_merged_vars", host=hostname):
+            try:
+                merged_vars = MergedHostVars(**merged_dict)
+            except Exception as e:
+                logger.warning(f"Invalid home vars for {hostname}: {e}")
+                continue
+
+            dump_yaml(merged_dict, home_merged_vars_file, format_yaml)
+
+            if build_graph is not None:
+                build_graph.record(
+                    key,
+                    [home_merged_vars_file],
+                    inventory_inputs.home_host_inputs(hostname),
+                )
 
     logger.info("Finished home_etl.")
 
@@ -45,7 +82,22 @@ def home_etl(ansible_root: Path, autoconf_out: Path, logger=None):
 
 from lx_administration.autoconf.imports.utils import load_home_host_vars
 
-def ansible_etl(ansible_root: Path, autoconf_out: Path, subnet: str, logger=None):
+@span("ansible_etl")
+def ansible_etl(
+    ansible_root: Path,
+    autoconf_out: Path,
+    subnet: str,
+    logger=None,
+    build_graph: Optional[BuildGraph] = None,
+    manifest: Optional[InventoryManifest] = None,
+):
+    """
+    Load the inventory and write merged_vars/<host>.yml for every host.
+
+    With a build_graph, hosts whose inputs did not change are not merged
+    again. manifest is the scan of ansible_root/inventory, scanned if not
+    given.
+    """
     #print("ansible_etl")
     if not logger:
         logger = get_logger("ansible_etl", reset=True)
@@ -74,9 +126,14 @@ def ansible_etl(ansible_root: Path, autoconf_out: Path, subnet: str, logger=None
         return
 
     # Load inventory
-    inventory = load_inventory_hostfile(inventory_file)
+    if manifest is None:
+        manifest = scan_inventory(ansible_inventory_dir)
 
-    host_facts = load_all_host_facts(host_facts_dir)
+    with span("load_inventory"):
+        inventory = load_inventory_hostfile(inventory_file, manifest=manifest)
+
+    with span("load_host_facts"):
+        host_facts = load_all_host_facts(host_facts_dir)
 
     for host, facts in host_facts.items():
         inventory.hostname_update_ansible_facts(host, facts)
@@ -109,27 +166,52 @@ def ansible_etl(ansible_root: Path, autoconf_out: Path, subnet: str, logger=None
     merged_vars_out = autoconf_out / "merged_vars"
     merged_vars_out.mkdir(exist_ok=True)
     inventory.validate()
+    inventory_inputs = InventoryInputs(ansible_root, manifest=manifest)
 
     #This skips the export and YAML write for home-only hosts like c-01.
     home_only_hosts = set() # home system issue
+    stale_hostnames = []
     for host in inventory.all:
         if is_home_only_host(host): # home system issue
             logger.info(f"Skipping system config for home-only host: {host.hostname}") # home system issue
             home_only_hosts.add(host.hostname) # home system issue
             continue # home system issue
-        merged_vars = inventory.export_merged_host_vars(host.hostname)
 
-        try:
-            MergedHostVars(**merged_vars)
-        except Exception as e:
-            warnings.warn(f"Invalid merged_vars for {host.hostname}: {e}")
+        key = f"merged_vars/{host.hostname}"
+        if build_graph is not None and build_graph.is_current(key):
+            logger.info(f"Up to date: {merged_vars_out / f'{host.hostname}.yml'}")
+            continue
 
-        dump_yaml(
-            merged_vars,
-            merged_vars_out / f"{host.hostname}.yml",
-            format_yaml,
-            # ansible_lint,
-        )
+        stale_hostnames.append(host.hostname)
+
+    # group and role vars are merged once per distinct closure
+    with span("fleet_merged_vars", hosts=len(stale_hostnames)):
+        fleet_merged_vars = inventory.export_fleet_merged_vars(stale_hostnames)
+
+    for hostname, merged_vars in fleet_merged_vars.items():
+        key = f"merged_vars/{hostname}"
+        merged_vars_file = merged_vars_out / f"{hostname}.yml"
+
+        with span("merged_vars", host=hostname):
+            try:
+                MergedHostVars(**merged_vars)
+            except Exception as e:
+                warnings.warn(f"Invalid merged_vars for {hostname}: {e}")
+
+            dump_yaml(
+                merged_vars,
+                merged_vars_file,
+                format_yaml,
+                # ansible_lint,
+            )
+
+            if build_graph is not None:
+                group_names, role_names = inventory.resolve_host_closure(hostname)
+                build_graph.record(
+                    key,
+                    [merged_vars_file],
+                    inventory_inputs.host_inputs(hostname, group_names, role_names),
+                )
 
     #     host_configs[host] = merged_config
     inventory.save_to_file(autoconf_out / "inventory.yml")
@@ -138,7 +220,12 @@ def ansible_etl(ansible_root: Path, autoconf_out: Path, subnet: str, logger=None
 
 
 def pipe(
-    ansible_root: Path, autoconf_out: Path, subnet: str = "172.16.255.0", logger=None
+    ansible_root: Path,
+    autoconf_out: Path,
+    subnet: str = "172.16.255.0",
+    logger=None,
+    build_graph: Optional[BuildGraph] = None,
+    manifest: Optional[InventoryManifest] = None,
 ):
     #print("pipe function in main.py")
     if not logger:
@@ -151,7 +238,14 @@ def pipe(
     if not autoconf_out.exists():
         autoconf_out.mkdir(exist_ok=True)
 
-    inventory, home_only_hosts = ansible_etl(ansible_root, autoconf_out, subnet, logger=logger)
+    inventory, home_only_hosts = ansible_etl(
+        ansible_root,
+        autoconf_out,
+        subnet,
+        logger=logger,
+        build_graph=build_graph,
+        manifest=manifest,
+    )
     return inventory,home_only_hosts
 
     """# home system issue
@@ -1,30 +1,60 @@
+from functools import cached_property
+import os
 from pathlib import Path
-from typing import List, Dict, Union
-import yaml
+from typing import Iterable, List, Dict, Optional, Union
+
+from lx_administration.models.lazy import LazyItem
+from lx_administration.yaml.loader import load_yaml, load_yaml_files
+from .hosts_ini import parse_hosts_ini
+from .inventory_manifest import InventoryManifest, scan_inventory
 
 
 # Base Load Config Utils
 def _load_config(config_path: Path) -> dict:
     """Load a YAML configuration file from a given path"""
-    with open(config_path, "r") as f:
-        data = yaml.safe_load(f)
+    data = load_yaml(config_path)
 
     if not data:
         data = {}
 
     return data
 
-def deep_update(dict1, dict2):
-    dict1 = dict1.copy()
-    dict2 = dict2.copy()
 
-    for key, value in dict2.items():
-        if isinstance(value, dict) and key in dict1 and isinstance(dict1[key], dict):
-            dict1[key] = deep_update(dict1[key], value)
-        else:
-            dict1[key] = value
+def _load_configs(config_paths: Iterable[Path]) -> List[dict]:
+    """Load several YAML configuration files in parallel (see yaml.loader)"""
+    return [data or {} for data in load_yaml_files(config_paths)]
+
+def deep_merge(*layers: dict) -> dict:
+    """
+    Merge dicts recursively, later layers taking precedence.
+
+    Same result as chaining deep_update over the layers, but in one
+    traversal and without copying: only the returned dict and nested dicts
+    that had to be merged are new, every other value (including nested
+    dicts present in a single layer) is shared with the layers. Do not
+    mutate nested values of the result in place.
+    """
+    values: Dict[str, list] = {}
+    for layer in layers:
+        for key, value in layer.items():
+            stack = values.get(key)
+            if (
+                stack is not None
+                and isinstance(value, dict)
+                and isinstance(stack[-1], dict)
+            ):
+                stack.append(value)
+            else:
+                values[key] = [value]
+
+    return {
+        key: stack[0] if len(stack) == 1 else deep_merge(*stack)
+        for key, stack in values.items()
+    }
 
-    return dict1
+
+def deep_update(dict1, dict2):
+    return deep_merge(dict1, dict2)
 
 # Load Roles Utils
 def _role_load_files(role: str, ansible_roles_dir: Path) -> List[Path]:
@@ -36,11 +66,14 @@ def _role_load_files(role: str, ansible_roles_dir: Path) -> List[Path]:
             files.append(file)
     return files
 
-def _role_load_vars(role: str, ansible_roles_dir: Path, name: str) -> dict:
+def _role_load_vars(
+    role: str, ansible_roles_dir: Path, name: str, role_vars: dict = None
+) -> dict:
     """Load vars from Ansible role directory, also replaces the role name prefix with'role_'"""
-    vars_dir = ansible_roles_dir / role / "vars"
-    vars_file = vars_dir / "main.yml"
-    role_vars = _load_config(vars_file)
+    if role_vars is None:
+        vars_dir = ansible_roles_dir / role / "vars"
+        vars_file = vars_dir / "main.yml"
+        role_vars = _load_config(vars_file)
 
     # remove prefix f"{name}_" from vars
     # Role Vars in ansible files should have the prefix of the role name
@@ -50,102 +83,135 @@ def _role_load_vars(role: str, ansible_roles_dir: Path, name: str) -> dict:
 
     return role_vars
 
-def load_roles(ansible_roles_dir: Path) -> Dict[str, Union[List, Dict]]:
-    """Load roles from Ansible roles directory"""
-    _roles = []
-    for role in ansible_roles_dir.glob("*"):
-        if role.is_dir():
-            _roles.append(role.name)
-
-    roles = {
-        role: {
-            "files": _role_load_files(role, ansible_roles_dir),
-            "vars": _role_load_vars(role, ansible_roles_dir, role),
-        }
-        for role in _roles
-    }
+class RoleDescriptor(LazyItem):
+    """
+    A role of the ansible roles directory. Its files and vars are read on
+    first access and then kept, so each role is read at most once per
+    inventory load.
+    """
+
+    def __init__(self, name: str, ansible_roles_dir: Path):
+        self.name = name
+        self.ansible_roles_dir = ansible_roles_dir
+
+    @cached_property
+    def files(self) -> List[Path]:
+        return _role_load_files(self.name, self.ansible_roles_dir)
 
-    return roles
+    @cached_property
+    def vars(self) -> dict:
+        return _role_load_vars(self.name, self.ansible_roles_dir, self.name)
 
-def load_roles_vars(ansible_roles_dir: Path) -> Dict[str, Dict]:
+    def load(self) -> dict:
+        return {"name": self.name, "files": self.files, "vars": self.vars}
+
+
+def load_roles(ansible_roles_dir: Path) -> Dict[str, RoleDescriptor]:
+    """Load roles from Ansible roles directory, without reading their files"""
+    try:
+        with os.scandir(ansible_roles_dir) as it:
+            names = sorted(entry.name for entry in it if entry.is_dir())
+    except FileNotFoundError:
+        names = []
+
+    return {name: RoleDescriptor(name, ansible_roles_dir) for name in names}
+
+def load_roles_vars(
+    ansible_roles_dir: Path, manifest: Optional[InventoryManifest] = None
+) -> Dict[str, Dict]:
     """Load roles from Ansible roles directory"""
-    roles = load_roles(ansible_roles_dir)
-    roles_vars = {}
-    for role, role_data in roles.items():
-        roles_vars[role] = role_data["vars"]
+    if manifest is not None:
+        # role_vars of the inventory manifest, ansible_roles_dir is role_vars
+        roles = list(manifest.role_vars)
+        _roles_vars = _load_configs(manifest.role_vars.values())
+        return {
+            role: _role_load_vars(role, ansible_roles_dir, role, role_vars)
+            for role, role_vars in zip(roles, _roles_vars)
+        }
+
+    roles = list(load_roles(ansible_roles_dir))
+    _roles_vars = _load_configs(
+        ansible_roles_dir / role / "vars" / "main.yml" for role in roles
+    )
+    return {
+        role: _role_load_vars(role, ansible_roles_dir, role, role_vars)
+        for role, role_vars in zip(roles, _roles_vars)
+    }
 
-    return roles_vars
+def load_group_vars(
+    group_vars_dir: Path, manifest: Optional[InventoryManifest] = None
+) -> Dict[str, str]:
+    if manifest is None:
+        manifest = scan_inventory(group_vars_dir.parent)
 
-def load_group_vars(group_vars_dir: Path) -> Dict[str, str]:
     group_vars = {}
-    for group_vars_file in group_vars_dir.glob("*"):
-        _group_vars = _load_config(group_vars_file)
+    group_vars_files = manifest.group_vars
+    for group_vars_file, _group_vars in zip(
+        group_vars_files, _load_configs(group_vars_files)
+    ):
         group_name = group_vars_file.stem
         group_vars[group_name] = _group_vars
 
     return group_vars
 
-def load_host_vars(host_vars_dir: Path) -> Dict[str, dict]:
+def load_host_vars(
+    host_vars_dir: Path, manifest: Optional[InventoryManifest] = None
+) -> Dict[str, dict]:
+    if manifest is None:
+        manifest = scan_inventory(host_vars_dir.parent)
+
     host_vars: Dict[str, dict] = {}
 
-    for host_vars_file in host_vars_dir.rglob("*.yml"):
-        if host_vars_file.is_file():
-            _host_vars = _load_config(host_vars_file)
-            host_name = host_vars_file.stem
+    #  Skip home-specific files for system (not in manifest.host_vars)
+    host_vars_files = manifest.host_vars
 
-            #  Skip home-specific files for system
-            if "host_vars/home" in str(host_vars_file):
-                continue
+    for host_vars_file, _host_vars in zip(
+        host_vars_files, _load_configs(host_vars_files)
+    ):
+        host_name = host_vars_file.stem
 
-            if host_name in host_vars:
-                host_vars[host_name] = deep_update(host_vars[host_name], _host_vars)
-            else:
-                host_vars[host_name] = _host_vars
+        if host_name in host_vars:
+            host_vars[host_name] = deep_update(host_vars[host_name], _host_vars)
+        else:
+            host_vars[host_name] = _host_vars
 
     return host_vars
 
-def load_home_host_vars(ansible_inventory_dir: Path) -> Dict[str, dict]:
-    from lx_administration.autoconf.imports.utils import _load_config, deep_update
-    import pprint
+def load_home_host_vars(
+    ansible_inventory_dir: Path, manifest: Optional[InventoryManifest] = None
+) -> Dict[str, dict]:
+    from lx_administration.autoconf.imports.utils import _load_configs, deep_merge
 
-    group_vars_dir = ansible_inventory_dir / "group_vars"
-    host_vars_dir = ansible_inventory_dir / "host_vars" / "home"
+    if manifest is None:
+        manifest = scan_inventory(ansible_inventory_dir)
 
     inventory_file = ansible_inventory_dir / "hosts.ini"
 
-    import configparser
-    parser = configparser.ConfigParser(allow_no_value=True, delimiters=('=',))
-    parser.optionxform = str  # preserve case
-    parser.read(inventory_file)
-
-    group_membership = {}
-    for section in parser.sections():
-        for hostname in parser.options(section):
-            group_membership.setdefault(hostname.strip(), set()).add(section.strip())
+    hosts_ini = parse_hosts_ini(inventory_file)
 
     # Step 1: load group vars into separate dicts
     all_group_vars = {}
-    for file in group_vars_dir.glob("group_home_*.yml"):
+    group_files = manifest.home_group_vars
+    for file, group_data in zip(group_files, _load_configs(group_files)):
         group_name = file.stem  # like group_home_editors
-        group_data = _load_config(file)
         all_group_vars[group_name] = group_data
 
     home_host_vars: Dict[str, dict] = {}
 
-    for host_file in host_vars_dir.glob("*.yml"):
+    host_files = manifest.home_host_vars
+    for host_file, host_data in zip(host_files, _load_configs(host_files)):
         host_name = host_file.stem
-        host_data = _load_config(host_file)
 
-        merged = {}
+        layers = []
 
         # Step 2: only merge in group vars where host is actually in that group
         for group_key, group_dict in all_group_vars.items():
-            #if host_name in group_membership.get(group_key, set()):
-            if group_key in group_membership.get(host_name, set()):
-                merged = deep_update(merged, group_dict)
+            if group_key in hosts_ini.groups_of_host(host_name):
+                layers.append(group_dict)
 
         # Step 3: merge in host-specific values
-        merged = deep_update(merged, host_data)
+        layers.append(host_data)
+        merged = deep_merge(*layers)
 
         home_host_vars[host_name] = merged
 
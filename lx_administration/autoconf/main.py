@@ -1,19 +1,40 @@
 from pathlib import Path
+from typing import Optional
 
 from .imports.main import pipe as etl_pipe
 from .nix.main import pipe as nix_pipe
 from lx_administration.logging import get_logger, log_heading
 from .imports.main import pipe as etl_pipe, home_etl
+from .build_graph import BUILD_GRAPH_FILE, BuildGraph
+from .imports.inventory_manifest import scan_inventory
 
 def pipe(
     ansible_root: Path,
     autoconf_out: Path,
     nix_out: Path,
     conf_parent: Path = Path("./conf"),
+    jobs: Optional[int] = 1,
+    full: bool = False,
 ):
+    """
+    Run the ETL and render the nix configs.
+
+    Outputs whose inputs did not change since the last run (see
+    autoconf/build_graph.json) are not rebuilt; full=True rebuilds
+    everything.
+    """
     logger = get_logger("autoconf_main_pipe", reset=True)
+    build_graph_file = autoconf_out / BUILD_GRAPH_FILE
+    build_graph = BuildGraph() if full else BuildGraph.load(build_graph_file)
+    manifest = scan_inventory(ansible_root / "inventory")
+
     _inventory ,home_only_hosts = etl_pipe(
-        ansible_root, autoconf_out, subnet="172.16.255.0", logger=logger , 
+        ansible_root,
+        autoconf_out,
+        subnet="172.16.255.0",
+        logger=logger,
+        build_graph=build_graph,
+        manifest=manifest,
     )
     """ for # home system issue,added home_only_hosts
      _inventory  = etl_pipe(
@@ -21,12 +42,23 @@ def pipe(
     )
     """
       # NEW: Home ETL
-    home_etl(ansible_root, autoconf_out, logger)
+    home_etl(
+        ansible_root,
+        autoconf_out,
+        logger,
+        build_graph=build_graph,
+        manifest=manifest,
+    )
 
-    nix_pipe(
+    summary = nix_pipe(
         autoconf_out=autoconf_out,
         nix_template_dir=conf_parent / "nix-templates",
         nix_out=nix_out,
         logger=logger,
         home_only_hosts=home_only_hosts, # home system issue,added home_only_hosts
+        jobs=jobs,
+        build_graph=build_graph,
     )
+
+    build_graph.save(build_graph_file)
+    return summary
@@ -1,28 +1,36 @@
+from functools import partial
 from pathlib import Path
+from typing import List, Optional
 from lx_administration.logging import get_logger, log_heading
+from lx_administration.logging.spans import span
 from lx_administration.models import MergedHostVars
 from .home_template_renderer import render_home_nix_template as render_nix_template
 from .utils import write_nix_file
+from .parallel import run_per_host_incremental
 
 
 
-def home_pipe(autoconf_out: Path, nix_template_dir: Path, nix_out: Path, logger=None):
-    if not logger:
-        logger = get_logger("home_pipe", reset=True)
-
-    merged_vars_dir = autoconf_out
+def _render_home_host(
+    merged_vars_file: Path, logger, nix_template_dir: Path, nix_out: Path
+):
+    """
+    Render the home configs of every user of one home_merged_vars file.
 
-    for merged_vars_file in merged_vars_dir.glob("*.yml"):
-        hostname = merged_vars_file.stem
-        merged_vars = MergedHostVars.load_home_from_file(merged_vars_file)
-        platform = merged_vars.get_host_platform()
-        users = merged_vars.system_users or ["admin"] #this needs to ensure
+    Returns:
+        List[Tuple[str, str]]: (path relative to nix_out, write status).
+    """
+    hostname = merged_vars_file.stem
+    merged_vars = MergedHostVars.load_home_from_file(merged_vars_file)
+    platform = merged_vars.get_host_platform()
+    users = merged_vars.system_users or ["admin"] #this needs to ensure
 
-        # Move logging after the merged_vars_file is loaded
-        logger.info(f"Loading merged vars from: {merged_vars_file}")
-        logger.info(f"Platform = {platform}")
+    # Move logging after the merged_vars_file is loaded
+    logger.info(f"Loading merged vars from: {merged_vars_file}")
+    logger.info(f"Platform = {platform}")
 
-        for user in users:
+    results = []
+    for user in users:
+        with span("generate_home_nix", host=hostname, user=user):
             #home_config = merged_vars.prepare_home_config()
             home_config = merged_vars.prepare_home_config(username=user)
 
@@ -35,13 +43,16 @@ def home_pipe(autoconf_out: Path, nix_template_dir: Path, nix_out: Path, logger=
                 home_config,
             )
 
-            output_path = nix_out / "homes" / platform / f"{user}@{hostname}" / "default.nix"
+            output_path = (
+                nix_out / "homes" / platform / f"{user}@{hostname}" / "default.nix"
+            )
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
             #print(f"[WRITE] ---------- Writing home config for {user}@{hostname}")
             #print(f"[WRITE] ---------- Output path: {output_path}")
 
-            write_nix_file(rendered, output_path, logger)
+            status = write_nix_file(rendered, output_path, logger)
+            results.append((output_path.relative_to(nix_out).as_posix(), status))
 
             #print("forth")
 
@@ -52,3 +63,33 @@ def home_pipe(autoconf_out: Path, nix_template_dir: Path, nix_out: Path, logger=
                 logger.info("File exists after write!")
             else:
                 logger.warning("File write may have failed!")
+
+    return results
+
+
+def home_pipe(
+    autoconf_out: Path,
+    nix_template_dir: Path,
+    nix_out: Path,
+    logger=None,
+    jobs: Optional[int] = 1,
+    build_graph=None,
+) -> List:
+    if not logger:
+        logger = get_logger("home_pipe", reset=True)
+
+    merged_vars_dir = autoconf_out
+
+    render_home_host = partial(
+        _render_home_host, nix_template_dir=nix_template_dir, nix_out=nix_out
+    )
+    return run_per_host_incremental(
+        render_home_host,
+        sorted(merged_vars_dir.glob("*.yml")),
+        logger,
+        jobs,
+        build_graph,
+        key_prefix="homes",
+        template_dir=nix_template_dir / "homes",
+        nix_out=nix_out,
+    )
@@ -1,13 +1,24 @@
 # my_nix_manager/main.py
+from functools import partial
 import os
 from pathlib import Path
+from typing import Optional
 from .template_renderer import render_nix_template
 from .utils import load_config, write_nix_file
 from lx_administration.logging import get_logger, log_heading
+from lx_administration.logging.spans import span
 
 from lx_administration.models import MergedHostVars
 
-from .home import home_pipe 
+from .home import home_pipe
+from .manifest import (
+    NIX_MANIFEST_FILE,
+    load_manifest,
+    remove_stale_files,
+    save_manifest,
+    summarize,
+)
+from .parallel import run_per_host_incremental
 
 def get_template_dir_for_host(
     merged_vars: MergedHostVars, nix_template_dir: Path
@@ -26,7 +37,8 @@ def generate_default_nix(
     nix_template_dir: Path = Path("./conf/nix-templates"),
     out_dir=Path("./tmp"),
     logger=None,
-) -> None:
+) -> str:
+    """Render default.nix for a host; returns the write status."""
     if not logger:
         logger = get_logger("generate_default_nix", reset=True)
 
@@ -46,53 +58,116 @@ def generate_default_nix(
 
     os.makedirs(default_nix_path.parent, exist_ok=True)
 
-    write_nix_file(default_nix, default_nix_path, logger=logger)
+    return write_nix_file(default_nix, default_nix_path, logger=logger)
+
+
+def _render_host(merged_vars_file: Path, logger, nix_template_dir: Path, nix_out: Path):
+    """
+    Render default.nix for the host of one merged_vars file.
+
+    Returns:
+        List[Tuple[str, str]]: (path relative to nix_out, write status).
+    """
+    hostname = merged_vars_file.stem
+    merged_vars = MergedHostVars.load_from_file(merged_vars_file)
+
+    try:
+        _host_platform = merged_vars.get_host_platform()
+
+    except Exception as e:
+        logger.warning(
+            f"Failed to get host platform for {hostname}: {e}; Skipping empty host"
+        )
+        return []
+
+    with span("generate_default_nix", host=hostname):
+        status = generate_default_nix(
+            hostname,
+            merged_vars,
+            nix_template_dir=nix_template_dir,
+            out_dir=nix_out,
+            logger=logger,
+        )
 
+    rel_path = Path("systems") / _host_platform / hostname / "default.nix"
+    return [(rel_path.as_posix(), status)]
 
+
+@span("nix_pipe")
 def pipe(
     autoconf_out: Path,
     nix_template_dir=Path("./conf"),
     nix_out: Path = Path("."),
     logger=None,
-    home_only_hosts: set[str] = set() #home system issue,added home_only_hosts
+    home_only_hosts: set[str] = set(), #home system issue,added home_only_hosts
+    jobs: Optional[int] = 1,
+    build_graph=None,
 ):
+    """
+    Render system and home nix configs for all hosts.
+
+    Files whose content did not change are not rewritten. Files generated by
+    the previous run but not by this one are removed (see manifest.py).
+
+    Args:
+        jobs (int, optional): Hosts rendered in parallel on a process pool;
+            None uses all CPUs. Output and log order do not depend on it.
+        build_graph (BuildGraph, optional): Skip hosts whose merged vars and
+            templates did not change since their files were rendered.
+
+    Returns:
+        Dict[str, List[str]]: Generated paths (relative to nix_out) by
+            status: written, unchanged and removed.
+    """
     # load config data
     if not logger:
         logger = get_logger("autoconf_nix_main_pipe", reset=True)
 
     merged_vars_dir = autoconf_out / "merged_vars"
 
-    for merged_vars_file in merged_vars_dir.glob("*.yml"):
+    merged_vars_files = []
+    for merged_vars_file in sorted(merged_vars_dir.glob("*.yml")):
         hostname = merged_vars_file.stem
         if hostname in home_only_hosts:#home system issue,
             logger.info(f"[SKIP SYSTEM CONFIG] {hostname} is home-only")#home system issue,to skips generating systems/x86_64-linux/<host>/default.nix.
             continue#home system issue,
+        merged_vars_files.append(merged_vars_file)
 
-        merged_vars = MergedHostVars.load_from_file(merged_vars_file)
-
-        try:
-            _host_platform = merged_vars.get_host_platform()
-            export = True
-
-        except Exception as e:
-            logger.warning(
-                f"Failed to get host platform for {hostname}: {e}; Skipping empty host"
-            )
-            export = False
-
-        if export:
-            generate_default_nix(
-                hostname,
-                merged_vars,
-                nix_template_dir=nix_template_dir,
-                out_dir=nix_out,
-                logger=logger,
-            )
-
-    home_pipe(
-    autoconf_out / "home_merged_vars", 
-    nix_template_dir,
-    nix_out,
-    logger=logger,
-)
+    render_host = partial(
+        _render_host, nix_template_dir=nix_template_dir, nix_out=nix_out
+    )
+    results = run_per_host_incremental(
+        render_host,
+        merged_vars_files,
+        logger,
+        jobs,
+        build_graph,
+        key_prefix="systems",
+        template_dir=nix_template_dir / "systems",
+        nix_out=nix_out,
+    )
+
+    with span("home_pipe"):
+        results += home_pipe(
+            autoconf_out / "home_merged_vars",
+            nix_template_dir,
+            nix_out,
+            logger=logger,
+            jobs=jobs,
+            build_graph=build_graph,
+        )
+
+    results = [result for host_results in results for result in host_results]
+    generated = [rel_path for rel_path, _status in results]
+
+    manifest_file = autoconf_out / NIX_MANIFEST_FILE
+    removed = remove_stale_files(
+        load_manifest(manifest_file), generated, nix_out, logger
+    )
+    save_manifest(manifest_file, generated)
 
+    summary = summarize(results, removed)
+    log_heading(logger, "Nix files")
+    for status, paths in summary.items():
+        logger.info(f"{status}: {len(paths)}")
+    return summary
@@ -0,0 +1,56 @@
+"""
+Manifest of the nix files generated by the last run of the nix pipe.
+
+Files listed in the previous manifest but not generated by the current run
+(e.g. a host removed from the inventory) are stale and get removed. Files
+never generated by the pipe are never touched.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .utils import REMOVED, UNCHANGED, WRITTEN
+
+NIX_MANIFEST_FILE = "nix_manifest.json"
+
+
+def load_manifest(manifest_file: Path) -> List[str]:
+    if not manifest_file.exists():
+        return []
+    with open(manifest_file, "r") as f:
+        return json.load(f).get("files", [])
+
+
+def save_manifest(manifest_file: Path, files: Iterable[str]):
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_file, "w") as f:
+        json.dump({"files": sorted(files)}, f, indent=2)
+        f.write("\n")
+
+
+def remove_stale_files(
+    previous: Iterable[str], current: Iterable[str], nix_out: Path, logger
+) -> List[str]:
+    """Delete files of the previous run not generated by this one."""
+    current = set(current)
+    removed = []
+    for rel_path in sorted(set(previous) - current):
+        path = nix_out / rel_path
+        if path.is_file():
+            path.unlink()
+            if not any(path.parent.iterdir()):
+                path.parent.rmdir()
+            logger.info(f"Removed stale file: {path}")
+            removed.append(rel_path)
+    return removed
+
+
+def summarize(
+    results: Iterable[Tuple[str, str]], removed: List[str]
+) -> Dict[str, List[str]]:
+    """Group (relative path, status) results by status."""
+    summary = {WRITTEN: [], UNCHANGED: [], REMOVED: list(removed)}
+    for rel_path, status in results:
+        summary[status].append(rel_path)
+    return summary
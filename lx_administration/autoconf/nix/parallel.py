@@ -0,0 +1,124 @@
+"""
+Per-host fan-out for the nix render pipes.
+
+With more than one job, hosts are rendered on a process pool. Each worker
+buffers the records logged to the pipe logger and returns them; the parent
+replays them in input order, so the pipe log reads the same as a serial run.
+
+run_per_host_incremental additionally skips hosts whose outputs are current
+in the autoconf build graph.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class _RecordBuffer(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records: List[Tuple[int, str]] = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def _run_buffered(
+    func: Callable, item, logger_name: str
+) -> Tuple[Any, List[Tuple[int, str]]]:
+    # Standalone logger, not registered with logging.getLogger
+    logger = logging.Logger(logger_name, level=logging.DEBUG)
+    buffer = _RecordBuffer()
+    logger.addHandler(buffer)
+
+    result = func(item, logger)
+    return result, buffer.records
+
+
+def run_per_host(
+    func: Callable, items: List, logger: logging.Logger, jobs: Optional[int] = 1
+) -> List:
+    """
+    Call func(item, logger) for every item, on `jobs` worker processes.
+
+    Args:
+        func (Callable): Module-level (picklable) function rendering one host.
+        items (List): Per-host arguments, in the order output should be logged.
+        logger (logging.Logger): The pipe logger records are replayed to.
+        jobs (int, optional): Worker processes; 1 runs in-process, None uses
+            all CPUs. Defaults to 1.
+
+    Returns:
+        List: The (picklable) return values of func, in input order.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(items)))
+
+    if jobs == 1:
+        return [func(item, logger) for item in items]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for result, records in executor.map(
+            _run_buffered, repeat(func), items, repeat(logger.name)
+        ):
+            for level, message in records:
+                logger.log(level, message)
+            results.append(result)
+    return results
+
+
+def run_per_host_incremental(
+    func: Callable,
+    items: List[Path],
+    logger: logging.Logger,
+    jobs: Optional[int],
+    build_graph,
+    key_prefix: str,
+    template_dir: Path,
+    nix_out: Path,
+) -> List[List[Tuple[str, str]]]:
+    """
+    run_per_host for render functions returning (path, status) lists, skipping
+    merged vars files whose target in build_graph is current.
+
+    Targets are keyed f"{nix_out}/{key_prefix}/{file.stem}"; their inputs are
+    the merged vars file and every file below template_dir. Skipped targets
+    report their recorded outputs as unchanged.
+    """
+    from lx_administration.autoconf.build_graph import template_inputs
+    from .utils import UNCHANGED
+
+    if build_graph is None:
+        return run_per_host(func, items, logger, jobs=jobs)
+
+    def target_key(item: Path) -> str:
+        return f"{(nix_out / key_prefix).as_posix()}/{item.stem}"
+
+    results = {}
+    stale = []
+    for item in items:
+        key = target_key(item)
+        if build_graph.is_current(key):
+            logger.info(f"Up to date: {key}")
+            results[item] = [
+                (Path(output).relative_to(nix_out).as_posix(), UNCHANGED)
+                for output in build_graph.get_outputs(key)
+            ]
+        else:
+            stale.append(item)
+
+    templates = template_inputs(template_dir)
+    for item, host_results in zip(stale, run_per_host(func, stale, logger, jobs=jobs)):
+        results[item] = host_results
+        build_graph.record(
+            target_key(item),
+            [nix_out / rel_path for rel_path, _status in host_results],
+            [item] + templates,
+        )
+
+    return [results[item] for item in items]
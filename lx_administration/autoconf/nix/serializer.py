@@ -0,0 +1,62 @@
+"""
+Serialize Python values (as loaded from merged_vars YAML) to Nix.
+
+    to_nix(["gc-01.intern"])         -> ["gc-01.intern"]
+    to_nix({"enable": True})         -> { enable = true; }
+    to_nix_expr("pkgs.linux_6_12")   -> pkgs.linux_6_12
+
+`to_nix` treats strings as data and quotes them. `to_nix_expr` passes a
+top-level string through unchanged, for config values that already are Nix
+expressions (`true`, `"/etc/secrets/..."`, `pkgs.x`); strings nested in
+lists or attrsets are still quoted.
+"""
+
+import re
+from typing import Any
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_'-]*$")
+
+
+def _nix_string(value: str) -> str:
+    value = value.strip('"')
+    value = value.replace("\\", "\\\\").replace('"', '\\"').replace("${", "\\${")
+    return '"' + value + '"'
+
+
+def _nix_key(key) -> str:
+    key = str(key)
+    if _IDENTIFIER.match(key):
+        return key
+    return _nix_string(key)
+
+
+def to_nix(value: Any) -> str:
+    """
+    Serialize a value to a Nix expression.
+
+    Strings are quoted (surrounding double quotes are stripped first, so
+    already quoted values are not quoted twice), bools become true/false,
+    None becomes null, lists and tuples become Nix lists and dicts become
+    attrsets, recursively.
+    """
+    if isinstance(value, str):
+        return _nix_string(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return "[" + " ".join(to_nix(item) for item in value) + "]"
+    if isinstance(value, dict):
+        if not value:
+            return "{ }"
+        attrs = " ".join(f"{_nix_key(k)} = {to_nix(v)};" for k, v in value.items())
+        return "{ " + attrs + " }"
+    return str(value)
+
+
+def to_nix_expr(value: Any) -> str:
+    """Like to_nix, but a top-level string is emitted as is."""
+    if isinstance(value, str):
+        return value
+    return to_nix(value)
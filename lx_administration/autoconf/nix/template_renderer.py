@@ -1,10 +1,15 @@
-from jinja2 import Environment, FileSystemLoader
 from typing import Dict, Any
 
+from lx_administration.utils.jinja import get_environment
+
+from .serializer import to_nix, to_nix_expr
+
 
 def render_nix_template(
     template_dir: str, template_name: str, config_data: Dict[str, Any]
 ) -> str:
-    env = Environment(loader=FileSystemLoader(template_dir))
+    env = get_environment(
+        template_dir, filters={"to_nix": to_nix, "nix_expr": to_nix_expr}
+    )
     template = env.get_template(template_name)
     return template.render(**config_data)
@@ -1,20 +1,46 @@
 # my_nix_manager/config_loader.py
+import hashlib
+from pathlib import Path
 import yaml
 from typing import Any, Dict
-from .nix_file_fixes import fix_yml_list_in_nix_file
 from lx_administration.logging import get_logger, log_heading
 
+WRITTEN = "written"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+
 
 def load_config(config_path: str) -> Dict[str, Any]:
     with open(config_path, "r") as f:
         return yaml.safe_load(f)
 
 
-def write_nix_file(content, filepath, logger=None):
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_nix_file(content, filepath, logger=None) -> str:
+    """
+    Write a rendered nix file, unless the file already has this content.
+
+    Unchanged files are not touched, so their mtime stays as is.
+
+    Returns:
+        str: WRITTEN or UNCHANGED.
+    """
     if not logger:
         logger = get_logger("write_nix_file", reset=True)
 
-    with open(filepath, "w") as f:
-        f.write(content)
+    filepath = Path(filepath)
+    data = content.encode()
+
+    if filepath.is_file() and content_hash(filepath.read_bytes()) == content_hash(
+        data
+    ):
+        logger.info(f"Unchanged: {filepath}")
+        return UNCHANGED
 
-    fix_yml_list_in_nix_file(filepath, logger=logger)
+    with open(filepath, "wb") as f:
+        f.write(data)
+    logger.info(f"Written: {filepath}")
+    return WRITTEN
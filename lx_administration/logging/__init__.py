@@ -1,5 +1,25 @@
+import atexit
 import logging
+import logging.handlers
+import os
 from pathlib import Path
+import queue
+import threading
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# (logger name, log file) -> file handler, so every file is opened once
+_file_handlers: Dict[Tuple[str, Path], logging.FileHandler] = {}
+# logger name -> its file handlers; tuples are replaced, never mutated, so
+# the queue listener can read them without taking the lock
+_handlers_by_name: Dict[str, Tuple[logging.FileHandler, ...]] = {}
+_registry_lock = threading.Lock()
+
+# Shared queue used when async logging is enabled
+_queue: Optional[queue.Queue] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_queue_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def log_heading(logger, heading):
@@ -9,27 +29,144 @@ def log_heading(logger, heading):
     logger.info("-" * 80)
 
 
+class _DispatchHandler(logging.Handler):
+    """Route records from the shared queue to their logger's file handlers."""
+
+    def handle(self, record):
+        for handler in _handlers_by_name.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+def _truncate(handler: logging.FileHandler):
+    """Empty a handler's log file in place, without reopening it."""
+    handler.acquire()
+    try:
+        if handler.stream is None:
+            open(handler.baseFilename, "w").close()
+        else:
+            handler.flush()
+            handler.stream.seek(0)
+            handler.stream.truncate()
+    finally:
+        handler.release()
+
+
 def get_logger(
     name, log_dir: Path = Path("./autoconf/logs"), reset=False, log_level=logging.INFO
 ):
-    log_dir.mkdir(exist_ok=True)
+    """
+    Get a logger writing to `<log_dir>/<name>.log`.
 
-    logfile = log_dir / f"{name}.log"
+    The file handler is attached once per (name, file); repeated calls return
+    the same logger without adding handlers. With reset=True the log file is
+    emptied in place.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
 
-    if reset:
-        open(logfile, "w").close()
+    logfile = (log_dir / f"{name}.log").resolve()
 
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
 
-    file_handler = logging.FileHandler(logfile)
-    file_handler.setLevel(log_level)
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    pending = _queue
+    if reset and pending is not None:
+        # Records queued before the reset belong to the old file content
+        pending.join()
+
+    with _registry_lock:
+        file_handler = _file_handlers.get((name, logfile))
+        if file_handler:
+            file_handler.setLevel(log_level)
+            if reset:
+                _truncate(file_handler)
+            return logger
+
+        if reset:
+            open(logfile, "w").close()
+
+        file_handler = logging.FileHandler(logfile)
+        file_handler.setLevel(log_level)
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler.setFormatter(formatter)
+        _file_handlers[(name, logfile)] = file_handler
+        _handlers_by_name[name] = (*_handlers_by_name.get(name, ()), file_handler)
+
+        if _queue_handler is not None:
+            if _queue_handler not in logger.handlers:
+                logger.addHandler(_queue_handler)
+        else:
+            logger.addHandler(file_handler)
 
     # (Removed console handler)
 
     return logger
+
+
+def enable_async_logging():
+    """
+    Move log file I/O to a background thread.
+
+    Loggers created by get_logger hand their records to a shared queue; a
+    QueueListener thread writes them to the registered file handlers.
+    """
+    global _queue, _queue_handler, _queue_listener
+
+    with _registry_lock:
+        if _queue_handler is not None:
+            return
+
+        _queue = queue.Queue()
+        _queue_handler = logging.handlers.QueueHandler(_queue)
+        _queue_listener = logging.handlers.QueueListener(_queue, _DispatchHandler())
+
+        for (logger_name, _logfile), handler in _file_handlers.items():
+            logger = logging.getLogger(logger_name)
+            logger.removeHandler(handler)
+            if _queue_handler not in logger.handlers:
+                logger.addHandler(_queue_handler)
+
+        _queue_listener.start()
+
+
+def disable_async_logging():
+    """Flush the queue, stop the listener and write log files synchronously again."""
+    global _queue, _queue_handler, _queue_listener
+
+    with _registry_lock:
+        if _queue_handler is None:
+            return
+
+        # stop() drains pending records before returning
+        _queue_listener.stop()
+
+        for (logger_name, _logfile), handler in _file_handlers.items():
+            logger = logging.getLogger(logger_name)
+            logger.removeHandler(_queue_handler)
+            logger.addHandler(handler)
+
+        _queue, _queue_handler, _queue_listener = None, None, None
+
+
+def _detach_queue_after_fork():
+    """Forked children have no listener thread; log to the files directly."""
+    global _queue, _queue_handler, _queue_listener, _registry_lock
+
+    _registry_lock = threading.Lock()
+    if _queue_handler is None:
+        return
+
+    for (logger_name, _logfile), handler in _file_handlers.items():
+        logger = logging.getLogger(logger_name)
+        logger.removeHandler(_queue_handler)
+        logger.addHandler(handler)
+
+    _queue, _queue_handler, _queue_listener = None, None, None
+
+
+atexit.register(disable_async_logging)
+os.register_at_fork(after_in_child=_detach_queue_after_fork)
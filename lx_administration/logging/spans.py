@@ -0,0 +1,93 @@
+"""
+Structured timing spans written as JSON lines.
+
+Spans are a no-op until `enable_span_sink` is called. Each finished span
+writes one line:
+
+    {"phase": "merged_vars", "host": "gc-06", "parent": "ansible_etl",
+     "start": 1700000000.0, "end": 1700000000.2, "duration": 0.2,
+     "status": "ok"}
+
+`span` works both as context manager and as decorator.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Optional
+
+_sink = None
+_sink_lock = threading.Lock()
+_current_phase: ContextVar[Optional[str]] = ContextVar("span_phase", default=None)
+
+
+def enable_span_sink(path: Path):
+    """Append spans to the JSON-lines file at path."""
+    global _sink
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = open(path, "a", buffering=1)
+
+
+def disable_span_sink():
+    global _sink
+
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = None
+
+
+def _write(record: dict):
+    line = json.dumps(record, default=str) + "\n"
+    with _sink_lock:
+        if _sink is not None:
+            _sink.write(line)
+
+
+@contextmanager
+def span(phase: str, host: Optional[str] = None, **fields):
+    """
+    Time a pipeline phase.
+
+    Args:
+        phase (str): Name of the phase, e.g. "ansible_etl".
+        host (str, optional): Host the phase works on.
+        **fields: Extra JSON-serializable fields for the record.
+    """
+    if _sink is None:
+        yield
+        return
+
+    parent = _current_phase.get()
+    token = _current_phase.set(phase)
+    start = time.time()
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - t0
+        _current_phase.reset(token)
+        _write(
+            {
+                "phase": phase,
+                "host": host,
+                "parent": parent,
+                "start": start,
+                "end": start + duration,
+                "duration": duration,
+                "status": status,
+                **fields,
+            }
+        )
@@ -1,11 +1,14 @@
-from pydantic import BaseModel
-from typing import Dict, List, Optional, Union
+from copy import copy
+from pydantic import BaseModel, PrivateAttr
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 from lx_administration.logging import log_heading, get_logger  #
 from .facts import AnsibleFactsModel
 from lx_administration.models.ansible.merged_host_vars import MergedHostVars
 from lx_administration.yaml import dump_yaml, ansible_lint, format_yaml
 from ..config import DEFAULT_USERS
+from ..indexing import NameIndex, TrackedModel
+from ..lazy import LazyModelList
 
 
 def _is_extra_user_attribute(attribute_name: str) -> bool:
@@ -34,7 +37,7 @@ def _get_extra_user_names(vars: Dict[str, Union[str, Dict, List[str]]]) -> List[
     return extra_user_names
 
 
-class AnsibleInventoryHost(BaseModel):
+class AnsibleInventoryHost(TrackedModel):
     ansible_host: Optional[str] = ""
     hostname: Optional[str]
     ansible_group_names: List[str] = []
@@ -141,12 +144,31 @@ class AnsibleInventoryRole(BaseModel):
         self.extra_user_names = self.get_extra_user_names()
 
 
-class AnsibleInventory(BaseModel):
+class AnsibleInventory(TrackedModel):
     groups: List[AnsibleInventoryGroup] = []
     roles: List[AnsibleInventoryRole] = []
     all: List[AnsibleInventoryHost] = []
     file: str = "./ansible/inventory/hosts.ini"
 
+    # exact-match name indexes, rebuilt when a list is replaced or mutated
+    _hosts_by_name: NameIndex = PrivateAttr(
+        default_factory=lambda: NameIndex("hostname")
+    )
+    _hosts_by_ansible_host: NameIndex = PrivateAttr(
+        default_factory=lambda: NameIndex("ansible_host")
+    )
+    _groups_by_name: NameIndex = PrivateAttr(default_factory=lambda: NameIndex("name"))
+    _roles_by_name: NameIndex = PrivateAttr(default_factory=lambda: NameIndex("name"))
+    # group/role closures, see resolve_host_closure
+    _closures: Optional[Dict[Tuple[str, str], List[Tuple[str, str]]]] = PrivateAttr(
+        default=None
+    )
+    # merged group + role vars per (group_names, role_names) closure, see
+    # export_merged_host_vars; dropped whenever the closures are rebuilt
+    _merged_layers: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Dict] = PrivateAttr(
+        default_factory=dict
+    )
+
     @classmethod
     def from_file(cls, filepath: str):
         import yaml
@@ -163,7 +185,21 @@ class AnsibleInventory(BaseModel):
 
     # Create Class Method to load inventory from file
     @classmethod
-    def load_from_hosts_ini(cls, file: Path, subnet: str = "172.16.255."):
+    def load_from_hosts_ini(
+        cls, file: Path, subnet: str = "172.16.255.", manifest=None
+    ):
+        """
+        Load hosts.ini and the vars files of its inventory directory.
+
+        Args:
+            manifest (InventoryManifest, optional): Vars files of the
+                inventory directory; scanned if not given.
+        """
+        from lx_administration.autoconf.imports.hosts_ini import parse_hosts_ini
+        from lx_administration.autoconf.imports.inventory_manifest import (
+            scan_inventory,
+        )
+
         logger = get_logger("AnsibleInventory-load_from_file", reset=True)
         file = file.resolve()
         ansible_inventory_dir = file.parent
@@ -172,42 +208,36 @@ class AnsibleInventory(BaseModel):
         assert subnet.endswith(".") and len(subnet.split(".")) == 4
         # Initialize temporary dict to read inventory
         inventory = cls(file=file.as_posix())
-        inventory.load_host_vars(ansible_inventory_dir=ansible_inventory_dir)
-        with open(file, "r") as f:
-            for raw_line in f:
-                line = raw_line.strip()
-
-                if not line or line.startswith(";") or line.startswith("#"):
-                    continue
-
-                if line.startswith("[") and line.endswith("]"):
-                    group_name = line[1:-1]
-                    inventory.add_group_by_name(group_name)
-                    continue
-
-                parts = line.split()
+        if manifest is None:
+            manifest = scan_inventory(ansible_inventory_dir)
+        inventory.load_host_vars(
+            ansible_inventory_dir=ansible_inventory_dir, manifest=manifest
+        )
+        hosts_ini = parse_hosts_ini(file)
+        for group_name in hosts_ini.groups:
+            inventory.add_group_by_name(group_name)
 
-                if parts:
-                    hostname = parts[0]
-                    assert hostname, "hostname is required"
-                    inventory.add_host_by_name(hostname)
+        for hostname in hosts_ini.hosts:
+            inventory.add_host_by_name(hostname)
 
-                    inventory.add_group_to_host(hostname, group_name)
+            for group_name in hosts_ini.groups_of_host(hostname):
+                inventory.add_group_to_host(hostname, group_name)
 
-                    if len(parts) > 1 and parts[1].startswith("ansible_host="):
-                        ip = parts[1].split("=")[1]
-                        inventory.set_ansible_host_ip(hostname, ip)
+            ip = hosts_ini.get_ansible_host(hostname)
+            if ip:
+                inventory.set_ansible_host_ip(hostname, ip)
 
         inventory.load_roles(ansible_root_dir)
-        inventory.load_group_vars(ansible_inventory_dir)
-        inventory.load_role_vars(ansible_inventory_dir)
+        inventory.load_group_vars(ansible_inventory_dir, manifest=manifest)
+        inventory.load_role_vars(ansible_inventory_dir, manifest=manifest)
 
         log_heading(logger, f"Loaded Inventory from {file}")
 
         return inventory
 
     def get_role_names(self):
-        return [role.name for role in self.roles]
+        # list.__iter__ keeps unread roles (RoleDescriptor) unread
+        return [role.name for role in list.__iter__(self.roles)]
 
     def get_hostnames(self):
         return [host.hostname for host in self.all]
@@ -236,73 +266,184 @@ class AnsibleInventory(BaseModel):
 
         return extra_user_names
 
-    def export_merged_host_vars(self, hostname: str) -> Dict:
-        from lx_administration.autoconf.imports.utils import deep_update
+    def _closure_edges(self, node: Tuple[str, str]) -> List[Tuple[str, str]]:
+        kind, name = node
+        if kind == "group":
+            _vars = self.get_group_by_name(name).vars
+        else:
+            _vars = self.get_role_by_name(name).vars or {}
 
-        # self.update_hosts_group_vars()
+        edges = [("group", _) for _ in _vars.get("ansible_groups", [])]
+        edges += [("role", _) for _ in _vars.get("ansible_roles", [])]
+        return edges
+
+    def _build_closures(self) -> Dict[Tuple[str, str], List[Tuple[str, str]]]:
+        """
+        Transitive ansible_groups / ansible_roles closure of every group and
+        of every role a host reaches, as ("group" | "role", name) nodes.
+        Roles no host reaches are left unread.
+
+        Strongly connected components (Tarjan) are emitted dependencies
+        first, so each closure is topologically ordered: a node comes after
+        everything it pulls in. Members of a cycle share one closure.
+        """
+        logger = get_logger("AnsibleInventory-build_closures", reset=True)
+
+        start_nodes = [("group", _.name) for _ in self.groups]
+        for host in self.all:
+            start_nodes += [("group", _) for _ in host.ansible_group_names]
+            start_nodes += [("role", _) for _ in host.ansible_role_names]
+
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        edges = {}
+        closures = {}
+
+        def strongconnect(node):
+            index[node] = lowlink[node] = len(index)
+            stack.append(node)
+            on_stack.add(node)
+            edges[node] = self._closure_edges(node)
+
+            for succ in edges[node]:
+                if succ not in index:
+                    strongconnect(succ)
+                    lowlink[node] = min(lowlink[node], lowlink[succ])
+                elif succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+
+            if lowlink[node] != index[node]:
+                return
+
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == node:
+                    break
+            component.reverse()
+
+            if len(component) > 1 or node in edges[node]:
+                logger.warning(f"Cyclic ansible_groups/ansible_roles: {component}")
+
+            closure = []
+            for member in component:
+                for succ in edges[member]:
+                    if succ not in component:
+                        closure.extend(closures[succ])
+            closure.extend(component)
+            closure = list(dict.fromkeys(closure))
+
+            for member in component:
+                closures[member] = closure
+
+        for node in start_nodes:
+            if node not in index:
+                strongconnect(node)
+
+        return closures
+
+    def _get_closures(self) -> Dict[Tuple[str, str], List[Tuple[str, str]]]:
+        if self._closures is None:
+            self._merged_layers = {}
+            closures = self._build_closures()
+            # building may add missing groups, which resets the cache
+            self._closures = closures
+        return self._closures
+
+    def resolve_host_closure(self, hostname: str) -> Tuple[List[str], List[str]]:
+        """
+        Resolve the groups and roles a host inherits from, following the
+        ansible_groups / ansible_roles vars of its groups and roles.
+
+        Closures are computed once for all groups and roles and cached until
+        groups or roles are added or (re)loaded. Within each list, a group or
+        role comes after the ones it pulls in, so it takes precedence when
+        vars are merged in order.
+
+        Returns:
+            Tuple[List[str], List[str]]: (group_names, role_names)
+        """
         host = self.get_host_by_name(hostname)
 
         assert host, f"No host found with name {hostname}"
 
-        group_names = host.ansible_group_names
-        role_names = host.ansible_role_names
-
-        _check_again = True
-
-        while _check_again:
-            _check_again = False
-            new_group_names = []
-            new_role_names = []
-            for group_name in group_names:
-                group = self.get_group_by_name(group_name)
-                _new_group_names = group.vars.get("ansible_groups", [])
-                _new_role_names = group.vars.get("ansible_roles", [])
-
-                for group_name in _new_group_names:
-                    if group_name not in group_names:
-                        new_group_names.append(group_name)
-                        _check_again = True
-
-                for role_name in _new_role_names:
-                    if role_name not in role_names:
-                        new_role_names.append(role_name)
-                        _check_again = True
-
-            for role_name in role_names:
-                role = self.get_role_by_name(role_name)
-                _new_group_names = role.vars.get("ansible_groups", [])
-                _new_role_names = role.vars.get("ansible_roles", [])
-
-                for group_name in _new_group_names:
-                    if group_name not in group_names:
-                        new_group_names.append(group_name)
-                        _check_again = True
-
-                for role_name in _new_role_names:
-                    if role_name not in role_names:
-                        new_role_names.append(role_name)
-                        _check_again = True
-
-            if _check_again:
-                group_names = group_names + new_group_names
-                group_names = list(set(group_names))
-                role_names = role_names + new_role_names
-                role_names = list(set(role_names))
-
-        group_vars = {}
-        for group_name in group_names:
-            group = self.get_group_by_name(group_name)
-            group_vars = deep_update(group_vars, group.vars)
+        closures = self._get_closures()
+        start_nodes = [("group", _) for _ in host.ansible_group_names]
+        start_nodes += [("role", _) for _ in host.ansible_role_names]
 
-        role_vars = {}
-        for role_name in role_names:
-            role = self.get_role_by_name(role_name)
-            role_vars = deep_update(role_vars, role.vars)
+        nodes = {}
+        for node in start_nodes:
+            if node not in closures:
+                # host groups/roles changed after the closures were built
+                self._closures = None
+                closures = self._get_closures()
+            nodes.update(dict.fromkeys(closures[node]))
+
+        group_names = [name for kind, name in nodes if kind == "group"]
+        role_names = [name for kind, name in nodes if kind == "role"]
+        return group_names, role_names
+
+    def export_merged_host_vars(self, hostname: str) -> Dict:
+        """
+        Group, role and host vars of a host, deep merged.
+
+        The cached group and role layers are shared by all hosts with the same
+        closure, so the top two levels of the result are copied: callers can
+        set or append to a host's vars (and their dict and list values)
+        without affecting other hosts.
+        """
+        from lx_administration.autoconf.imports.utils import deep_merge
+
+        # self.update_hosts_group_vars()
+        host = self.get_host_by_name(hostname)
 
-        merged_vars = deep_update(group_vars, role_vars)
-        merged_vars = deep_update(merged_vars, host.vars)
+        assert host, f"No host found with name {hostname}"
 
-        return merged_vars
+        group_names, role_names = self.resolve_host_closure(hostname)
+        layers = self._get_merged_layers(group_names, role_names)
+
+        merged_vars = deep_merge(layers, host.vars)
+
+        return {
+            key: copy(value) if isinstance(value, (dict, list)) else value
+            for key, value in merged_vars.items()
+        }
+
+    def _get_merged_layers(self, group_names: List[str], role_names: List[str]) -> Dict:
+        """
+        Group vars then role vars, deep merged. Hosts with the same closure
+        share one result (read-only), which is built once per closure.
+        """
+        from lx_administration.autoconf.imports.utils import deep_merge
+
+        key = (tuple(group_names), tuple(role_names))
+        merged = self._merged_layers.get(key)
+        if merged is None:
+            layers = [self.get_group_by_name(_).vars for _ in group_names]
+            layers += [self.get_role_by_name(_).vars for _ in role_names]
+            merged = deep_merge(*layers)
+            self._merged_layers[key] = merged
+        return merged
+
+    def export_fleet_merged_vars(
+        self, hostnames: Optional[List[str]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Merged vars of several hosts (all hosts by default), by hostname.
+
+        Group and role layers are merged once per distinct closure; only the
+        host vars are merged per host.
+        """
+        if hostnames is None:
+            hostnames = self.get_hostnames()
+
+        return {
+            hostname: self.export_merged_host_vars(hostname) for hostname in hostnames
+        }
 
     def validate(self):
         for group in self.groups:
@@ -327,106 +468,111 @@ class AnsibleInventory(BaseModel):
         self.get_host_by_name(hostname).update_facts(facts)
 
     def group_name_exists(self, group_name: str):
-        return any(group_name in group.name for group in self.groups)
+        return self._groups_by_name.get_position(self.groups, group_name) is not None
 
     def role_name_exists(self, role_name: str):
-        return any(role_name in role.name for role in self.roles)
+        return self._roles_by_name.get_position(self.roles, role_name) is not None
 
     def get_group_by_name(self, group_name: str, logger=None):
-        if not logger:
-            logger = get_logger("AnsibleInventory-get_group_by_name", reset=True)
-        group = [_ for _ in self.groups if _.name == group_name]
+        group = self._groups_by_name.get_all(self.groups, group_name)
         if group:
             assert len(group) == 1, f"Multiple groups found with name {group_name}"
             return group[0]
 
         else:
+            if not logger:
+                logger = get_logger("AnsibleInventory-get_group_by_name", reset=True)
             logger.warning(f"No group found with name {group_name}, adding")
             self.add_group_by_name(group_name)
             group = self.get_group_by_name(group_name)
             return group
 
     def get_role_by_name(self, role_name: str, logger=None) -> AnsibleInventoryRole:
-        if not logger:
-            logger = get_logger("AnsibleInventory-get_role_by_name", reset=True)
-        role = [_ for _ in self.roles if _.name == role_name]
+        role = self._roles_by_name.get_all(self.roles, role_name)
         if role:
             assert len(role) == 1, f"Multiple roles found with name {role_name}"
             return role[0]
 
         else:
             raise Exception(f"No role found with name {role_name}")
-            logger.warning(f"No role found with name {role_name}, adding")
-            self.add_role_by_name(role_name)
-            role = self.get_role_by_name(role_name)
-            return role
 
     def host_name_exists(self, host_name: str):
-        _host = [_ for _ in self.all if _.hostname == host_name]
-        return bool(_host)
+        return self._hosts_by_name.get_position(self.all, host_name) is not None
 
     def add_group_by_name(self, group_name: str):
         if not self.group_name_exists(group_name):
-            self.groups.append(AnsibleInventoryGroup(name=group_name))
+            group = AnsibleInventoryGroup(name=group_name)
+            self.groups.append(group)
+            self._groups_by_name.add(self.groups, group)
+            self._closures = None
 
     def add_role_by_name(self, role_name: str):
         if not self.role_name_exists(role_name):
-            self.roles.append(AnsibleInventoryRole(name=role_name))
+            role = AnsibleInventoryRole(name=role_name)
+            self.roles.append(role)
+            self._roles_by_name.add(self.roles, role)
+            self._closures = None
+
+    def add_host(self, host: AnsibleInventoryHost):
+        self.all.append(host)
+        self._hosts_by_name.add(self.all, host)
+        self._hosts_by_ansible_host.add(self.all, host)
 
     def add_host_by_name(self, hostname: str):
         if not self.host_name_exists(hostname):
-            self.all.append(AnsibleInventoryHost(hostname=hostname))
+            self.add_host(AnsibleInventoryHost(hostname=hostname))
 
     def host_exists(self, ansible_host: str):
-        return any(ansible_host in host.ansible_host for host in self.all)
+        return (
+            self._hosts_by_ansible_host.get_position(self.all, ansible_host)
+            is not None
+        )
 
     def get_host(self, ansible_host: str):
-        if not self.host_exists(ansible_host):
+        host = self._hosts_by_ansible_host.get_all(self.all, ansible_host)
+        if not host:
             raise ValueError(f"No host found with name {ansible_host}")
 
-        host = [_ for _ in self.all if _.ansible_host == ansible_host]
         assert len(host) == 1, f"Multiple hosts found with name {ansible_host}"
         return host[0]
 
     def get_host_by_name(self, host_name: str) -> Union[AnsibleInventoryHost, bool]:
-        host = [_ for _ in self.all if _.hostname == host_name]
+        host = self._hosts_by_name.get_all(self.all, host_name)
         if host:
             assert len(host) == 1, f"Multiple hosts found with name {host_name}"
             return host[0]
-        logger = get_logger("AnsibleInventory-get_host_by_name", reset=True)
-        # ValueError(f"No host found with name {host_name}")
-        logger.warning(f"No host found with name {host_name}, adding")
 
         return False
 
     def set_ansible_host_ip(self, hostname: str, ansible_host: str):
         host = self.get_host_by_name(hostname)
         host.ansible_host = ansible_host
+        # changed in place, which the index does not notice
+        self._hosts_by_ansible_host.invalidate()
         host.validate_ansible_host()
 
     def add_group_to_host(self, host_name: str, group_name: str):
         host = self.get_host_by_name(host_name)
-        host.ansible_group_names.append(group_name)
-        host.ansible_group_names = list(set(host.ansible_group_names))
+        if group_name not in host.ansible_group_names:
+            host.ansible_group_names.append(group_name)
 
     def add_role_to_host(self, host_name: str, role_name: str):
         host = self.get_host_by_name(host_name)
-        host.ansible_role_names.append(role_name)
-        host.ansible_role_names = list(set(host.ansible_role_names))
+        if role_name not in host.ansible_role_names:
+            host.ansible_role_names.append(role_name)
 
     def load_roles(self, ansible_root_dir: Path):
+        self._closures = None
         from lx_administration.autoconf.imports.utils import load_roles
 
         roles_dir = ansible_root_dir / "roles"
 
+        # roles are read when first looked up (or on validate / save_to_file)
         _roles = load_roles(roles_dir)
-        roles = [
-            AnsibleInventoryRole(name=role, **value) for role, value in _roles.items()
-        ]
-
-        self.roles = roles
+        self.roles = LazyModelList(AnsibleInventoryRole, _roles.values())
 
-    def load_role_vars(self, ansible_inventory_dir: Path):
+    def load_role_vars(self, ansible_inventory_dir: Path, manifest=None):
+        self._closures = None
         from lx_administration.autoconf.imports.utils import (
             load_roles_vars,
             deep_update,
@@ -434,14 +580,15 @@ class AnsibleInventory(BaseModel):
 
         role_vars_dir = ansible_inventory_dir / "role_vars"
 
-        role_vars = load_roles_vars(role_vars_dir)
+        role_vars = load_roles_vars(role_vars_dir, manifest=manifest)
 
         for role_name, vars in role_vars.items():
             role = self.get_role_by_name(role_name)
             assert isinstance(vars, dict)
             role.vars = deep_update(role.vars, vars)
 
-    def load_group_vars(self, ansible_inventory_dir: Path):
+    def load_group_vars(self, ansible_inventory_dir: Path, manifest=None):
+        self._closures = None
         from lx_administration.autoconf.imports.utils import (
             load_group_vars,
             deep_update,
@@ -449,20 +596,20 @@ class AnsibleInventory(BaseModel):
 
         group_vars_dir = ansible_inventory_dir / "group_vars"
 
-        group_vars = load_group_vars(group_vars_dir)
+        group_vars = load_group_vars(group_vars_dir, manifest=manifest)
 
         for group_name, vars in group_vars.items():
             group = self.get_group_by_name(group_name)
             assert isinstance(vars, dict)
             group.vars = deep_update(group.vars, vars)
 
-    def load_host_vars(self, ansible_inventory_dir: Path):
+    def load_host_vars(self, ansible_inventory_dir: Path, manifest=None):
         from lx_administration.autoconf.imports.utils import load_host_vars, deep_update
         # from lx_administration.models.ansible import AnsibleInventoryHost
 
         host_vars_dir = ansible_inventory_dir / "host_vars"
 
-        host_vars = load_host_vars(host_vars_dir)
+        host_vars = load_host_vars(host_vars_dir, manifest=manifest)
 
         for host_name, vars in host_vars.items():
             host = self.get_host_by_name(host_name)
@@ -470,7 +617,7 @@ class AnsibleInventory(BaseModel):
                 host = AnsibleInventoryHost(
                     hostname=host_name, extra_user_names=["root", "center-user"]
                 )
-                self.all.append(host)
+                self.add_host(host)
             assert isinstance(vars, dict)
 
             host.vars = deep_update(host.vars, vars)
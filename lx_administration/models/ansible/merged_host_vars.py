@@ -6,7 +6,7 @@ from typing import Dict, List, Union, Optional, Any
 import yaml
 from lx_administration.logging import get_logger
 from lx_administration.autoconf.imports.utils import deep_update, _dictkey_replace_underscore_keys
-from lx_administration.autoconf.imports.utils import deep_update
+from lx_administration.autoconf.imports.utils import deep_merge, deep_update
 
 # TODO REFACTOR
 def _dictkey_replace_underscore_keys(
@@ -144,13 +144,10 @@ class MergedHostVars(BaseModel):
         return is_aglnet_host
 
     def prepare_roles(self):
-        from lx_administration.autoconf.imports.utils import deep_update
+        from lx_administration.autoconf.imports.utils import deep_merge
 
-        role_configs = {}
         # merge group_roles and host_roles
-        role_configs = deep_update(role_configs, self.group_roles)
-        role_configs = deep_update(role_configs, self.role_roles)
-        role_configs = deep_update(role_configs, self.host_roles)
+        role_configs = deep_merge(self.group_roles, self.role_roles, self.host_roles)
         role_configs = _dictkey_replace_underscore_keys(role_configs)
 
         return role_configs
@@ -225,14 +222,12 @@ class MergedHostVars(BaseModel):
         return final_config
 
     def prepare_services(self):
-        from lx_administration.autoconf.imports.utils import deep_update
-
-        service_configs = {}
+        from lx_administration.autoconf.imports.utils import deep_merge
 
         # merge group_services and host_services
-        service_configs = deep_update(service_configs, self.group_services)
-        service_configs = deep_update(service_configs, self.role_services)
-        service_configs = deep_update(service_configs, self.host_services)
+        service_configs = deep_merge(
+            self.group_services, self.role_services, self.host_services
+        )
 
         service_configs = _dictkey_replace_underscore_keys(service_configs)
 
@@ -240,12 +235,10 @@ class MergedHostVars(BaseModel):
 
     def prepare_luxnix(self):
 
-        luxnix_configs = {}
-
         # merge group_luxnix and host_luxnix
-        luxnix_configs = deep_update(luxnix_configs, self.group_luxnix)
-        luxnix_configs = deep_update(luxnix_configs, self.role_luxnix)
-        luxnix_configs = deep_update(luxnix_configs, self.host_luxnix)
+        luxnix_configs = deep_merge(
+            self.group_luxnix, self.role_luxnix, self.host_luxnix
+        )
 
         luxnix_configs = _dictkey_replace_underscore_keys(luxnix_configs)
 
@@ -0,0 +1,193 @@
+from itertools import count
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from pydantic import BaseModel, PrivateAttr
+
+_versions = count(1)
+
+
+def next_version() -> int:
+    """A new value of the process-wide version counter, never handed out before."""
+    return next(_versions)
+
+
+class TrackedList(list):
+    """
+    List that takes a new version from next_version on every mutation.
+
+    Versions are unique across all lists, so (id, version) identifies the
+    contents of a list even if a new list reuses the id of a freed one.
+    """
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.version = next_version()
+        # version before the last mutation, if it was a single append
+        self.appended_to: Optional[int] = None
+
+    def _mutated(self):
+        self.version = next_version()
+        self.appended_to = None
+
+    def append(self, item):
+        super().append(item)
+        previous = self.version
+        self._mutated()
+        self.appended_to = previous
+
+    def _tracked(name):
+        method = getattr(list, name)
+
+        def mutate(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            self._mutated()
+            return result
+
+        mutate.__name__ = name
+        return mutate
+
+    extend = _tracked("extend")
+    insert = _tracked("insert")
+    pop = _tracked("pop")
+    remove = _tracked("remove")
+    clear = _tracked("clear")
+    sort = _tracked("sort")
+    reverse = _tracked("reverse")
+    __setitem__ = _tracked("__setitem__")
+    __delitem__ = _tracked("__delitem__")
+    __iadd__ = _tracked("__iadd__")
+    __imul__ = _tracked("__imul__")
+    del _tracked
+
+
+def list_version(items: List) -> Optional[Tuple[int, int]]:
+    """(id, version) of a TrackedList, None for other lists (no version known)."""
+    if isinstance(items, TrackedList):
+        return (id(items), items.version)
+    return None
+
+
+class TrackedModel(BaseModel):
+    """
+    Model that takes a new version on every field assignment.
+
+    List fields are stored as TrackedLists, so `version` also changes when a
+    list field is mutated in place (e.g. `template.secret_names.append(...)`).
+    Caches derived from the model key on `version`. Mutations of nested
+    values other than lists are not seen.
+    """
+
+    _version: int = PrivateAttr(default_factory=next_version)
+
+    def model_post_init(self, __context: Any):
+        for name in type(self).model_fields:
+            value = self.__dict__.get(name)
+            if isinstance(value, list) and not isinstance(value, TrackedList):
+                self.__dict__[name] = TrackedList(value)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in type(self).model_fields:
+            if isinstance(value, list) and not isinstance(value, TrackedList):
+                value = TrackedList(value)
+            super().__setattr__(name, value)
+            self._version = next_version()
+        else:
+            super().__setattr__(name, value)
+
+    @property
+    def version(self) -> int:
+        """Largest version of the model and its list fields."""
+        version = self._version
+        for name in type(self).model_fields:
+            value = self.__dict__.get(name)
+            if isinstance(value, TrackedList) and value.version > version:
+                version = value.version
+        return version
+
+
+class NameIndex:
+    """
+    Dict index over a list of models, keyed by one attribute.
+
+    On a TrackedList the index remembers the (id, version) it was built from
+    and rebuilds when the list was replaced or mutated; items appended
+    through `add` keep it current without a rebuild. Other lists carry no
+    version, so the index is rebuilt on every lookup. A change of an item's
+    key in place is not a list mutation: call `invalidate` after it.
+
+    Items may also be raw dicts or LazyItems (see LazyModelList); building the
+    index reads them without validation, so lookups only validate the items
+    they return.
+    """
+
+    def __init__(self, attr: str):
+        self.attr = attr
+        self._positions: Dict[Hashable, List[int]] = {}
+        self._built_from: Optional[Tuple[int, int]] = None
+
+    def _key(self, item: Any) -> Hashable:
+        if isinstance(item, dict):
+            return item.get(self.attr)
+        return getattr(item, self.attr)
+
+    def rebuild(self, items: List):
+        positions: Dict[Hashable, List[int]] = {}
+        # list.__iter__ reads LazyModelList items raw, without validating them
+        for i, item in enumerate(list.__iter__(items)):
+            positions.setdefault(self._key(item), []).append(i)
+
+        self._positions = positions
+        self._built_from = list_version(items)
+
+    def invalidate(self):
+        """Rebuild on the next lookup, e.g. after an item's key changed in place."""
+        self._built_from = None
+
+    def _ensure(self, items: List):
+        version = list_version(items)
+        if version is None or version != self._built_from:
+            self.rebuild(items)
+
+    def add(self, items: List, item: Any):
+        """Register `item`, which was just appended to `items`."""
+        if (
+            isinstance(items, TrackedList)
+            and self._built_from == (id(items), items.appended_to)
+        ):
+            self._positions.setdefault(self._key(item), []).append(len(items) - 1)
+            self._built_from = list_version(items)
+        else:
+            self.rebuild(items)
+
+    def get_all(self, items: List, key: Hashable) -> List:
+        """Return all items with the given key, in list order."""
+        self._ensure(items)
+        return [items[i] for i in self._positions.get(key, [])]
+
+    def get_position(self, items: List, key: Hashable) -> Optional[int]:
+        """Return the position of the first item with the given key, or None."""
+        self._ensure(items)
+        positions = self._positions.get(key)
+        return positions[0] if positions else None
+
+    def get_first(self, items: List, key: Hashable):
+        """Return the first item with the given key, or None."""
+        self._ensure(items)
+        positions = self._positions.get(key)
+        return items[positions[0]] if positions else None
+
+    def get(self, items: List, key: Hashable, logger=None):
+        """
+        Return the single item with the given key, or None.
+
+        Raises:
+            ValueError: If more than one item has the key.
+        """
+        self._ensure(items)
+        positions = self._positions.get(key, [])
+        if len(positions) > 1:
+            if logger:
+                logger.warning(f"Found more than one object: {len(positions)}")
+            raise ValueError(f"Found more than one object: {len(positions)}")
+
+        return items[positions[0]] if positions else None
@@ -0,0 +1,113 @@
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Iterator, Type
+
+from pydantic import BaseModel
+
+from .indexing import TrackedList
+
+
+class LazyItem(ABC):
+    """
+    Raw LazyModelList item whose data is only read when it is validated,
+    e.g. a role directory. `load()` returns the dict to validate.
+    """
+
+    @abstractmethod
+    def load(self) -> dict:
+        """Read the item's data."""
+
+
+def _is_raw(item: Any) -> bool:
+    return isinstance(item, (dict, LazyItem))
+
+
+class LazyModelList(TrackedList):
+    """
+    List of pydantic models kept as raw dicts (or LazyItems) until they are
+    accessed. Caching a validated model is not a mutation of the list (its
+    TrackedList version stays the same).
+
+    Indexing and iteration validate items on first access and cache the model
+    in place, so untouched entries cost nothing beyond the parsed YAML.
+    Operations that compare items (in, index, count, remove, sort, ==)
+    validate the whole list first. `stream()` yields models without caching
+    them, for bulk consumers that do not need to keep the vault in memory.
+    """
+
+    def __init__(self, model: Type[BaseModel], items: Iterable = ()):
+        super().__init__(items)
+        self.model = model
+
+    def _validate_at(self, i: int) -> BaseModel:
+        item = list.__getitem__(self, i)
+        if isinstance(item, LazyItem):
+            item = item.load()
+        if isinstance(item, dict):
+            item = self.model.model_validate(item)
+            list.__setitem__(self, i, item)
+        return item
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._validate_at(j) for j in range(*i.indices(len(self)))]
+        return self._validate_at(i)
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        i = 0
+        while i < len(self):
+            yield self._validate_at(i)
+            i += 1
+
+    def __reversed__(self) -> Iterator[BaseModel]:
+        for i in range(len(self) - 1, -1, -1):
+            yield self._validate_at(i)
+
+    def __contains__(self, item: Any) -> bool:
+        return any(existing == item for existing in self)
+
+    def __eq__(self, other: Any) -> bool:
+        return list.__eq__(self.materialize(), other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    __hash__ = None
+
+    def __add__(self, other: Iterable) -> list:
+        return list(self) + list(other)
+
+    def copy(self) -> list:
+        return list(self)
+
+    def index(self, item: Any, *args) -> int:
+        return super(LazyModelList, self.materialize()).index(item, *args)
+
+    def count(self, item: Any) -> int:
+        return super(LazyModelList, self.materialize()).count(item)
+
+    def remove(self, item: Any):
+        super(LazyModelList, self.materialize()).remove(item)
+
+    def pop(self, i: int = -1) -> BaseModel:
+        item = self._validate_at(i)
+        super().pop(i)
+        return item
+
+    def sort(self, *args, **kwargs):
+        super(LazyModelList, self.materialize()).sort(*args, **kwargs)
+
+    def is_materialized(self) -> bool:
+        return not any(_is_raw(item) for item in list.__iter__(self))
+
+    def materialize(self) -> "LazyModelList":
+        """Validate every remaining raw item."""
+        for i in range(len(self)):
+            self._validate_at(i)
+        return self
+
+    def stream(self) -> Iterator[BaseModel]:
+        """Yield validated models without caching raw items in the list."""
+        for item in list.__iter__(self):
+            if isinstance(item, LazyItem):
+                item = item.load()
+            yield self.model.model_validate(item) if isinstance(item, dict) else item
@@ -1,7 +1,8 @@
 from configparser import ConfigParser
+from contextlib import contextmanager
 from pydantic import BaseModel
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 from icecream import ic
 
 
@@ -114,11 +115,27 @@ class AnsibleCfg(BaseModel):
     @classmethod
     def ensure_vault_id_pwdfile(cls, cfg_path: str, host: str, path: str):
         """Ensure vault_id and password_file entries in ansible.cfg"""
-        host = host.replace("@", "_")
-        path = path.replace("@", "_")
-        ansible_cfg = cls.from_file(cfg_path)
-        ansible_cfg.defaults.update_vid_entry(host, path)
-        ansible_cfg.save_to_file(cfg_path)
+        with cls.session(cfg_path) as session:
+            session.ensure_vault_id_pwdfile(host, path)
+
+    @classmethod
+    @contextmanager
+    def session(cls, cfg_path: str) -> Iterator["AnsibleCfgSession"]:
+        """
+        Batch vault identity updates to ansible.cfg.
+
+        The file is loaded once; on exit, identities with missing password
+        files are dropped and the file is written once, only if it changed.
+        Nothing is written if the block raises.
+
+        Example:
+            with AnsibleCfg.session(cfg_path) as session:
+                for psk in psks:
+                    session.ensure_vault_id_pwdfile(psk.vault_id_prefix, psk.file)
+        """
+        session = AnsibleCfgSession(cfg_path)
+        yield session
+        session.commit()
 
     @classmethod
     def from_file(cls, file: str):
@@ -159,3 +176,40 @@ class AnsibleCfg(BaseModel):
 
         with open(file, "w") as f:
             config.write(f)
+
+
+class AnsibleCfgSession:
+    """Pending vault identity updates to one ansible.cfg, see AnsibleCfg.session."""
+
+    def __init__(self, cfg_path: str):
+        self.cfg_path = cfg_path
+        self.ansible_cfg = AnsibleCfg.from_file(cfg_path)
+        self._loaded = self.ansible_cfg.model_dump()
+        self._vid_dict = self.ansible_cfg.defaults.get_vid_dict()
+
+    def ensure_vault_id_pwdfile(self, host: str, path: str):
+        """Set the password file of a vault identity."""
+        host = host.replace("@", "_")
+        path = path.replace("@", "_")
+        self._vid_dict[host] = path
+
+    def commit(self) -> bool:
+        """
+        Apply the updates and write ansible.cfg if anything changed.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        defaults = self.ansible_cfg.defaults
+        defaults.vault_identity_list = defaults.vid_list2str(
+            defaults.vid_dict2list(self._vid_dict)
+        )
+        defaults.drop_missing_vid()
+
+        unchanged = self.ansible_cfg.model_dump() == self._loaded
+        if unchanged and Path(self.cfg_path).exists():
+            return False
+
+        self.ansible_cfg.save_to_file(self.cfg_path)
+        self._loaded = self.ansible_cfg.model_dump()
+        return True
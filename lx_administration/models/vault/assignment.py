@@ -0,0 +1,89 @@
+"""
+Resolution of which secret templates belong to which inventory host.
+
+Templates are matched by owner_type:
+- roles: template name is one of the host's ansible_role_names
+- groups: template name is one of the host's ansible_group_names
+- local / clients: template name ends with "@<hostname>"
+"""
+
+from typing import Dict, Iterable, List
+
+from .secret_template import SecretTemplate
+
+
+class SecretAssignment:
+    """
+    Lookup tables from roles, groups and hostnames to template positions.
+
+    Built once per template list; resolving a host is then a handful of dict
+    lookups instead of a scan over all templates.
+    """
+
+    def __init__(self, templates: List[SecretTemplate]):
+        self.templates = templates
+        self.by_role: Dict[str, List[int]] = {}
+        self.by_group: Dict[str, List[int]] = {}
+        self.by_hostname: Dict[str, List[int]] = {}
+
+        for i, st in enumerate(templates):
+            if st.owner_type == "roles":
+                self.by_role.setdefault(st.name, []).append(i)
+            elif st.owner_type == "groups":
+                self.by_group.setdefault(st.name, []).append(i)
+            elif st.owner_type in ("local", "clients"):
+                if "@" in st.name:
+                    hostname = st.name.rsplit("@", 1)[1]
+                    self.by_hostname.setdefault(hostname, []).append(i)
+            else:
+                raise ValueError(f"Unknown owner_type: {st.owner_type}")
+
+    def resolve_host(
+        self, hostname: str, role_names: Iterable[str], group_names: Iterable[str]
+    ) -> List[SecretTemplate]:
+        """Return the templates matching a single host, in template order."""
+        positions = set(self.by_hostname.get(hostname, []))
+        for role_name in set(role_names):
+            positions.update(self.by_role.get(role_name, []))
+        for group_name in set(group_names):
+            positions.update(self.by_group.get(group_name, []))
+
+        return [self.templates[i] for i in sorted(positions)]
+
+    def resolve_hosts(self, hosts: Iterable) -> Dict[str, List[SecretTemplate]]:
+        """
+        Return the templates of every host in one pass over the templates.
+
+        Args:
+            hosts: Objects with hostname, ansible_role_names and ansible_group_names,
+                e.g. AnsibleInventoryHost.
+
+        Returns:
+            Dict[str, List[SecretTemplate]]: hostname -> templates, in template order.
+        """
+        role_hosts: Dict[str, List[str]] = {}
+        group_hosts: Dict[str, List[str]] = {}
+        assigned: Dict[str, List[SecretTemplate]] = {}
+
+        for host in hosts:
+            assigned[host.hostname] = []
+            for role_name in set(host.ansible_role_names):
+                role_hosts.setdefault(role_name, []).append(host.hostname)
+            for group_name in set(host.ansible_group_names):
+                group_hosts.setdefault(group_name, []).append(host.hostname)
+
+        for i, st in enumerate(self.templates):
+            if st.owner_type == "roles":
+                hostnames = role_hosts.get(st.name, [])
+            elif st.owner_type == "groups":
+                hostnames = group_hosts.get(st.name, [])
+            elif "@" in st.name:
+                hostnames = [st.name.rsplit("@", 1)[1]]
+            else:
+                hostnames = []
+
+            for hostname in hostnames:
+                if hostname in assigned:
+                    assigned[hostname].append(st)
+
+        return assigned
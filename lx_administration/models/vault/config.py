@@ -39,6 +39,17 @@ BASE_CLIENT_SECRET_TYPES = [
     "openvpn_cert",
 ]
 
+# Encryption engines for secret files: "native" encrypts in-process
+# (see vault_lib.py), "cli" falls back to the ansible-vault executable
+ENCRYPTION_ENGINES = ["native", "cli"]
+DEFAULT_ENCRYPTION_ENGINE = "native"
+
+# Worker processes used to re-key secrets on export, None uses all CPUs
+DEFAULT_EXPORT_WORKERS = None
+
+# Journaled secret changes after which the vault is compacted into vault.yml
+JOURNAL_COMPACT_THRESHOLD = 100
+
 # New PSK configuration
 PSK_DIR = "psk"  # Directory under vault dir for pre-shared keys
 PSK_LENGTH = 32  # Length in bytes for pre-shared keys
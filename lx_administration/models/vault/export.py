@@ -0,0 +1,206 @@
+"""
+Batched re-keying of vault secrets for client deployment.
+
+Each source secret is decrypted once and re-encrypted for every host PSK that
+needs it. Jobs are grouped per source file and spread over a process pool.
+An ExportManifest remembers the inputs of every deploy file so that reruns
+only re-key what changed.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+from . import vault_lib
+
+EXPORT_MANIFEST_FILE = "export_manifest.json"
+
+
+def file_sha256(file: str) -> str:
+    """Return the hex sha256 digest of a file's content."""
+    with open(file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ExportedFile(BaseModel):
+    """Inputs a deploy file was generated from."""
+
+    source: str
+    source_hash: str
+
+
+class HostExport(BaseModel):
+    """Export state of a single host's deploy directory."""
+
+    psk_hash: str
+    files: Dict[str, ExportedFile] = {}
+
+
+class ExportManifest(BaseModel):
+    """
+    Persisted record of the last export, keyed by hostname.
+
+    Stored next to vault.yml (not in deploy/, which is synced to clients).
+    Targets that could not be exported are listed in `failed` (hostname ->
+    target name -> error); their deploy files are removed.
+    """
+
+    hosts: Dict[str, HostExport] = {}
+    failed: Dict[str, Dict[str, str]] = {}
+
+    def add_failure(self, hostname: str, target_name: str, error: str):
+        self.failed.setdefault(hostname, {})[target_name] = error
+
+    @classmethod
+    def load(cls, file: Path) -> "ExportManifest":
+        """Load the manifest, returning an empty one if missing or unreadable."""
+        try:
+            with open(file, "r") as f:
+                return cls.model_validate(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, file: Path):
+        """Write the manifest atomically."""
+        tmp_file = file.with_name(f".{file.name}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.model_dump(mode="json"), f, indent=2, sort_keys=True)
+        os.replace(tmp_file, file)
+
+    def is_current(
+        self, hostname: str, target_name: str, entry: ExportedFile, psk_hash: str
+    ) -> bool:
+        """Check whether a deploy file was generated from exactly these inputs."""
+        host = self.hosts.get(hostname)
+        if not host or host.psk_hash != psk_hash:
+            return False
+        return host.files.get(target_name) == entry
+
+
+def remove_orphans(deploy_dir: Path, expected: Dict[str, set]) -> List[Path]:
+    """
+    Delete deploy files and host directories that are no longer exported.
+
+    Args:
+        deploy_dir (Path): The deploy directory.
+        expected (Dict[str, set]): Hostname -> set of expected file names.
+
+    Returns:
+        List[Path]: The removed paths.
+    """
+    removed = []
+    if not deploy_dir.exists():
+        return removed
+
+    for host_entry in os.scandir(deploy_dir):
+        host_path = Path(host_entry.path)
+        if host_entry.name not in expected or not host_entry.is_dir():
+            if host_entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(host_path)
+            else:
+                host_path.unlink()
+            removed.append(host_path)
+            continue
+
+        for file_entry in os.scandir(host_path):
+            if file_entry.name not in expected[host_entry.name]:
+                file_path = Path(file_entry.path)
+                if file_entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(file_path)
+                else:
+                    file_path.unlink()
+                removed.append(file_path)
+
+    return removed
+
+
+class RekeyJob(NamedTuple):
+    """All deploy targets of a single source secret."""
+
+    source: str
+    password: bytes
+    targets: Tuple[Tuple[str, bytes], ...]  # (target file, psk password)
+
+
+def rekey_source(job: RekeyJob) -> List[Tuple[str, Optional[str]]]:
+    """
+    Decrypt job.source once and write it re-encrypted to every target.
+
+    Deploy files are written without vault id, like `ansible-vault rekey
+    --new-vault-password-file` does, and inherit the source file mode.
+
+    Returns:
+        List[Tuple[str, Optional[str]]]: (target file, error message or None)
+    """
+    try:
+        plaintext = vault_lib.decrypt_file(job.source, job.password)
+    except Exception as e:
+        error = f"Failed to decrypt {job.source}: {e}"
+        return [(target, error) for target, _psk_password in job.targets]
+
+    results = []
+    for target, psk_password in job.targets:
+        try:
+            target_path = Path(target)
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(target_path, "wb") as f:
+                f.write(vault_lib.encrypt_bytes(plaintext, psk_password))
+            shutil.copymode(job.source, target_path)
+            results.append((target, None))
+        except Exception as e:
+            results.append((target, str(e)))
+
+    return results
+
+
+def run_rekey_jobs(
+    jobs: List[RekeyJob], workers: Optional[int] = None
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Run re-key jobs, in a process pool if more than one worker is requested.
+
+    Args:
+        jobs (List[RekeyJob]): Jobs as built by group_rekey_jobs.
+        workers (int, optional): Number of worker processes. Defaults to the
+            CPU count.
+
+    Returns:
+        List[Tuple[str, Optional[str]]]: (target file, error) for every
+            target, in job order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    results = []
+    if workers == 1:
+        for job in jobs:
+            results.extend(rekey_source(job))
+        return results
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for job_results in executor.map(rekey_source, jobs, chunksize=chunksize):
+            results.extend(job_results)
+
+    return results
+
+
+def group_rekey_jobs(
+    targets: Dict[str, List[Tuple[str, bytes]]], source_passwords: Dict[str, bytes]
+) -> List[RekeyJob]:
+    """Build one RekeyJob per source file from a source -> targets mapping."""
+    return [
+        RekeyJob(
+            source=source,
+            password=source_passwords[source],
+            targets=tuple(source_targets),
+        )
+        for source, source_targets in targets.items()
+    ]
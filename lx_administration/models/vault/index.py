@@ -0,0 +1,159 @@
+"""
+Compact SQLite index of vault.yml.
+
+The index holds one row per secret, secret template and pre-shared key
+(stored as JSON) plus the vault settings, and records the size and mtime of
+the vault.yml it was built from. Commands that only need a few entries can
+look them up by name instead of parsing and validating the whole vault.
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+VAULT_INDEX_FILE = "vault.idx.sqlite"
+INDEX_VERSION = "1"
+
+# vault.yml list field -> entry kind
+INDEXED_FIELDS = {
+    "secrets": "secret",
+    "secret_templates": "secret_template",
+    "pre_shared_keys": "pre_shared_key",
+}
+
+
+def _vault_file_stamp(vault_file: Path) -> Dict[str, str]:
+    stat = Path(vault_file).stat()
+    return {
+        "version": INDEX_VERSION,
+        "vault_size": str(stat.st_size),
+        "vault_mtime_ns": str(stat.st_mtime_ns),
+    }
+
+
+def write_index(index_file: Path, vault_file: Path, data: Dict) -> bool:
+    """
+    (Re)build the index from vault data as written to vault_file.
+
+    Args:
+        index_file (Path): The index file to write, replaced atomically.
+        vault_file (Path): The vault.yml the data was loaded from / saved to.
+        data (Dict): The vault as a json-compatible dict (model_dump(mode="json")).
+
+    Returns:
+        bool: False if vault_file does not exist and no index was written.
+    """
+    vault_file = Path(vault_file)
+    if not vault_file.exists():
+        return False
+
+    index_file = Path(index_file)
+    tmp_file = index_file.with_name(f".{index_file.name}.tmp")
+    tmp_file.unlink(missing_ok=True)
+
+    settings = {
+        key: value
+        for key, value in data.items()
+        if key not in INDEXED_FIELDS and key != "inventory"
+    }
+
+    con = sqlite3.connect(tmp_file)
+    try:
+        con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        con.execute(
+            "CREATE TABLE entries "
+            "(kind TEXT, name TEXT, target_name TEXT, position INTEGER, data TEXT)"
+        )
+        con.execute("CREATE INDEX entries_name ON entries (kind, name)")
+        con.execute("CREATE INDEX entries_target_name ON entries (kind, target_name)")
+
+        meta = _vault_file_stamp(vault_file)
+        meta["settings"] = json.dumps(settings, default=str)
+        con.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+
+        for field, kind in INDEXED_FIELDS.items():
+            con.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        kind,
+                        item.get("name"),
+                        item.get("target_name"),
+                        position,
+                        json.dumps(item, default=str),
+                    )
+                    for position, item in enumerate(data.get(field) or [])
+                ),
+            )
+        con.commit()
+    finally:
+        con.close()
+
+    os.replace(tmp_file, index_file)
+    return True
+
+
+class VaultIndex:
+    """Read access to a vault index file."""
+
+    def __init__(self, index_file: Path):
+        self.index_file = Path(index_file)
+        self._con = sqlite3.connect(f"file:{self.index_file}?mode=ro", uri=True)
+
+    def close(self):
+        self._con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._con.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_current(self, vault_file: Path) -> bool:
+        """Check whether the index was built from the current vault_file."""
+        try:
+            stamp = _vault_file_stamp(vault_file)
+        except FileNotFoundError:
+            return False
+        return all(self.get_meta(key) == value for key, value in stamp.items())
+
+    def get_settings(self) -> Dict:
+        """Return the non-list vault fields (dir, key, subnet, ...)."""
+        return json.loads(self.get_meta("settings") or "{}")
+
+    def get_entries(
+        self, kind: str, names: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """
+        Return the raw entries of one kind, in vault.yml order.
+
+        Args:
+            kind (str): One of the INDEXED_FIELDS values, e.g. "secret".
+            names (Iterable[str], optional): Only return entries with these names.
+        """
+        if names is None:
+            rows = self._con.execute(
+                "SELECT data FROM entries WHERE kind = ? ORDER BY position", (kind,)
+            )
+        else:
+            names = list(names)
+            placeholders = ", ".join("?" for _ in names)
+            rows = self._con.execute(
+                f"SELECT data FROM entries WHERE kind = ? AND name IN ({placeholders}) "
+                "ORDER BY position",
+                (kind, *names),
+            )
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self, kind: str) -> int:
+        return self._con.execute(
+            "SELECT COUNT(*) FROM entries WHERE kind = ?", (kind,)
+        ).fetchone()[0]
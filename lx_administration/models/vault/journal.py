@@ -0,0 +1,192 @@
+"""
+Append-only journal of secret mutations made since the last vault.yml save.
+
+Each line is a JSON object {"op": "secret", "data": {...}} holding the full
+serialized secret, keyed by its target_name. Vault.load_dir replays the
+journal on top of vault.yml and remembers how far it read (JournalPosition);
+Vault.save_to_file compacts it by writing the whole vault and truncating only
+the entries that vault had read, so entries appended by another process in
+the meantime are kept.
+
+Appends and truncation hold an exclusive flock on the journal.
+"""
+
+from contextlib import contextmanager
+import fcntl
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+VAULT_JOURNAL_FILE = "vault.journal"
+JOURNAL_OPS = ["secret"]
+
+
+class JournalPosition(NamedTuple):
+    """End of the complete lines read or written so far: byte offset and line count."""
+
+    offset: int = 0
+    entries: int = 0
+
+
+@contextmanager
+def _locked(file: Path) -> Iterator:
+    """Open the journal for appending under an exclusive lock."""
+    while True:
+        f = open(file, "a+b")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            # removed (compacted) while waiting for the lock, open it again
+            if os.path.exists(file) and os.path.samestat(
+                os.fstat(f.fileno()), os.stat(file)
+            ):
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+
+    try:
+        yield f
+    finally:
+        f.close()
+
+
+def _read_lines(f, start: JournalPosition) -> Tuple[List[bytes], JournalPosition]:
+    """Complete lines after start, which must be on a line boundary."""
+    f.seek(start.offset)
+    offset, count = start
+    lines = []
+    for line in f:
+        if not line.endswith(b"\n"):
+            # torn by an interrupted write
+            break
+        lines.append(line)
+        offset += len(line)
+        count += 1
+    return lines, JournalPosition(offset, count)
+
+
+def append_entries(
+    file: Path, entries: List[Dict], start: Optional[JournalPosition] = None
+) -> JournalPosition:
+    """
+    Append entries to the journal and fsync it.
+
+    A torn last line left by an interrupted write is terminated first, so it
+    cannot corrupt the new entries.
+
+    Args:
+        file (Path): The journal.
+        entries (List[Dict]): Entries to append.
+        start (JournalPosition, optional): A position known to be on a line
+            boundary, e.g. returned by a previous call. Only the part of the
+            journal after it is read to count the lines.
+
+    Returns:
+        JournalPosition: The end of the journal afterwards.
+    """
+    file = Path(file)
+    for entry in entries:
+        assert entry.get("op") in JOURNAL_OPS, f"Invalid journal op: {entry.get('op')}"
+
+    start = start or JournalPosition()
+    with _locked(file) as f:
+        if f.seek(0, os.SEEK_END) < start.offset:
+            # compacted by someone else since start was read
+            start = JournalPosition()
+        _lines, position = _read_lines(f, start)
+        size = f.seek(0, os.SEEK_END)
+        prefix = b"\n" if size > position.offset else b""
+        lines = b"".join(
+            json.dumps(entry, sort_keys=True).encode("utf-8") + b"\n"
+            for entry in entries
+        )
+        f.write(prefix + lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+    return JournalPosition(
+        size + len(prefix) + len(lines),
+        position.entries + len(prefix) + len(entries),
+    )
+
+
+def _parse(lines: List[bytes], file: Path, start_line: int, logger=None) -> List[Dict]:
+    entries = []
+    for line_number, line in enumerate(lines, start=start_line + 1):
+        line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            if logger:
+                logger.warning(f"Skipping torn journal line {line_number} in {file}")
+            continue
+        if entry.get("op") not in JOURNAL_OPS:
+            if logger:
+                logger.warning(f"Skipping unknown journal op in {file}: {entry}")
+            continue
+        entries.append(entry)
+    return entries
+
+
+def read_journal(
+    file: Path, logger=None, start: Optional[JournalPosition] = None
+) -> Tuple[List[Dict], JournalPosition]:
+    """
+    Read the complete journal entries after start, skipping lines torn by a crash.
+
+    Returns:
+        Tuple[List[Dict], JournalPosition]: The entries in the order they were
+        written, and the position after the last complete line.
+    """
+    file = Path(file)
+    start = start or JournalPosition()
+    if not file.exists():
+        return [], JournalPosition()
+    if start.offset and file.stat().st_size < start.offset:
+        # compacted by someone else since start was read
+        start = JournalPosition()
+
+    with open(file, "rb") as f:
+        lines, position = _read_lines(f, start)
+
+    return _parse(lines, file, start.entries, logger=logger), position
+
+
+def read_entries(file: Path, logger=None) -> List[Dict]:
+    """
+    Read all complete journal entries, skipping lines torn by a crash.
+
+    Returns:
+        List[Dict]: The entries in the order they were written.
+    """
+    return read_journal(file, logger=logger)[0]
+
+
+def truncate_entries(file: Path, position: JournalPosition):
+    """
+    Drop the journal up to position, keeping everything appended after it.
+
+    The journal is removed if nothing follows position.
+    """
+    file = Path(file)
+    if not file.exists():
+        return
+
+    with _locked(file) as f:
+        size = f.seek(0, os.SEEK_END)
+        if size < position.offset:
+            # compacted by someone else since position was read
+            return
+        f.seek(position.offset)
+        rest = f.read()
+        if not rest:
+            os.unlink(file)
+            return
+        # rewritten in place: appenders waiting for the lock hold this inode
+        f.truncate(0)
+        f.write(rest)
+        f.flush()
+        os.fsync(f.fileno())
@@ -6,29 +6,68 @@ from configparser import ConfigParser
 from datetime import timedelta as td
 from pathlib import Path
 import socket
-from typing import Optional, List, Union, Tuple
+from typing import Dict, Iterator, Optional, List, Union, Tuple
 
 from icecream import ic
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from lx_administration.logging import get_logger
-from lx_administration.yaml import dump_yaml, format_yaml, ansible_lint
+from lx_administration.logging.spans import span
+from lx_administration.yaml import dump_yaml, ansible_lint
 from ..ansible import AnsibleInventory
 from .config import (
     OWNER_TYPES,
     SECRET_TYPES,
     BASE_CLIENT_SECRET_TYPES,
     LOCAL_USER_SECRET_TYPES,
+    ENCRYPTION_ENGINES,
+    DEFAULT_ENCRYPTION_ENGINE,
+    DEFAULT_EXPORT_WORKERS,
+    JOURNAL_COMPACT_THRESHOLD,
     yaml,
 )
 from .psk import PreSharedKey
 from .secret import Secret
 from .secret_template import SecretTemplate
-from .manager_utils import _get_by_name, _assert_unique_list, _get_by_target_name
-from .ansible_cfg import AnsibleCfg, AnsibleCfgDefaults, AnsibleCfgPrivilegeEscalation
+from .assignment import SecretAssignment
+from .manager_utils import _assert_unique_list
+from ..indexing import NameIndex, TrackedModel, list_version
+from ..lazy import LazyModelList
+from .ansible_cfg import (
+    AnsibleCfg,
+    AnsibleCfgDefaults,
+    AnsibleCfgPrivilegeEscalation,
+    AnsibleCfgSession,
+)
+from .vault_lib import read_vault_password, get_vault_id
+from .index import VAULT_INDEX_FILE, VaultIndex, write_index
+from .journal import (
+    VAULT_JOURNAL_FILE,
+    JournalPosition,
+    append_entries,
+    read_journal,
+    truncate_entries,
+)
+from .export import (
+    EXPORT_MANIFEST_FILE,
+    ExportManifest,
+    ExportedFile,
+    HostExport,
+    file_sha256,
+    group_rekey_jobs,
+    remove_orphans,
+    run_rekey_jobs,
+)
+
 
+LAZY_FIELDS = {
+    "secrets": Secret,
+    "secret_templates": SecretTemplate,
+    "pre_shared_keys": PreSharedKey,
+}
 
-class Vault(BaseModel):
+
+class Vault(TrackedModel):
     """
     Primary Vault model, orchestrating secrets, keys, and inventory integration.
     """
@@ -47,6 +86,27 @@ class Vault(BaseModel):
     subnet: str = "172.16.255."
     secret_templates: List[SecretTemplate] = []
     pre_shared_keys: List[PreSharedKey] = []
+    encryption_engine: str = DEFAULT_ENCRYPTION_ENGINE
+
+    _vault_passwords: Dict[str, bytes] = PrivateAttr(default_factory=dict)
+    _secrets_by_name: NameIndex = PrivateAttr(default_factory=lambda: NameIndex("name"))
+    _secrets_by_target_name: NameIndex = PrivateAttr(
+        default_factory=lambda: NameIndex("target_name")
+    )
+    _templates_by_name: NameIndex = PrivateAttr(
+        default_factory=lambda: NameIndex("name")
+    )
+    _psks_by_name: NameIndex = PrivateAttr(default_factory=lambda: NameIndex("name"))
+    _secret_assignment: Optional[Tuple[tuple, SecretAssignment]] = PrivateAttr(
+        default=None
+    )
+    _host_secret_map: Optional[Tuple[tuple, Dict[str, List[Secret]]]] = PrivateAttr(
+        default=None
+    )
+    _partial: bool = PrivateAttr(default=False)
+    # how far the journal was replayed into (or appended from) this vault
+    _journal_position: JournalPosition = PrivateAttr(default_factory=JournalPosition)
+    _ansible_cfg_session: Optional[AnsibleCfgSession] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
@@ -79,7 +139,12 @@ class Vault(BaseModel):
         return dir, key, vault
 
     @classmethod
-    def load_dir(cls, vault_dir: str = "~/.lxv/", vault_key_path: str = "~/.lxv.key"):
+    def load_dir(
+        cls,
+        vault_dir: str = "~/.lxv/",
+        vault_key_path: str = "~/.lxv.key",
+        lazy: bool = False,
+    ):
         """
         Load a vault from a directory.
 
@@ -88,6 +153,9 @@ class Vault(BaseModel):
         Args:
             dir (str, optional): Path to the vault directory. Defaults to "~/.lxv/".
             key (str, optional): Path to the vault key file. Defaults to "~/.lxv.key".
+            lazy (bool, optional): Keep secrets, templates and PSKs as raw dicts
+                (LazyModelList) and validate each one on first access. Defaults to
+                False.
 
         Returns:
             Vault: A validated Vault instance containing the loaded data.
@@ -98,6 +166,7 @@ class Vault(BaseModel):
         Example:
             >>> vault = Vault.load_dir()
             >>> vault = Vault.load_dir("/custom/path/", "/custom/key.file")
+            >>> vault = Vault.load_dir(lazy=True)
         """
 
         logger = get_logger("Vaults-load_dir", reset=True)
@@ -115,6 +184,20 @@ class Vault(BaseModel):
         with open(vault_file_p, "r") as f:
             data = yaml.safe_load(f)
 
+        if lazy:
+            lazy_lists = {
+                field: LazyModelList(model, data.pop(field, None) or [])
+                for field, model in LAZY_FIELDS.items()
+            }
+            for field, items in lazy_lists.items():
+                logger.info(f"Loaded {field}: {len(items)} (lazy)")
+
+            vault = cls(**data)
+            for field, items in lazy_lists.items():
+                setattr(vault, field, items)
+            vault._replay_journal(vault_dir_p / VAULT_JOURNAL_FILE, logger=logger)
+            return vault
+
         if "secret_templates" in data and data["secret_templates"]:
             secret_templates = [
                 SecretTemplate.model_validate(template)
@@ -142,6 +225,179 @@ class Vault(BaseModel):
 
         # Let the model validator handle the conversion
         vault = cls(**data)
+        vault._replay_journal(vault_dir_p / VAULT_JOURNAL_FILE, logger=logger)
+        return vault
+
+    def _replay_journal(self, journal_file: Path, logger=None, names=None):
+        """
+        Apply journaled secret changes made since vault.yml was last saved.
+
+        Only entries after the position reached by the previous replay are
+        read, so replaying again picks up what other processes appended.
+
+        Args:
+            journal_file (Path): The journal next to vault.yml.
+            names (List[str], optional): Only apply changes to these secrets.
+        """
+        entries, self._journal_position = read_journal(
+            journal_file, logger=logger, start=self._journal_position
+        )
+        for entry in entries:
+            secret = Secret.model_validate(entry["data"])
+            if names is not None and secret.name not in names:
+                continue
+
+            position = self._secrets_by_target_name.get_position(
+                self.secrets, secret.target_name
+            )
+            if position is None:
+                self.secrets.append(secret)
+            else:
+                self.secrets[position] = secret
+
+        if entries:
+            self._secrets_by_name.rebuild(self.secrets)
+            self._secrets_by_target_name.rebuild(self.secrets)
+            if logger:
+                logger.info(f"Replayed {len(entries)} journaled secret changes")
+
+    def record_secret_changes(self, secrets: List[Secret], logger=None):
+        """
+        Persist changed secrets by appending them to the vault journal.
+
+        This costs O(changes) instead of rewriting vault.yml. Once the journal
+        reaches JOURNAL_COMPACT_THRESHOLD entries it is compacted (see
+        compact_journal).
+        """
+        vault_dir, _vault_key, _vault_file = self.get_paths()
+        vault_dir.mkdir(parents=True, exist_ok=True)
+        journal_file = vault_dir / VAULT_JOURNAL_FILE
+
+        if not self._partial:
+            # entries appended by other processes since the last read, so the
+            # journal up to the new position is all contained in this vault
+            self._replay_journal(journal_file, logger=logger)
+
+        entries = [
+            {
+                "op": "secret",
+                "data": secret.model_dump(
+                    mode="json", exclude={"value"}, exclude_none=True
+                ),
+            }
+            for secret in secrets
+        ]
+        self._journal_position = append_entries(
+            journal_file, entries, start=self._journal_position
+        )
+
+        if self._journal_position.entries >= JOURNAL_COMPACT_THRESHOLD:
+            self.compact_journal(logger=logger)
+
+    def compact_journal(self, logger=None):
+        """
+        Fold the journal into vault.yml.
+
+        A full vault is saved. A partial vault (see from_index) cannot be, so
+        the full vault is loaded, which replays the journal, and saved instead.
+        """
+        if not self._partial:
+            self.save_to_file(logger=logger)
+            return
+
+        vault = type(self).load_dir(self.dir, self.key, lazy=True)
+        vault.save_to_file(logger=logger)
+        self._journal_position = JournalPosition()
+
+    def materialize(self):
+        """Validate all entries of a lazily loaded vault."""
+        for field in LAZY_FIELDS:
+            items = getattr(self, field)
+            if isinstance(items, LazyModelList):
+                items.materialize()
+
+    def stream(self, field: str = "secrets") -> Iterator[BaseModel]:
+        """
+        Iterate over the secrets, secret_templates or pre_shared_keys.
+
+        On a lazily loaded vault, raw entries are validated one at a time and
+        not cached, keeping memory flat for bulk read-only consumers.
+        """
+        assert field in LAZY_FIELDS, f"Cannot stream {field}"
+        items = getattr(self, field)
+        if isinstance(items, LazyModelList):
+            return items.stream()
+        return iter(items)
+
+    @classmethod
+    def from_index(
+        cls,
+        vault_dir: str = "~/.lxv/",
+        vault_key_path: str = "~/.lxv.key",
+        secret_names: Optional[List[str]] = None,
+        psk_names: Optional[List[str]] = None,
+        template_names: Optional[List[str]] = None,
+    ):
+        """
+        Load a partial vault holding only the named entries.
+
+        Entries are read from the SQLite index next to vault.yml, which is
+        rebuilt from vault.yml first if it is missing or outdated. The local
+        host's PSK is always included so secrets can be re-encrypted. A partial
+        vault cannot be saved.
+
+        Args:
+            vault_dir (str, optional): Path to the vault directory. Defaults to
+                "~/.lxv/".
+            vault_key_path (str, optional): Path to the vault key file. Defaults
+                to "~/.lxv.key".
+            secret_names (List[str], optional): Names of the secrets to load.
+            psk_names (List[str], optional): Names of additional PSKs to load.
+            template_names (List[str], optional): Names of the secret templates to load.
+
+        Returns:
+            Vault: A vault containing only the requested entries.
+        """
+        vault_dir_p, _vault_key_path_p, vault_file_p = cls._get_vault_paths(
+            vault_dir, vault_key_path
+        )
+        index_file = vault_dir_p / VAULT_INDEX_FILE
+
+        if not vault_file_p.exists():
+            raise FileNotFoundError(f"File {vault_file_p} does not exist!")
+
+        current = False
+        if index_file.exists():
+            with VaultIndex(index_file) as index:
+                current = index.is_current(vault_file_p)
+
+        if not current:
+            vault = cls.load_dir(vault_dir, vault_key_path)
+            write_index(index_file, vault_file_p, vault._dump_for_file())
+
+        psk_names = [*(psk_names or []), socket.gethostname()]
+        with VaultIndex(index_file) as index:
+            data = index.get_settings()
+            data["secrets"] = [
+                Secret.model_validate(secret)
+                for secret in index.get_entries("secret", secret_names or [])
+            ]
+            data["secret_templates"] = [
+                SecretTemplate.model_validate(template)
+                for template in index.get_entries(
+                    "secret_template", template_names or []
+                )
+            ]
+            data["pre_shared_keys"] = [
+                PreSharedKey.model_validate(psk)
+                for psk in index.get_entries("pre_shared_key", psk_names)
+            ]
+
+        vault = cls(**data)
+        vault._replay_journal(
+            vault_dir_p / VAULT_JOURNAL_FILE, names=secret_names or []
+        )
+        vault._partial = True
         return vault
 
     @classmethod
@@ -216,6 +472,9 @@ class Vault(BaseModel):
         Raises:
             AssertionError: If any template or secret is invalid.
         """
+        assert (
+            self.encryption_engine in ENCRYPTION_ENGINES
+        ), f"Invalid encryption_engine: {self.encryption_engine}"
         self._validate_secret_templates()
         self._validate_secrets()
 
@@ -240,6 +499,7 @@ class Vault(BaseModel):
         """
         assert Path(inventory_file).exists(), f"File {inventory_file} does not exist!"
         self.inventory = AnsibleInventory.from_file(inventory_file)
+        self._host_secret_map = None
         return self.inventory
 
     def get_secret_template_by_name(self, name: str) -> Optional[SecretTemplate]:
@@ -257,7 +517,35 @@ class Vault(BaseModel):
             >>> manager.get_secret_template_by_name("ssh-key")
             <SecretTemplate: ssh-key>
         """
-        return _get_by_name(self.secret_templates, name)
+        return self._templates_by_name.get(self.secret_templates, name)
+
+    def get_secret_by_name(self, name: str) -> Optional[Secret]:
+        """
+        Retrieve a secret by its name.
+
+        Returns:
+            Optional[Secret]: The secret, or None if no secret has this name.
+
+        Raises:
+            ValueError: If more than one secret has this name.
+        """
+        return self._secrets_by_name.get(self.secrets, name)
+
+    def add_secret(self, secret: Secret):
+        """Append a secret and register it in the lookup indexes."""
+        self.secrets.append(secret)
+        self._secrets_by_name.add(self.secrets, secret)
+        self._secrets_by_target_name.add(self.secrets, secret)
+
+    def add_secret_template(self, template: SecretTemplate):
+        """Append a secret template and register it in the lookup index."""
+        self.secret_templates.append(template)
+        self._templates_by_name.add(self.secret_templates, template)
+
+    def add_pre_shared_key(self, psk: PreSharedKey):
+        """Append a pre-shared key and register it in the lookup index."""
+        self.pre_shared_keys.append(psk)
+        self._psks_by_name.add(self.pre_shared_keys, psk)
 
     def get_or_create_secret_template(
         self,
@@ -293,7 +581,7 @@ class Vault(BaseModel):
                 secret_type=secret_type,
                 vault_dir=vault_dir,
             )
-            self.secret_templates.append(template)
+            self.add_secret_template(template)
             created = True
 
         return template, created
@@ -509,15 +797,22 @@ class Vault(BaseModel):
         # Get all client hostnames from inventory
         client_names = self.inventory.get_hostnames()
 
-        for client_name in client_names:
-            psk, created = self.get_or_create_psk(client_name, logger)
-            if created:
-                created_psks.append(psk)
-                # self.pre_shared_keys.append(psk)
-                logger.info(f"Created new PSK for client {client_name}")
+        # Collect vault identities of all clients and update ansible.cfg once
+        with AnsibleCfg.session(self.ansible_cfg_path) as session:
+            self._ansible_cfg_session = session
+            try:
+                for client_name in client_names:
+                    psk, created = self.get_or_create_psk(client_name, logger)
+                    if created:
+                        created_psks.append(psk)
+                        # self.pre_shared_keys.append(psk)
+                        logger.info(f"Created new PSK for client {client_name}")
+            finally:
+                self._ansible_cfg_session = None
 
         return created_psks
 
+    @span("sync_inventory")
     def sync_inventory(self, inventory_file: str, logger=None):
         """load inventory from file and sync templates and PSKs"""
         if not logger:
@@ -526,35 +821,38 @@ class Vault(BaseModel):
         assert inventory_file.exists(), f"File {inventory_file} does not exist!"
 
         logger.info(f"Loading inventory from {inventory_file}")
-        _inventory = self.load_inventory(inventory_file.resolve().as_posix())
+        with span("load_inventory"):
+            _inventory = self.load_inventory(inventory_file.resolve().as_posix())
 
         # First sync PSKs for all clients (hostnames)
         # TODO implement validity check and automated update
         # TODO implement archive of old PSKs
-        created_psks = self._sync_client_psk(logger=logger)
+        with span("sync_client_psk"):
+            created_psks = self._sync_client_psk(logger=logger)
 
         logger.info(f"Created {len(created_psks)} new pre-shared keys")
         for psk in created_psks:
             logger.info(f"Client PSK: {psk.name}")
 
         # # Then sync secret templates
-        self.sync_secret_templates(logger=logger)
+        with span("sync_secret_templates"):
+            self.sync_secret_templates(logger=logger)
 
-        self.save_to_file(logger=logger)
+        with span("save_vault"):
+            self.save_to_file(logger=logger)
 
     def get_client_psk(self, client_name: str, logger=None) -> Optional[PreSharedKey]:
         """Get PSK for a specific client"""
-        if not logger:
-            logger = get_logger("Vaults-get_client_psk", reset=True)
-
         # First check in memory
-        psk = _get_by_name(self.pre_shared_keys, client_name)
+        psk = self._psks_by_name.get(self.pre_shared_keys, client_name)
         if not psk:
             return None
 
         # Then verify file exists
         psk_path = Path(psk.file).expanduser().resolve()
         if not psk_path.exists():
+            if not logger:
+                logger = get_logger("Vaults-get_client_psk", reset=True)
             logger.warning(f"PSK file not found: {psk_path}")
             return None
 
@@ -569,8 +867,16 @@ class Vault(BaseModel):
         """
         return self._get_vault_paths(self.dir, self.key)
 
-    def save_to_file(self, file: str = None, logger=None):
-        """dump as yml"""
+    def save_to_file(self, file: str = None, logger=None, validate: bool = False):
+        """
+        Dump as yml.
+
+        The formatted YAML is emitted in one pass and written atomically.
+        ansible-lint only runs if validate is set.
+        """
+        if self._partial:
+            raise ValueError("A partial vault loaded from the index cannot be saved")
+
         if not logger:
             logger = get_logger("Vaults-save_to_file", reset=True)
 
@@ -585,6 +891,31 @@ class Vault(BaseModel):
 
         logger.info("Saving vault to %s", vault_file)
 
+        raw = self._dump_for_file()
+        logger.debug(raw.__repr__())
+
+        # Use the dump_yaml function which now handles directory creation
+        dump_yaml(
+            raw,
+            vault_file,
+            format_func=None,
+            lint_func=ansible_lint if validate else None,
+            canonical=True,
+        )
+        write_index(vault_file.with_name(VAULT_INDEX_FILE), vault_file, raw)
+
+        # vault.yml now contains the journal up to the position this vault
+        # has read; later entries (other processes) stay in the journal
+        if vault_file == self.get_paths()[2]:
+            truncate_entries(
+                vault_file.parent / VAULT_JOURNAL_FILE, self._journal_position
+            )
+            self._journal_position = JournalPosition()
+
+    def _dump_for_file(self) -> Dict:
+        """Dump the vault as written to vault.yml."""
+        self.materialize()
+
         # Convert model to dict with explicit path string conversion
         raw = self.model_dump(
             mode="json",
@@ -603,16 +934,16 @@ class Vault(BaseModel):
                     if isinstance(psk["validity"], td):
                         psk["validity"] = f"P{psk['validity'].days}D"
 
-        logger.debug(raw.__repr__())
-
-        # Use the dump_yaml function which now handles directory creation
-        dump_yaml(raw, vault_file, format_yaml, ansible_lint)
+        return raw
 
     def ensure_vault_id(self, obj: PreSharedKey):
         conf_file = self.ansible_cfg_path
         host = obj.vault_id_prefix
         path = obj.file
-        AnsibleCfg.ensure_vault_id_pwdfile(cfg_path=conf_file, host=host, path=path)
+        if self._ansible_cfg_session:
+            self._ansible_cfg_session.ensure_vault_id_pwdfile(host, path)
+        else:
+            AnsibleCfg.ensure_vault_id_pwdfile(cfg_path=conf_file, host=host, path=path)
 
     def get_or_create_psk(self, name: str, logger=None) -> Tuple[PreSharedKey, bool]:
         """Get existing PSK or create new one"""
@@ -631,40 +962,199 @@ class Vault(BaseModel):
         psk_dir.mkdir(parents=True, exist_ok=True)
         psk = PreSharedKey.generate(name, psk_dir, logger)
         self.ensure_vault_id(psk)
-        self.pre_shared_keys.append(psk)
+        self.add_pre_shared_key(psk)
         return psk, True
 
-    def export_secrets_by_client(self, logger=None):
-        """Export access keys for all hosts in the inventory."""
-        from tqdm import tqdm
-        import shutil
+    @span("export_secrets_by_client")
+    def export_secrets_by_client(
+        self,
+        logger=None,
+        workers: Optional[int] = DEFAULT_EXPORT_WORKERS,
+        full: bool = False,
+    ):
+        """
+        Export secrets for all hosts in the inventory, re-encrypted with each
+        host's PSK.
+
+        Every source secret is decrypted once and re-encrypted for all hosts that
+        need it; the work is spread over `workers` processes. An export manifest
+        next to vault.yml records the source and PSK hashes of each deploy file,
+        so reruns only rewrite files whose inputs changed and delete orphans.
 
+        Args:
+            logger (logging.Logger, optional): Logger to use.
+            workers (int, optional): Number of worker processes. Defaults to the
+                CPU count.
+            full (bool, optional): Ignore the manifest and re-key every file.
+
+        Returns:
+            ExportManifest: The new manifest. Targets that failed are listed in
+                `failed` and have no deploy file, so clients never keep an
+                outdated secret.
+        """
         if not logger:
             logger = get_logger("Vaults-export_secrets_by_client", reset=True)
 
+        vault_dir = Path(self.dir).expanduser().resolve()
+        manifest_file = vault_dir / EXPORT_MANIFEST_FILE
+
+        if self.encryption_engine == "cli":
+            manifest_file.unlink(missing_ok=True)
+            return self._export_secrets_by_client_cli(logger=logger)
+
+        deploy_dir = vault_dir / "deploy"
+        deploy_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest = ExportManifest() if full else ExportManifest.load(manifest_file)
+        new_manifest = ExportManifest()
+        expected: Dict[str, set] = {}
+
+        targets: Dict[str, List[Tuple[str, bytes]]] = {}
+        source_passwords: Dict[str, bytes] = {}
+        source_hashes: Dict[str, str] = {}
+        pending: Dict[str, Tuple[str, str, ExportedFile]] = {}
+
+        with span("resolve_host_secrets"):
+            host_secret_map = self.get_host_secret_map(logger=logger)
+        hostnames = self.inventory.get_hostnames()
+        for hostname in hostnames:
+            logger.info(f"Exporting secrets for client: {hostname}")
+
+            # Get PSK first and verify it exists
+            psk = self.get_client_psk(hostname)
+            psk_file = Path(psk.file) if psk else None
+            if not psk or not psk_file.exists():
+                error = (
+                    f"PSK file not found: {psk_file}"
+                    if psk
+                    else f"No valid PSK found for host {hostname}"
+                )
+                logger.error(f"{error}, skipping...")
+                # not expected: remove_orphans deletes the host's deploy dir
+                for secret in host_secret_map[hostname]:
+                    new_manifest.add_failure(hostname, secret.target_name, error)
+                continue
+            psk_hash = file_sha256(psk_file)
+            psk_password = None
+
+            host_secrets = host_secret_map[hostname]
+            logger.info(f"Found {len(host_secrets)} secrets for host {hostname}")
+
+            host_secret_dir = deploy_dir / hostname
+            host_export = HostExport(psk_hash=psk_hash)
+            new_manifest.hosts[hostname] = host_export
+            expected[hostname] = set()
+
+            for secret in host_secrets:
+                source = Path(secret.file).expanduser().resolve().as_posix()
+                target_path = host_secret_dir / secret.target_name
+
+                try:
+                    if source not in source_hashes:
+                        source_hashes[source] = file_sha256(source)
+                    entry = ExportedFile(
+                        source=source, source_hash=source_hashes[source]
+                    )
+
+                    if target_path.exists() and manifest.is_current(
+                        hostname, secret.target_name, entry, psk_hash
+                    ):
+                        host_export.files[secret.target_name] = entry
+                        expected[hostname].add(secret.target_name)
+                        continue
+
+                    if source not in source_passwords:
+                        source_vault_id = get_vault_id(source)
+                        source_passwords[source] = self.get_vault_password(
+                            source_vault_id or self.get_local_vault_id()
+                        )
+                    if psk_password is None:
+                        psk_password = read_vault_password(psk_file)
+
+                except Exception as e:
+                    # not expected: remove_orphans deletes the outdated file
+                    logger.error(f"Failed to re-encrypt secret {secret.name}: {str(e)}")
+                    new_manifest.add_failure(hostname, secret.target_name, str(e))
+                    continue
+
+                expected[hostname].add(secret.target_name)
+                targets.setdefault(source, []).append(
+                    (target_path.as_posix(), psk_password)
+                )
+                pending[target_path.as_posix()] = (hostname, secret.target_name, entry)
+
+        for removed in remove_orphans(deploy_dir, expected):
+            logger.info(f"Removed orphaned deploy file: {removed}")
+
+        jobs = group_rekey_jobs(targets, source_passwords)
+        logger.info(
+            f"Re-encrypting {len(pending)} files from {len(jobs)} secrets "
+            f"for {len(hostnames)} hosts"
+        )
+
+        with span("rekey", files=len(pending), secrets=len(jobs)):
+            results = run_rekey_jobs(jobs, workers=workers)
+
+        for target, error in results:
+            hostname, target_name, entry = pending[target]
+            if error:
+                logger.error(f"Failed to re-encrypt secret {target}: {error}")
+                # the previous file would keep serving an outdated secret
+                Path(target).unlink(missing_ok=True)
+                new_manifest.add_failure(hostname, target_name, error)
+                continue
+            new_manifest.hosts[hostname].files[target_name] = entry
+
+        if new_manifest.failed:
+            logger.error(
+                f"Failed to export {sum(map(len, new_manifest.failed.values()))} "
+                f"files for {len(new_manifest.failed)} hosts"
+            )
+
+        if new_manifest != manifest or not manifest_file.exists():
+            new_manifest.save(manifest_file)
+
+        return new_manifest
+
+    def _export_secrets_by_client_cli(self, logger):
+        """
+        Export secrets one by one through `ansible-vault rekey` (cli engine).
+
+        Returns:
+            ExportManifest: Only `failed` is filled in; the cli engine keeps no
+                manifest.
+        """
+        from tqdm import tqdm
+        import shutil
+
         # Create deploy directory
         deploy_dir = Path(self.dir).expanduser().resolve() / "deploy"
         if deploy_dir.exists():
             shutil.rmtree(deploy_dir)
         deploy_dir.mkdir(parents=True, exist_ok=True)
 
+        result = ExportManifest()
+        host_secret_map = self.get_host_secret_map(logger=logger)
         hostnames = self.inventory.get_hostnames()
         for hostname in tqdm(hostnames):
             logger.info(f"Exporting secrets for client: {hostname}")
 
             # Get PSK first and verify it exists
             psk = self.get_client_psk(hostname)
-            if not psk:
-                logger.error(f"No valid PSK found for host {hostname}, skipping...")
-                continue
-
-            psk_file = Path(psk.file)
-            if not psk_file.exists():
-                logger.error(f"PSK file not found: {psk_file}, skipping...")
+            psk_file = Path(psk.file) if psk else None
+            if not psk or not psk_file.exists():
+                error = (
+                    f"PSK file not found: {psk_file}"
+                    if psk
+                    else f"No valid PSK found for host {hostname}"
+                )
+                logger.error(f"{error}, skipping...")
+                for secret in host_secret_map[hostname]:
+                    result.add_failure(hostname, secret.target_name, error)
                 continue
 
             # Export keys for this host
-            host_secrets = self.get_host_secrets(hostname)
+            host_secrets = host_secret_map[hostname]
             logger.info(f"Found {len(host_secrets)} secrets for host {hostname}")
 
             host_secret_dir = deploy_dir / hostname
@@ -680,6 +1170,10 @@ class Vault(BaseModel):
                     )
                 except Exception as e:
                     logger.error(f"Failed to re-encrypt secret {secret.name}: {str(e)}")
+                    target_path.unlink(missing_ok=True)
+                    result.add_failure(hostname, target_filename, str(e))
+
+        return result
 
     def get_local_hostname(self) -> str:
         return socket.gethostname()
@@ -698,6 +1192,40 @@ class Vault(BaseModel):
     def get_local_vault_id_with_path(self) -> str:
         return f"{self.get_local_hostname()}@{self.get_local_psk().file}"
 
+    def get_vault_password(self, vault_id: str) -> bytes:
+        """
+        Resolve the password for a vault identity, as ansible-vault would.
+
+        The identity is looked up in the vault_identity_list of ansible.cfg first,
+        falling back to the pre-shared key of the same name. Resolved passwords
+        are cached for the lifetime of the vault object.
+
+        Args:
+            vault_id (str): The vault identity, e.g. the local hostname.
+
+        Returns:
+            bytes: The stripped password, ready for vault_lib.
+
+        Raises:
+            ValueError: If no password file is known for the identity.
+        """
+        if vault_id in self._vault_passwords:
+            return self._vault_passwords[vault_id]
+
+        vid_dict = AnsibleCfg.from_file(self.ansible_cfg_path).defaults.get_vid_dict()
+        password_file = vid_dict.get(vault_id.replace("@", "--"))
+
+        if not password_file or not Path(password_file).exists():
+            psk = self.get_client_psk(vault_id)
+            password_file = psk.file if psk else None
+
+        if not password_file:
+            raise ValueError(f"No vault password file found for vault id {vault_id}")
+
+        password = read_vault_password(password_file)
+        self._vault_passwords[vault_id] = password
+        return password
+
     def _get_template_secrets(self, template_name: str) -> List[Secret]:
         """
         Get all secrets associated with a template by name.
@@ -717,7 +1245,7 @@ class Vault(BaseModel):
 
         secrets = []
         for secret_name in template.secret_names:
-            secret = next((s for s in self.secrets if s.name == secret_name), None)
+            secret = self._secrets_by_name.get_first(self.secrets, secret_name)
             if not secret:
                 raise ValueError(
                     f"Secret '{secret_name}' referenced by template '{template_name}' not found"
@@ -738,71 +1266,139 @@ class Vault(BaseModel):
         Raises:
             AssertionError: If no secret with the given target name is found.
         """
-        secret = _get_by_target_name(self.secrets, name)
+        secret = self._secrets_by_target_name.get(self.secrets, name)
         assert secret, f"Secret '{name}' not found"
 
         return secret
 
-    def get_host_secrets(self, hostname: str, logger=None) -> List[Secret]:
+    def _templates_version(self) -> tuple:
         """
-        Determine which secrets belong to this host by checking roles, groups,
-        or matching local/clients secrets with hostname.
+        Changes when the template list or any template (e.g. its owner_type)
+        changes.
         """
-        if not logger:
-            logger = get_logger("Vaults-get_host_secrets", reset=True)
+        templates = self.secret_templates
+        return (
+            list_version(templates),
+            max(
+                (
+                    t.version
+                    for t in list.__iter__(templates)
+                    if isinstance(t, TrackedModel)
+                ),
+                default=0,
+            ),
+        )
 
-        host = self.inventory.get_host_by_name(hostname)
+    def _get_secret_assignment(self) -> SecretAssignment:
+        """Return the template lookup tables, rebuilt when the templates changed."""
+        key = self._templates_version()
+        if (
+            self._secret_assignment is None
+            or key[0] is None
+            or self._secret_assignment[0] != key
+        ):
+            self._secret_assignment = (key, SecretAssignment(self.secret_templates))
+        return self._secret_assignment[1]
+
+    def _host_secret_map_key(self) -> Optional[tuple]:
+        """
+        Versions the host secret map depends on: the inventory and its hosts,
+        the templates and the secrets list. None if one of them is a plain
+        list, whose changes cannot be seen.
+        """
+        inventory = self.inventory
+        key = (
+            id(inventory),
+            inventory.version,
+            max((host.version for host in inventory.all), default=0),
+            self._templates_version(),
+            list_version(self.secrets),
+        )
+        if list_version(inventory.all) is None or None in key[3] or key[4] is None:
+            return None
+        return key
 
-        host_roles = host.ansible_role_names
-        host_groups = host.ansible_group_names
-        hostname = host.hostname
-
-        logger.info("---------get_host_secrets---------")
-        logger.info("Checking secrets for host: %s", hostname)
-        logger.info("Host roles: %s", host_roles)
-        logger.info("Host groups: %s", host_groups)
-
-        matched_secrets = []
-
-        for st in self.secret_templates:
-            logger.info("Checking template: %s", st.name)
-            logger.info("Owner type: %s", st.owner_type)
-            # logger.info(st.model_dump().__repr__())
-            should_include = False
-            if st.owner_type == "roles":
-                # logger.info("Checking roles in roles for: %s", st.name)
-                if st.name in host_roles:
-                    logger.info("Matched role: %s", st.name)
-                    should_include = True
-            elif st.owner_type == "groups":
-                logger.info("Checking groups in groups for: %s", st.name)
-                if st.name in host_groups:
-                    logger.info("Matched group: %s", st.name)
-                    should_include = True
-            elif st.owner_type in ("local", "clients"):
-                logger.info("Checking local/client for: %s", st.name)
-                if st.name.endswith(f"@{hostname}"):
-                    logger.info("Matched local/client: %s", st.name)
-                    should_include = True
+    def _resolve_host_secrets(
+        self, host, templates: List[SecretTemplate]
+    ) -> List[Secret]:
+        secrets = []
+        for st in templates:
+            secrets.extend(self._get_template_secrets(st.name))
 
-            else:
-                raise ValueError(f"Unknown owner_type: {st.owner_type}")
+        # fetch hosts extra secrets
+        secrets.extend(
+            self.get_secret_by_target_name(name) for name in host.extra_secret_names
+        )
+        return secrets
 
-            if should_include:
-                _secrets = self._get_template_secrets(st.name)
-                logger.info("Matched secrets: %s", _secrets)
-                matched_secrets.extend(_secrets)
+    def get_host_secret_map(self, logger=None) -> Dict[str, List[Secret]]:
+        """
+        Resolve the secrets of every inventory host in one pass.
 
-        # fetch hosts extra secrets
-        extra_secret_names = host.extra_secret_names
-        secrets = [self.get_secret_by_target_name(name) for name in extra_secret_names]
+        The result is cached until the inventory or its hosts, the secret
+        templates or the secrets list change (see _host_secret_map_key);
+        export reuses it instead of resolving host by host.
+
+        Returns:
+            Dict[str, List[Secret]]: hostname -> secrets, in template order
+                followed by the host's extra secrets.
+        """
+        key = self._host_secret_map_key()
+        if (
+            key is not None
+            and self._host_secret_map is not None
+            and self._host_secret_map[0] == key
+        ):
+            return self._host_secret_map[1]
+
+        if not logger:
+            logger = get_logger("Vaults-get_host_secret_map", reset=True)
+
+        hosts = self.inventory.all
+        assigned = self._get_secret_assignment().resolve_hosts(hosts)
+        host_secrets = {
+            host.hostname: self._resolve_host_secrets(host, assigned[host.hostname])
+            for host in hosts
+        }
+        logger.info(
+            f"Resolved secrets for {len(host_secrets)} hosts "
+            f"from {len(self.secret_templates)} templates"
+        )
 
-        matched_secrets.extend(secrets)
+        self._host_secret_map = (key, host_secrets)
+        return host_secrets
+
+    def get_host_secrets(self, hostname: str, logger=None) -> List[Secret]:
+        """
+        Determine which secrets belong to this host by checking roles, groups,
+        or matching local/clients secrets with hostname.
+        """
+        if self._host_secret_map is not None:
+            key = self._host_secret_map_key()
+            if key is not None and self._host_secret_map[0] == key:
+                if hostname in self._host_secret_map[1]:
+                    return list(self._host_secret_map[1][hostname])
+
+        host = self.inventory.get_host_by_name(hostname)
+        templates = self._get_secret_assignment().resolve_host(
+            host.hostname, host.ansible_role_names, host.ansible_group_names
+        )
+        matched_secrets = self._resolve_host_secrets(host, templates)
+
+        if logger:
+            logger.info(
+                f"Host {host.hostname}: {len(matched_secrets)} secrets "
+                f"from {len(templates)} templates"
+            )
 
         return matched_secrets
 
     def update_secret_value(
-        self, secret_name: str, new_value: str, save_multiple: bool = False
+        self,
+        secret_name: str,
+        new_value: str,
+        save_multiple: bool = False,
+        save: bool = True,
     ):
         """
         Update the value of an existing secret and save the vault.
@@ -811,11 +1407,13 @@ class Vault(BaseModel):
             secret_name (str): Name of the secret to update
             new_value (str): New value to set
             save_multiple (bool, optional): If True, updates all matching secrets. If False, raises error if multiple secrets found. Defaults to False.
+            save (bool, optional): Record the change in the vault journal (see
+                record_secret_changes). Defaults to True.
 
         Raises:
             ValueError: If secret not found or if multiple secrets found and save_multiple=False
         """
-        matching_secrets = [s for s in self.secrets if s.name == secret_name]
+        matching_secrets = self._secrets_by_name.get_all(self.secrets, secret_name)
 
         if not matching_secrets:
             raise ValueError(f"Secret '{secret_name}' not found in vault.")
@@ -830,4 +1428,5 @@ class Vault(BaseModel):
             secret.value = new_value
             secret.update_file_encryption(self)
 
-        self.save_to_file()
+        if save:
+            self.record_secret_changes(matching_secrets)
@@ -64,10 +64,10 @@ def generate_secret_dir_path(
 
 
 def _get_by_name(obj_list: List, name: str, logger=None):
-    if not logger:
-        logger = get_logger("lx_vault__get_by_name")
     objs = [obj for obj in obj_list if obj.name == name]
     if not len(objs) <= 1:
+        if not logger:
+            logger = get_logger("lx_vault__get_by_name")
         logger.warning(f"Found more than one object: {len(objs)}")
         raise ValueError(f"Found more than one object: {len(objs)}")
 
@@ -78,10 +78,10 @@ def _get_by_name(obj_list: List, name: str, logger=None):
 
 
 def _get_by_target_name(obj_list: List, target_name: str, logger=None):
-    if not logger:
-        logger = get_logger("lx_vault__get_by_target_name")
     objs = [obj for obj in obj_list if obj.target_name == target_name]
     if not len(objs) <= 1:
+        if not logger:
+            logger = get_logger("lx_vault__get_by_target_name")
         logger.warning(f"Found more than one object: {len(objs)}")
         raise ValueError(f"Found more than one object: {len(objs)}")
 
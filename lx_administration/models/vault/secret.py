@@ -5,7 +5,44 @@ from pathlib import Path
 import warnings
 from lx_administration.logging import get_logger
 from lx_administration.utils.paths import str2path
-from .manager_utils import _is_valid, _get_by_name
+from .manager_utils import _is_valid
+from .config import ENCRYPTION_ENGINES
+from . import vault_lib
+
+
+def _encrypt_to_file(
+    file_path: Path,
+    value: str,
+    vault_id: str,
+    vault: "Vault",  # noqa: F821
+    quiet: bool = False,
+):
+    """Write value to file_path encrypted for vault_id using the vault's engine."""
+    import subprocess
+
+    engine = vault.encryption_engine
+    assert engine in ENCRYPTION_ENGINES, f"Invalid encryption_engine: {engine}"
+
+    if engine == "native":
+        password = vault.get_vault_password(vault_id)
+        vault_lib.encrypt_file(file_path, value, password, vault_id=vault_id)
+        return
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(value)
+
+    output = subprocess.DEVNULL if quiet else None
+    subprocess.run(
+        [
+            "ansible-vault",
+            "encrypt",
+            f"--encrypt-vault-id={vault_id}",
+            file_path.as_posix(),
+        ],
+        check=True,
+        stdout=output,
+        stderr=output,
+    )
 
 
 class Secret(BaseModel):
@@ -35,41 +72,27 @@ class Secret(BaseModel):
         file: str,
         vault: "Vault",  # noqa: F821
     ):
-        import subprocess
         from lx_administration.models import Vault
 
         _vault: Vault = vault
 
         file_path = Path(file).expanduser().resolve()
-        with open(file_path, "w") as f:
-            f.write(secret)
 
         vault_id = _vault.get_local_vault_id()
         assert vault_id, "Vault ID not found for local hostname"
 
-        encrypt_args = [
-            "ansible-vault",
-            "encrypt",
-            f"--encrypt-vault-id={vault_id}",
-            file_path.as_posix(),
-        ]
-
-        subprocess.run(
-            encrypt_args,
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        _encrypt_to_file(file_path, secret, vault_id, _vault, quiet=True)
 
         return secret
 
     @classmethod
     def check_exists(cls, name: str, file: str, vault: "Vault"):  # noqa: F821
         fp = Path(file)
-        if not fp.exists() and not _get_by_name(vault.secrets, name):
+        secret = vault.get_secret_by_name(name)
+        if not fp.exists() and not secret:
             return False
 
-        elif fp.exists() and _get_by_name(vault.secrets, name):
+        elif fp.exists() and secret:
             return True
 
         else:
@@ -103,6 +126,27 @@ class Secret(BaseModel):
         if target_path.exists():
             warnings.warn(f"Target file {target_path} exists and will be overwritten")
 
+        if vault and vault.encryption_engine == "native":
+            from .export import RekeyJob, rekey_source
+
+            source_vault_id = vault_lib.get_vault_id(source_path)
+            job = RekeyJob(
+                source=source_path.as_posix(),
+                password=vault.get_vault_password(
+                    source_vault_id or vault.get_local_vault_id()
+                ),
+                targets=(
+                    (
+                        target_path.as_posix(),
+                        vault_lib.read_vault_password(pre_shared_key_path),
+                    ),
+                ),
+            )
+            for _target, error in rekey_source(job):
+                if error:
+                    raise RuntimeError(f"Failed to rekey file: {error}")
+            return
+
         # Copy the source file to target location
         shutil.copy2(source_path, target_path)
 
@@ -144,7 +188,6 @@ class Secret(BaseModel):
         Overwrite the existing secret file with self.value, then encrypt it.
         Preserves original file permissions.
         """
-        import subprocess
         import os
         from lx_administration.models import Vault
 
@@ -157,23 +200,20 @@ class Secret(BaseModel):
         if file_path.exists():
             orig_mode = file_path.stat().st_mode
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.value or "")
+        vault_id = vault.get_local_vault_id()
+        _encrypt_to_file(file_path, self.value or "", vault_id, vault)
 
         # Set default permissions (700) or restore original
         os.chmod(file_path, orig_mode if orig_mode else 0o700)
         os.chown(file_path, os.getuid(), os.getgid())
 
-        vault_id = vault.get_local_vault_id()
-        subprocess.run(
-            [
-                "ansible-vault",
-                "encrypt",
-                f"--encrypt-vault-id={vault_id}",
-                file_path.as_posix(),
-            ],
-            check=True,
-        )
+    def decrypt(self, vault: "Vault") -> str:  # noqa: F821
+        """Decrypt the secret file in-process and return its value."""
+        file_path = Path(self.file).expanduser().resolve()
+        vault_id = vault_lib.get_vault_id(file_path) or vault.get_local_vault_id()
+        password = vault.get_vault_password(vault_id)
+
+        return vault_lib.decrypt_file(file_path, password).decode("utf-8")
 
     def validate(self):
         logger = get_logger("Secret-validate")
@@ -1,5 +1,4 @@
 from typing import Optional, List, Union
-from pydantic import BaseModel
 from pathlib import Path
 from datetime import datetime as dt
 from .config import OWNER_TYPES, SECRET_TYPES
@@ -8,10 +7,11 @@ from .manager_utils import (
     generate_secret_dir_path,
 )
 from .secret import Secret
+from ..indexing import TrackedModel
 from lx_administration.logging import get_logger
 
 
-class SecretTemplate(BaseModel):
+class SecretTemplate(TrackedModel):
     """
     Template for generating multiple secrets of the same type/owner.
     """
@@ -163,6 +163,6 @@ class SecretTemplate(BaseModel):
                     created=dt.now(),
                     updated=dt.now(),
                 )
-                vault.secrets.append(secret)
+                _vault.add_secret(secret)
 
         return True
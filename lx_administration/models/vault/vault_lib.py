@@ -0,0 +1,196 @@
+"""
+Native implementation of the ansible-vault AES256 format.
+
+Produces and consumes the same ``$ANSIBLE_VAULT;1.x;AES256[;<vault_id>]``
+envelopes as ``ansible.parsing.vault.VaultLib`` without spawning the
+``ansible-vault`` CLI, so secrets can be encrypted and re-keyed in-process.
+"""
+
+from binascii import hexlify, unhexlify
+from functools import lru_cache
+import hmac as _hmac
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from cryptography.hazmat.primitives import hashes, padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.hmac import HMAC
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+VAULT_HEADER = b"$ANSIBLE_VAULT"
+VAULT_CIPHER = b"AES256"
+KEY_LENGTH = 32
+IV_LENGTH = algorithms.AES.block_size // 8
+SALT_LENGTH = 32
+KDF_ITERATIONS = 10000
+LINE_WIDTH = 80
+
+
+def _to_bytes(value: Union[str, bytes]) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return value.encode("utf-8")
+
+
+def read_vault_password(path: Union[str, Path]) -> bytes:
+    """Read a vault password file the same way ansible's FileVaultSecret does."""
+    path = Path(path).expanduser().resolve()
+    with open(path, "rb") as f:
+        return f.read().strip()
+
+
+@lru_cache(maxsize=1024)
+def _derive_keys(b_password: bytes, b_salt: bytes) -> Tuple[bytes, bytes, bytes]:
+    """Derive (cipher key, hmac key, counter iv) from password and salt."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=2 * KEY_LENGTH + IV_LENGTH,
+        salt=b_salt,
+        iterations=KDF_ITERATIONS,
+    )
+    derived = kdf.derive(b_password)
+    return (
+        derived[:KEY_LENGTH],
+        derived[KEY_LENGTH : 2 * KEY_LENGTH],
+        derived[2 * KEY_LENGTH : 2 * KEY_LENGTH + IV_LENGTH],
+    )
+
+
+def is_encrypted(data: Union[str, bytes]) -> bool:
+    """Return True if data starts with an ansible-vault header."""
+    return _to_bytes(data).startswith(VAULT_HEADER)
+
+
+def parse_envelope(vaulttext: bytes) -> Tuple[bytes, bytes, Optional[str]]:
+    """
+    Split a vault envelope into its hexlified payload, version and vault id.
+
+    Raises:
+        ValueError: If the data is not a supported ansible-vault envelope.
+    """
+    lines = _to_bytes(vaulttext).splitlines()
+    if not lines or not is_encrypted(lines[0]):
+        raise ValueError("Data is not an ansible-vault envelope")
+
+    header = lines[0].strip().split(b";")
+    if len(header) < 3:
+        raise ValueError(f"Invalid ansible-vault header: {lines[0]!r}")
+
+    version = header[1].strip()
+    cipher_name = header[2].strip()
+    if cipher_name != VAULT_CIPHER:
+        raise ValueError(f"Unsupported vault cipher: {cipher_name.decode()}")
+
+    vault_id = header[3].strip().decode("utf-8") if len(header) >= 4 else None
+    payload = b"".join(line.strip() for line in lines[1:])
+
+    return payload, version, vault_id
+
+
+def format_envelope(payload: bytes, vault_id: Optional[str] = None) -> bytes:
+    """Add the vault header and wrap the payload to 80 columns."""
+    header_parts = [VAULT_HEADER, b"1.1", VAULT_CIPHER]
+    if vault_id and vault_id != "default":
+        header_parts[1] = b"1.2"
+        header_parts.append(_to_bytes(vault_id))
+
+    lines = [b";".join(header_parts)]
+    lines += [payload[i : i + LINE_WIDTH] for i in range(0, len(payload), LINE_WIDTH)]
+    lines.append(b"")
+
+    return b"\n".join(lines)
+
+
+def encrypt_bytes(
+    plaintext: Union[str, bytes],
+    password: Union[str, bytes],
+    vault_id: Optional[str] = None,
+    salt: Optional[bytes] = None,
+) -> bytes:
+    """
+    Encrypt plaintext into a complete ansible-vault envelope.
+
+    Args:
+        plaintext: Data to encrypt.
+        password: Vault password (already stripped, as read from a password file).
+        vault_id: Optional vault identity; bumps the format to 1.2 when set.
+        salt: Optional fixed salt (ansible's VAULT_ENCRYPT_SALT); random by default.
+
+    Returns:
+        bytes: The vault envelope, ready to be written to a file.
+    """
+    b_salt = salt if salt is not None else os.urandom(SALT_LENGTH)
+    if not b_salt:
+        raise ValueError("Empty salt passed to encrypt_bytes()")
+
+    key1, key2, iv = _derive_keys(_to_bytes(password), _to_bytes(b_salt))
+
+    padder = padding.PKCS7(algorithms.AES.block_size).padder()
+    padded = padder.update(_to_bytes(plaintext)) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key1), modes.CTR(iv)).encryptor()
+    ciphertext = encryptor.update(padded) + encryptor.finalize()
+
+    signer = HMAC(key2, hashes.SHA256())
+    signer.update(ciphertext)
+    digest = signer.finalize()
+
+    payload = b"\n".join([hexlify(b_salt), hexlify(digest), hexlify(ciphertext)])
+    return format_envelope(hexlify(payload), vault_id)
+
+
+def decrypt_bytes(vaulttext: Union[str, bytes], password: Union[str, bytes]) -> bytes:
+    """
+    Decrypt an ansible-vault envelope.
+
+    Raises:
+        ValueError: If the envelope is malformed or the password is wrong.
+    """
+    payload, _version, _vault_id = parse_envelope(_to_bytes(vaulttext))
+    try:
+        b_salt, b_hmac, b_ciphertext = unhexlify(payload).split(b"\n", 2)
+        salt = unhexlify(b_salt)
+        expected_digest = unhexlify(b_hmac)
+        ciphertext = unhexlify(b_ciphertext)
+    except ValueError as e:
+        raise ValueError(f"Invalid ansible-vault payload: {e}")
+
+    key1, key2, iv = _derive_keys(_to_bytes(password), salt)
+
+    signer = HMAC(key2, hashes.SHA256())
+    signer.update(ciphertext)
+    if not _hmac.compare_digest(signer.finalize(), expected_digest):
+        raise ValueError("HMAC verification failed, wrong vault password?")
+
+    decryptor = Cipher(algorithms.AES(key1), modes.CTR(iv)).decryptor()
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    padded = decryptor.update(ciphertext) + decryptor.finalize()
+
+    return unpadder.update(padded) + unpadder.finalize()
+
+
+def get_vault_id(file: Union[str, Path]) -> Optional[str]:
+    """Return the vault id from the header of an encrypted file, if any."""
+    with open(Path(file).expanduser(), "rb") as f:
+        header = f.readline()
+    _payload, _version, vault_id = parse_envelope(header)
+    return vault_id
+
+
+def encrypt_file(
+    file: Union[str, Path],
+    plaintext: Union[str, bytes],
+    password: Union[str, bytes],
+    vault_id: Optional[str] = None,
+):
+    """Write plaintext to file as an ansible-vault envelope."""
+    file_path = Path(file).expanduser().resolve()
+    with open(file_path, "wb") as f:
+        f.write(encrypt_bytes(plaintext, password, vault_id=vault_id))
+
+
+def decrypt_file(file: Union[str, Path], password: Union[str, bytes]) -> bytes:
+    """Read and decrypt an ansible-vault encrypted file."""
+    file_path = Path(file).expanduser().resolve()
+    with open(file_path, "rb") as f:
+        return decrypt_bytes(f.read(), password)
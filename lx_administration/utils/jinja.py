@@ -0,0 +1,66 @@
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+DEFAULT_BYTECODE_CACHE_DIR = Path("./autoconf/cache/jinja")
+
+_environments: Dict[tuple, Environment] = {}
+_environments_lock = threading.Lock()
+
+
+def _bytecode_cache(directory: Optional[Path]) -> Optional[FileSystemBytecodeCache]:
+    if directory is None:
+        return None
+    try:
+        directory = Path(directory).expanduser().resolve()
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(directory.as_posix())
+
+
+def get_environment(
+    template_dir: str,
+    filters: Optional[Dict[str, Callable]] = None,
+    bytecode_cache_dir: Optional[Path] = DEFAULT_BYTECODE_CACHE_DIR,
+    **options: Any,
+) -> Environment:
+    """
+    Get the shared Jinja Environment for a template directory.
+
+    Environments are cached per (directory, filters, options), so templates
+    are parsed and compiled once per process and then served from the
+    environment's template cache. Compiled bytecode is also stored in
+    bytecode_cache_dir and reused across runs. Changed templates are still
+    picked up (auto_reload).
+
+    Args:
+        template_dir (str): Directory for the FileSystemLoader.
+        filters (Dict[str, Callable], optional): Custom filters to register.
+        bytecode_cache_dir (Path, optional): On-disk bytecode cache, None disables it.
+        **options: Further Environment options, e.g. trim_blocks=True.
+
+    Returns:
+        Environment: The cached environment.
+    """
+    key = (
+        Path(template_dir).expanduser().resolve().as_posix(),
+        tuple(sorted((filters or {}).items())),
+        None if bytecode_cache_dir is None else Path(bytecode_cache_dir).as_posix(),
+        tuple(sorted(options.items())),
+    )
+
+    with _environments_lock:
+        env = _environments.get(key)
+        if env is None:
+            env = Environment(
+                loader=FileSystemLoader(template_dir),
+                bytecode_cache=_bytecode_cache(bytecode_cache_dir),
+                **options,
+            )
+            env.filters.update(filters or {})
+            _environments[key] = env
+
+    return env
@@ -1,5 +1,6 @@
 from .checkfile import CheckFile, load_check_files, apply_checks
 from .dump import dump_yaml, format_yaml, ansible_lint
+from .loader import load_yaml, load_yaml_files
 
 __all__ = [
     "CheckFile",
@@ -8,4 +9,6 @@ __all__ = [
     "dump_yaml",
     "format_yaml",
     "ansible_lint",
+    "load_yaml",
+    "load_yaml_files",
 ]
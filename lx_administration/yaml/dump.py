@@ -1,4 +1,7 @@
+import os
 from pathlib import Path
+import tempfile
+from typing import Union
 import yaml
 from ruamel.yaml import YAML
 
@@ -8,13 +11,12 @@ def remove_trailing_spaces(content: str) -> str:
     return "\n".join(line.rstrip() for line in content.splitlines())
 
 
-def format_yaml(file: Path):
-    """Format YAML file while preserving quotes and removing trailing spaces."""
+def format_yaml_content(content: str) -> str:
+    """Format YAML content while preserving quotes and removing trailing spaces."""
     yaml_parser = YAML(typ="rt")
     yaml_parser.preserve_quotes = True
 
-    with open(file, "r") as fr:
-        data = yaml_parser.load(fr)
+    data = yaml_parser.load(content)
 
     yaml_parser.indent(mapping=2, sequence=4, offset=2)
 
@@ -29,9 +31,70 @@ def format_yaml(file: Path):
     if not formatted_content.endswith("\n"):
         formatted_content += "\n"
 
+    return formatted_content
+
+
+def format_yaml(file: Path):
+    """Format YAML file while preserving quotes and removing trailing spaces."""
+    with open(file, "r") as fr:
+        content = fr.read()
+
     # Then write the cleaned content to file
-    with open(file, "w") as fw:
-        fw.write(formatted_content)
+    write_atomic(file, format_yaml_content(content))
+
+
+class CanonicalDumper(yaml.SafeDumper):
+    """
+    SafeDumper emitting the layout format_yaml produces: block sequences
+    indented under their parent key and nulls written as empty values.
+    Unlike format_yaml, long plain scalars are not wrapped.
+    """
+
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+
+CanonicalDumper.add_representer(
+    type(None),
+    lambda dumper, _value: dumper.represent_scalar("tag:yaml.org,2002:null", ""),
+)
+
+
+def canonical_yaml(data) -> str:
+    """Serialize data to formatted YAML in a single pass."""
+    content = yaml.dump(
+        data,
+        Dumper=CanonicalDumper,
+        indent=2,
+        default_flow_style=False,
+        width=float("inf"),  # Prevent line wrapping
+    )
+    return remove_trailing_spaces(content) + "\n"
+
+
+def write_atomic(file: Path, content: Union[str, bytes]):
+    """Write content to a temp file next to file and rename it into place."""
+    file = Path(file)
+    fd, tmp_name = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if file.exists():
+            os.chmod(tmp_name, file.stat().st_mode & 0o7777)
+        else:
+            os.chmod(tmp_name, 0o666 & ~_get_umask())
+        os.replace(tmp_name, file)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _get_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
 
 
 def ansible_lint_and_format(file: Path):
@@ -46,20 +109,37 @@ def ansible_lint(file: Path):
     subprocess.run(["ansible-lint", file])
 
 
-def dump_yaml(data, file: Path, format_func=format_yaml, lint_func=None):
-    """Dump data to YAML file with directory creation."""
+def dump_yaml(
+    data, file: Path, format_func=format_yaml, lint_func=None, canonical=False
+):
+    """
+    Dump data to YAML file with directory creation.
+
+    The file is written through a temp file and rename, so an interrupted
+    dump never leaves a truncated file behind. With canonical=True the
+    formatted YAML is emitted directly by canonical_yaml; format_func is not
+    applied.
+    """
     # Ensure parent directory exists
     file = Path(file)  # Ensure we have a Path object
     file.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(file, "w") as f:
-        yaml.safe_dump(
+    if canonical:
+        content = canonical_yaml(data)
+        format_func = None
+    else:
+        content = yaml.safe_dump(
             data,
-            f,
             indent=2,
             default_flow_style=False,
             width=float("inf"),  # Prevent line wrapping
         )
+        # Format in memory so the target is only replaced once, atomically
+        if format_func is format_yaml:
+            content = format_yaml_content(content)
+            format_func = None
+
+    write_atomic(file, content)
 
     if format_func:
         format_func(file)
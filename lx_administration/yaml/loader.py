@@ -0,0 +1,126 @@
+"""
+Cached YAML loading for the inventory loaders.
+
+Files are parsed with libyaml's CSafeLoader when PyYAML was built with it.
+Parsed files are kept in a cache keyed by path, mtime and size. The cache
+lives in memory unless a cache file is set with set_yaml_cache_file (the
+autoconf pipeline script does); then it is persisted there, so unchanged
+files are not parsed again in later runs. Only point it at a file you
+trust, it is a pickle. Entries are stored pickled: every load returns a
+fresh object that callers may modify.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import pickle
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from .dump import write_atomic
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+CACHE_VERSION = 1
+
+_cache_file: Optional[Path] = None
+_cache: Optional[Dict[str, Tuple[int, int, bytes]]] = None
+_cache_dirty = False
+_cache_lock = threading.Lock()
+
+
+def set_yaml_cache_file(cache_file: Optional[Path]):
+    """Persist the cache to cache_file; None (the default) keeps it in memory only."""
+    global _cache_file, _cache, _cache_dirty
+
+    with _cache_lock:
+        _cache_file = None if cache_file is None else Path(cache_file)
+        _cache = None
+        _cache_dirty = False
+
+
+def _get_cache() -> Dict[str, Tuple[int, int, bytes]]:
+    global _cache
+
+    if _cache is None:
+        _cache = {}
+        if _cache_file is not None and _cache_file.exists():
+            try:
+                with open(_cache_file, "rb") as f:
+                    version, entries = pickle.load(f)
+                if version == CACHE_VERSION:
+                    _cache = entries
+            except Exception:
+                # unreadable cache, start over
+                pass
+    return _cache
+
+
+def save_yaml_cache():
+    """
+    Write the cache file if entries were added.
+
+    Entries of files that no longer exist are dropped.
+    """
+    global _cache_dirty
+
+    with _cache_lock:
+        if not _cache_dirty or _cache_file is None or _cache is None:
+            return
+
+        entries = {
+            path: entry for path, entry in _cache.items() if os.path.exists(path)
+        }
+        _cache_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(_cache_file, pickle.dumps((CACHE_VERSION, entries)))
+        _cache_dirty = False
+
+
+def load_yaml(file: Path) -> Any:
+    """Parse a YAML file (safe loader), using the cache."""
+    global _cache_dirty
+
+    key = os.path.abspath(file)
+    stat = os.stat(key)
+
+    with _cache_lock:
+        entry = _get_cache().get(key)
+    if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+        return pickle.loads(entry[2])
+
+    with open(key, "r") as f:
+        data = yaml.load(f, SafeLoader)
+
+    with _cache_lock:
+        _get_cache()[key] = (
+            stat.st_mtime_ns,
+            stat.st_size,
+            pickle.dumps(data, pickle.HIGHEST_PROTOCOL),
+        )
+        _cache_dirty = True
+
+    return data
+
+
+def load_yaml_files(files: Iterable[Path], jobs: Optional[int] = None) -> List[Any]:
+    """
+    Parse several YAML files on a thread pool and persist the cache.
+
+    Args:
+        files (Iterable[Path]): Files to load.
+        jobs (int, optional): Threads; None lets the executor decide.
+
+    Returns:
+        List[Any]: Parsed documents, in the order of files.
+    """
+    files = list(files)
+    if len(files) <= 1:
+        documents = [load_yaml(file) for file in files]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            documents = list(executor.map(load_yaml, files))
+
+    save_yaml_cache()
+    return documents
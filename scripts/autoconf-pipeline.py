@@ -1,14 +1,43 @@
+import argparse
 from pathlib import Path
 from lx_administration.autoconf.main import pipe as pipe
+from lx_administration.logging import enable_async_logging
+from lx_administration.logging.spans import enable_span_sink
+from lx_administration.yaml.loader import set_yaml_cache_file
 
 # Make sure Host Facts are available at ansible/cmdb
 # run scripts/ansible-cmdb.sh (if required)
 
 # Make sure Inventory is available at ansible/inventory
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the autoconf pipeline.")
+    parser.add_argument(
+        "--spans",
+        type=Path,
+        help="Append JSON-lines timing spans per phase and host to this file",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Render hosts in parallel on this many processes (0 uses all CPUs)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild all outputs, not only those whose inputs changed",
+    )
+    args = parser.parse_args()
+
     ansible_root = Path("./ansible")
     autoconf_out = Path("./autoconf")
     nix_out = Path(".")
 
-
-    pipe(ansible_root, autoconf_out, nix_out)
+    enable_async_logging()
+    set_yaml_cache_file(autoconf_out / "cache" / "yaml.pickle")
+    if args.spans:
+        enable_span_sink(args.spans)
+    summary = pipe(
+        ansible_root, autoconf_out, nix_out, jobs=args.jobs or None, full=args.full
+    )
+    print(", ".join(f"{status}: {len(paths)}" for status, paths in summary.items()))
@@ -40,10 +40,16 @@ def main(logger=None):
     vault.sync_inventory("./autoconf/inventory.yml", logger=logger)
 
     logger.info("Exporting Secrets...")
-    vault.export_secrets_by_client(logger=logger)
+    export = vault.export_secrets_by_client(logger=logger)
 
     logger.info(vault.summary())
 
+    if export.failed:
+        for hostname, failed in export.failed.items():
+            for target_name, error in failed.items():
+                logger.error(f"Not exported: {hostname}/{target_name}: {error}")
+        raise SystemExit(1)
+
 
 if __name__ == "__main__":
     main()
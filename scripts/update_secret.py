@@ -113,7 +113,9 @@ def parse_args():
 
 def main():
     args = parse_args()
-    vault = Vault.load_dir(args.vault_dir, args.vault_key)
+    vault = Vault.from_index(
+        args.vault_dir, args.vault_key, secret_names=[args.secret_name]
+    )
 
     if args.custom_value:
         new_value = args.custom_value
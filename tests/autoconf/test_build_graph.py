@@ -0,0 +1,88 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.autoconf.build_graph import BuildGraph, InventoryInputs
+
+
+class TestBuildGraph(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.inputs_dir = self.test_dir / "group_vars"
+        self.inputs_dir.mkdir()
+        self.input_file = self.inputs_dir / "all.yml"
+        self.input_file.write_text("a: 1\n")
+        self.output_file = self.test_dir / "merged_vars.yml"
+        self.output_file.write_text("a: 1\n")
+        self.graph_file = self.test_dir / "build_graph.json"
+
+        graph = BuildGraph()
+        graph.record(
+            "merged_vars/h", [self.output_file], [self.inputs_dir, self.input_file]
+        )
+        graph.record("merged_vars/gone", [self.output_file], [self.input_file])
+        graph.save(self.graph_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_current_until_input_changes(self):
+        self.assertTrue(BuildGraph.load(self.graph_file).is_current("merged_vars/h"))
+
+        self.input_file.write_text("a: 2\n")
+        self.assertFalse(BuildGraph.load(self.graph_file).is_current("merged_vars/h"))
+
+    def test_added_file_and_missing_output(self):
+        """A new file in an input directory or a deleted output invalidates."""
+        (self.inputs_dir / "new.yml").write_text("b: 1\n")
+        self.assertFalse(BuildGraph.load(self.graph_file).is_current("merged_vars/h"))
+
+        (self.inputs_dir / "new.yml").unlink()
+        self.output_file.unlink()
+        self.assertFalse(BuildGraph.load(self.graph_file).is_current("merged_vars/h"))
+
+    def test_save_drops_targets_not_seen(self):
+        graph = BuildGraph.load(self.graph_file)
+        graph.is_current("merged_vars/h")
+        graph.save(self.graph_file)
+
+        self.assertEqual(
+            list(BuildGraph.load(self.graph_file).targets), ["merged_vars/h"]
+        )
+        self.assertIsNone(BuildGraph().get_outputs("merged_vars/h"))
+
+    def test_old_graph_version_rebuilds(self):
+        """Graphs of an older version are dropped, everything is rebuilt."""
+        content = self.graph_file.read_text()
+        self.graph_file.write_text(content.replace('"version": 2', '"version": 1'))
+        self.assertFalse(BuildGraph.load(self.graph_file).is_current("merged_vars/h"))
+
+    def test_host_facts_are_inputs(self):
+        """Changing a host's cmdb facts file rebuilds that host only."""
+        ansible_root = self.test_dir / "ansible"
+        (ansible_root / "inventory").mkdir(parents=True)
+        (ansible_root / "inventory" / "hosts.ini").write_text("[all]\nh-01\nh-02\n")
+        facts_dir = ansible_root / "cmdb"
+        facts_dir.mkdir()
+        for hostname in ["h-01", "h-02"]:
+            (facts_dir / f"{hostname}.json").write_text("{}")
+
+        graph = BuildGraph()
+        inputs = InventoryInputs(ansible_root)
+        for hostname in ["h-01", "h-02"]:
+            graph.record(
+                f"merged_vars/{hostname}",
+                [self.output_file],
+                inputs.host_inputs(hostname, [], []),
+            )
+        graph.save(self.graph_file)
+
+        (facts_dir / "h-01.json").write_text('{"changed": true}')
+        graph = BuildGraph.load(self.graph_file)
+        self.assertFalse(graph.is_current("merged_vars/h-01"))
+        self.assertTrue(graph.is_current("merged_vars/h-02"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from lx_administration.autoconf.imports.utils import deep_merge, deep_update
+
+
+def _copying_deep_update(dict1, dict2):
+    # previous implementation, as reference
+    dict1 = dict1.copy()
+    for key, value in dict2.items():
+        if isinstance(value, dict) and key in dict1 and isinstance(dict1[key], dict):
+            dict1[key] = _copying_deep_update(dict1[key], value)
+        else:
+            dict1[key] = value
+    return dict1
+
+
+class TestDeepMerge(unittest.TestCase):
+    def setUp(self):
+        self.layers = [
+            {"a": 1, "b": {"x": 1, "y": {"p": 1}}, "c": {"k": 1}, "l": [1]},
+            {"b": {"y": {"q": 2}, "z": 2}, "c": "flat", "d": {"n": 1}},
+            {"a": {"now": "dict"}, "c": {"k": 3}, "b": {"x": 3}, "e": None},
+        ]
+
+    def test_same_result_as_chained_updates(self):
+        expected = {}
+        for layer in self.layers:
+            expected = _copying_deep_update(expected, layer)
+
+        merged = deep_merge(*self.layers)
+        self.assertEqual(merged, expected)
+        self.assertEqual(list(merged), list(expected))
+        self.assertEqual(list(merged["b"]), list(expected["b"]))
+        self.assertEqual(
+            deep_update(self.layers[0], self.layers[1]),
+            _copying_deep_update(*self.layers[:2]),
+        )
+
+    def test_structural_sharing(self):
+        """Only the result and merged paths are new, layers are untouched."""
+        merged = deep_merge(*self.layers)
+
+        self.assertIsNot(merged, self.layers[0])
+        self.assertIs(merged["d"], self.layers[1]["d"])
+        self.assertIs(merged["l"], self.layers[0]["l"])
+        self.assertIsNot(merged["b"], self.layers[0]["b"])
+        self.assertEqual(self.layers[0]["b"], {"x": 1, "y": {"p": 1}})
+        self.assertEqual(deep_merge({"only": 1}), {"only": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.autoconf.imports.hosts_ini import HostsIni, parse_hosts_ini
+
+HOSTS_INI = """[all]
+# Base Servers
+s-01 ansible_host=172.16.255.1
+gc-01 ansible_host=172.16.255.101
+ext-01 ansible_host=10.0.0.5
+
+[active_clients]
+s-01
+; commented-out
+gc-01
+
+[group_home_cli]
+gc-01
+gc-01
+[empty]
+"""
+
+
+class TestHostsIni(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.file = self.test_dir / "hosts.ini"
+        self.file.write_text(HOSTS_INI)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_membership_index(self):
+        hosts_ini = parse_hosts_ini(self.file)
+
+        self.assertEqual(
+            hosts_ini.groups, ["all", "active_clients", "group_home_cli", "empty"]
+        )
+        self.assertEqual(hosts_ini.hosts, ["s-01", "gc-01", "ext-01"])
+        self.assertEqual(
+            hosts_ini.groups_of_host("gc-01"),
+            ["all", "active_clients", "group_home_cli"],
+        )
+        self.assertEqual(hosts_ini.hosts_in_group("group_home_cli"), ["gc-01"])
+        self.assertEqual(hosts_ini.hosts_in_group("empty"), [])
+        self.assertEqual(hosts_ini.get_ansible_host("gc-01"), "172.16.255.101")
+
+    def test_subnet_index(self):
+        hosts_ini = parse_hosts_ini(self.file)
+        for subnet in ["172.16.255.", "172.16.255.0", "172.16.255"]:
+            self.assertEqual(hosts_ini.hosts_in_subnet(subnet), ["s-01", "gc-01"])
+        self.assertEqual(hosts_ini.hosts_in_subnet("10.0.0.0"), ["ext-01"])
+
+    def test_memoized_until_changed(self):
+        self.assertIs(parse_hosts_ini(self.file), parse_hosts_ini(self.file))
+        self.file.write_text("[all]\nnew-01\n")
+        self.assertEqual(parse_hosts_ini(self.file).hosts, ["new-01"])
+
+    def test_host_outside_group(self):
+        self.file.write_text("s-01\n[all]\n")
+        with self.assertRaises(ValueError):
+            HostsIni.parse(self.file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.autoconf.imports.inventory_manifest import scan_inventory
+from lx_administration.autoconf.imports.utils import load_home_host_vars, load_host_vars
+
+
+class TestInventoryManifest(unittest.TestCase):
+    def setUp(self):
+        self.inventory_dir = Path(tempfile.mkdtemp())
+        files = {
+            "hosts.ini": "[group_home_cli]\nh-01\n",
+            "host_vars/h-01.yml": "a: 1\n",
+            "host_vars/extra/h-01.yml": "b: 2\n",
+            "host_vars/homelab/h-02.yml": "c: 3\n",
+            "host_vars/home/h-01.yml": "home: true\n",
+            "group_vars/all.yml": "x: 1\n",
+            "group_vars/group_home_cli.yml": "cli: {enable: true}\n",
+            "role_vars/nginx/vars/main.yml": "nginx_port: 80\n",
+            "role_vars/empty/files/readme": "",
+        }
+        for rel_path, content in files.items():
+            path = self.inventory_dir / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.inventory_dir)
+
+    def _rel(self, paths):
+        return [p.relative_to(self.inventory_dir).as_posix() for p in paths]
+
+    def test_scan(self):
+        manifest = scan_inventory(self.inventory_dir)
+
+        self.assertEqual(
+            self._rel(manifest.host_vars),
+            [
+                "host_vars/extra/h-01.yml",
+                "host_vars/h-01.yml",
+                "host_vars/homelab/h-02.yml",
+            ],
+        )
+        self.assertEqual(
+            self._rel(manifest.home_host_vars), ["host_vars/home/h-01.yml"]
+        )
+        self.assertEqual(
+            self._rel(manifest.group_vars),
+            ["group_vars/all.yml", "group_vars/group_home_cli.yml"],
+        )
+        self.assertEqual(
+            self._rel(manifest.home_group_vars), ["group_vars/group_home_cli.yml"]
+        )
+        self.assertEqual(list(manifest.role_vars), ["nginx"])
+
+    def test_loaders_share_manifest(self):
+        manifest = scan_inventory(self.inventory_dir)
+
+        host_vars = load_host_vars(self.inventory_dir / "host_vars", manifest=manifest)
+        self.assertEqual(host_vars["h-01"], {"b": 2, "a": 1})
+        self.assertEqual(host_vars["h-02"], {"c": 3})
+
+        home_host_vars = load_home_host_vars(self.inventory_dir, manifest=manifest)
+        self.assertEqual(
+            home_host_vars, {"h-01": {"cli": {"enable": True}, "home": True}}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
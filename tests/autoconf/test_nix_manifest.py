@@ -0,0 +1,63 @@
+import logging
+import os
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.autoconf.nix.manifest import (
+    load_manifest,
+    remove_stale_files,
+    save_manifest,
+    summarize,
+)
+from lx_administration.autoconf.nix.utils import UNCHANGED, WRITTEN, write_nix_file
+
+
+class TestNixWrites(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.logger = logging.getLogger("test_nix_manifest")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_unchanged_file_is_not_rewritten(self):
+        path = self.test_dir / "default.nix"
+        self.assertEqual(write_nix_file("{ }\n", path, self.logger), WRITTEN)
+        os.utime(path, ns=(0, 0))
+
+        self.assertEqual(write_nix_file("{ }\n", path, self.logger), UNCHANGED)
+        self.assertEqual(path.stat().st_mtime_ns, 0)
+
+        self.assertEqual(write_nix_file("{ a = 1; }\n", path, self.logger), WRITTEN)
+        self.assertEqual(path.read_text(), "{ a = 1; }\n")
+
+    def test_stale_files_are_removed(self):
+        """Only files of the previous manifest missing from this run go."""
+        manifest_file = self.test_dir / "nix_manifest.json"
+        for name in ["a", "b", "manual"]:
+            (self.test_dir / name).mkdir()
+            (self.test_dir / name / "default.nix").write_text("{ }\n")
+        save_manifest(manifest_file, ["b/default.nix", "a/default.nix"])
+
+        previous = load_manifest(manifest_file)
+        removed = remove_stale_files(
+            previous, ["a/default.nix"], self.test_dir, self.logger
+        )
+
+        self.assertEqual(removed, ["b/default.nix"])
+        self.assertFalse((self.test_dir / "b").exists())
+        self.assertTrue((self.test_dir / "manual" / "default.nix").exists())
+        self.assertEqual(
+            summarize([("a/default.nix", UNCHANGED)], removed),
+            {
+                "written": [],
+                "unchanged": ["a/default.nix"],
+                "removed": ["b/default.nix"],
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
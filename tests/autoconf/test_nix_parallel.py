@@ -0,0 +1,42 @@
+import logging
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.autoconf.nix.parallel import run_per_host
+
+
+def _write_host(item, logger):
+    out_dir, hostname = item
+    logger.info(f"render {hostname}")
+    (Path(out_dir) / f"{hostname}.nix").write_text(hostname)
+    logger.warning(f"done {hostname}")
+
+
+class TestRunPerHost(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.items = [(self.test_dir.as_posix(), f"h-{i:02}") for i in range(8)]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _run(self, jobs):
+        logger = logging.getLogger(f"test_run_per_host_{jobs}")
+        with self.assertLogs(logger, level="INFO") as logs:
+            run_per_host(_write_host, self.items, logger, jobs=jobs)
+        return logs.output
+
+    def test_parallel_matches_serial(self):
+        """Worker output and replayed log records match a serial run."""
+        serial = [line.split(":", 2)[::2] for line in self._run(1)]
+        parallel = [line.split(":", 2)[::2] for line in self._run(3)]
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial[0], ["INFO", "render h-00"])
+        self.assertEqual(len(list(self.test_dir.glob("*.nix"))), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
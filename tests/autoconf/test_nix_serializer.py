@@ -0,0 +1,37 @@
+import unittest
+
+from lx_administration.autoconf.nix.serializer import to_nix, to_nix_expr
+
+
+class TestNixSerializer(unittest.TestCase):
+    def test_scalars(self):
+        self.assertEqual(to_nix("english"), '"english"')
+        self.assertEqual(
+            to_nix('"/etc/secrets/vault/smtp_pwd"'), '"/etc/secrets/vault/smtp_pwd"'
+        )
+        self.assertEqual(to_nix(True), "true")
+        self.assertEqual(to_nix(None), "null")
+        self.assertEqual(to_nix(3), "3")
+        self.assertEqual(to_nix('a"b${c}'), '"a\\"b\\${c}"')
+
+    def test_lists_and_attrsets(self):
+        """Lists and dicts nest, matching the format of the old list rewrite."""
+        self.assertEqual(to_nix(["gc-01.intern"]), '["gc-01.intern"]')
+        self.assertEqual(to_nix([]), "[]")
+        self.assertEqual(
+            to_nix({"enable": True, "ports": [22, 80], "gc-01": {"ip": "10.0.0.1"}}),
+            '{ enable = true; ports = [22 80]; gc-01 = { ip = "10.0.0.1"; }; }',
+        )
+        self.assertEqual(to_nix({"a.b": 1}), '{ "a.b" = 1; }')
+        self.assertEqual(to_nix({}), "{ }")
+
+    def test_expr_keeps_top_level_strings(self):
+        self.assertEqual(
+            to_nix_expr("pkgs.linuxPackages_6_12"), "pkgs.linuxPackages_6_12"
+        )
+        self.assertEqual(to_nix_expr('"x"'), '"x"')
+        self.assertEqual(to_nix_expr(["s-04"]), '["s-04"]')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.logging import (
+    disable_async_logging,
+    enable_async_logging,
+    get_logger,
+)
+
+
+class TestGetLogger(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.log_dir = self.test_dir / "nested" / "logs"
+
+    def tearDown(self):
+        disable_async_logging()
+        shutil.rmtree(self.test_dir)
+
+    def test_handlers_attached_once(self):
+        """Repeated calls reuse the logger's single file handler."""
+        for _ in range(5):
+            logger = get_logger("test-once", log_dir=self.log_dir)
+        logger.info("message")
+
+        self.assertEqual(len(logger.handlers), 1)
+        log_text = (self.log_dir / "test-once.log").read_text()
+        self.assertEqual(log_text.count("message"), 1)
+
+    def test_reset_truncates_in_place(self):
+        """reset=True empties the file through the existing handler."""
+        logger = get_logger("test-reset", log_dir=self.log_dir)
+        logger.info("old")
+        handler = logger.handlers[0]
+
+        logger = get_logger("test-reset", log_dir=self.log_dir, reset=True)
+        logger.info("new")
+
+        self.assertIs(logger.handlers[0], handler)
+        content = (self.log_dir / "test-reset.log").read_text()
+        self.assertNotIn("old", content)
+        self.assertIn("new", content)
+
+    def test_async_logging(self):
+        """Queued records reach their files once the listener is stopped."""
+        enable_async_logging()
+        logger = get_logger("test-async", log_dir=self.log_dir, reset=True)
+        for i in range(100):
+            logger.info(f"line {i}")
+        logger.debug("hidden")
+        disable_async_logging()
+
+        content = (self.log_dir / "test-async.log").read_text()
+        self.assertEqual(content.count("line"), 100)
+        self.assertNotIn("hidden", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.logging.spans import disable_span_sink, enable_span_sink, span
+
+
+class TestSpans(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.span_file = self.test_dir / "spans.jsonl"
+
+    def tearDown(self):
+        disable_span_sink()
+        shutil.rmtree(self.test_dir)
+
+    def _records(self):
+        with open(self.span_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_disabled_is_noop(self):
+        """Without a sink, spans write nothing."""
+        with span("phase"):
+            pass
+        self.assertFalse(self.span_file.exists())
+
+    def test_nested_spans(self):
+        """Spans record host, parent phase, timing and extra fields."""
+        enable_span_sink(self.span_file)
+
+        @span("outer")
+        def outer():
+            with span("inner", host="h-01", files=3):
+                pass
+
+        outer()
+        disable_span_sink()
+
+        inner, outer_record = self._records()
+        self.assertEqual(inner["phase"], "inner")
+        self.assertEqual(inner["host"], "h-01")
+        self.assertEqual(inner["parent"], "outer")
+        self.assertEqual(inner["files"], 3)
+        self.assertIsNone(outer_record["parent"])
+        self.assertGreaterEqual(outer_record["duration"], inner["duration"])
+        self.assertAlmostEqual(
+            outer_record["end"] - outer_record["start"],
+            outer_record["duration"],
+            places=4,
+        )
+
+    def test_error_status(self):
+        """A failing phase is recorded with status error and re-raises."""
+        enable_span_sink(self.span_file)
+        with self.assertRaises(RuntimeError):
+            with span("failing"):
+                raise RuntimeError("boom")
+        disable_span_sink()
+
+        self.assertEqual(self._records()[0]["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
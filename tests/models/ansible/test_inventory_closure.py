@@ -0,0 +1,88 @@
+import unittest
+
+from lx_administration.models.ansible import (
+    AnsibleInventory,
+    AnsibleInventoryGroup,
+    AnsibleInventoryHost,
+)
+from lx_administration.models.ansible.inventory import AnsibleInventoryRole
+
+
+class TestInventoryClosure(unittest.TestCase):
+    def setUp(self):
+        self.inventory = AnsibleInventory(
+            groups=[
+                AnsibleInventoryGroup(name="all", vars={"ansible_groups": ["common"]}),
+                AnsibleInventoryGroup(name="common", vars={"ansible_roles": ["base"]}),
+                AnsibleInventoryGroup(name="a", vars={"ansible_groups": ["b"]}),
+                AnsibleInventoryGroup(name="b", vars={"ansible_groups": ["a"]}),
+            ],
+            roles=[
+                AnsibleInventoryRole(name="base"),
+                AnsibleInventoryRole(name="web", vars={"ansible_roles": ["base"]}),
+            ],
+            all=[
+                AnsibleInventoryHost(
+                    hostname="h-01",
+                    ansible_group_names=["all"],
+                    ansible_role_names=["web"],
+                )
+            ],
+        )
+
+    def test_closure_order(self):
+        """Pulled in groups and roles come before the ones pulling them in."""
+        self.assertEqual(
+            self.inventory.resolve_host_closure("h-01"),
+            (["common", "all"], ["base", "web"]),
+        )
+
+    def test_cycle_and_invalidation(self):
+        host = self.inventory.get_host_by_name("h-01")
+        host.ansible_group_names.append("a")
+        group_names, _ = self.inventory.resolve_host_closure("h-01")
+        self.assertEqual(group_names, ["common", "all", "a", "b"])
+
+        self.inventory.add_group_by_name("extra")
+        self.assertIsNone(self.inventory._closures)
+        host.ansible_group_names.append("extra")
+        group_names, _ = self.inventory.resolve_host_closure("h-01")
+        self.assertEqual(group_names[-1], "extra")
+
+    def test_fleet_merged_vars(self):
+        """Hosts with the same closure share the merged group and role layers."""
+        self.inventory.get_group_by_name("common").vars["group_roles"] = {"x": "1"}
+        self.inventory.add_host(
+            AnsibleInventoryHost(
+                hostname="h-02",
+                ansible_group_names=["all"],
+                ansible_role_names=["web"],
+                vars={"host_roles": {"y": "2"}},
+            )
+        )
+
+        merged = self.inventory.export_fleet_merged_vars()
+        self.assertEqual(list(merged), ["h-01", "h-02"])
+        self.assertEqual(merged["h-02"]["group_roles"], {"x": "1"})
+        self.assertEqual(merged["h-02"]["host_roles"], {"y": "2"})
+        self.assertNotIn("host_roles", merged["h-01"])
+        self.assertEqual(len(self.inventory._merged_layers), 1)
+
+        # the shared layers are not exposed to in-place edits
+        merged["h-01"]["group_roles"]["x"] = "changed"
+        merged["h-01"]["ansible_groups"].append("extra")
+        self.assertEqual(merged["h-02"]["group_roles"], {"x": "1"})
+        self.assertEqual(merged["h-02"]["ansible_groups"], ["common"])
+        self.assertEqual(
+            self.inventory.export_merged_host_vars("h-02")["group_roles"], {"x": "1"}
+        )
+
+        # reloading or adding groups drops the memoized layers
+        (layers,) = self.inventory._merged_layers.values()
+        self.inventory.add_group_by_name("extra")
+        self.inventory.export_merged_host_vars("h-01")
+        self.assertIsNot(next(iter(self.inventory._merged_layers.values())), layers)
+
+
+if __name__ == "__main__":
+    unittest.main()
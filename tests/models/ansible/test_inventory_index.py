@@ -0,0 +1,37 @@
+import unittest
+
+from lx_administration.models.ansible import AnsibleInventory
+
+
+class TestInventoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.inventory = AnsibleInventory()
+        for hostname, ip in [("gc-1", "172.16.255.10"), ("gc-10", "172.16.255.1")]:
+            self.inventory.add_host_by_name(hostname)
+            self.inventory.set_ansible_host_ip(hostname, ip)
+        self.inventory.add_group_by_name("gpu_client")
+
+    def test_exact_matches(self):
+        """Names are matched exactly, not as substrings."""
+        self.assertFalse(self.inventory.group_name_exists("client"))
+        self.inventory.add_group_by_name("client")
+        self.assertEqual(self.inventory.get_group_names(), ["gpu_client", "client"])
+
+        self.assertEqual(self.inventory.get_host("172.16.255.1").hostname, "gc-10")
+        self.assertFalse(self.inventory.host_exists("172.16.255"))
+        self.assertFalse(self.inventory.get_host_by_name("gc"))
+
+    def test_indexes_follow_changes(self):
+        self.inventory.set_ansible_host_ip("gc-1", "172.16.255.11")
+        self.assertEqual(self.inventory.get_host("172.16.255.11").hostname, "gc-1")
+        self.assertFalse(self.inventory.host_exists("172.16.255.10"))
+
+        restored = AnsibleInventory.model_validate(self.inventory.model_dump())
+        self.assertEqual(
+            restored.get_host_by_name("gc-10").ansible_host, "172.16.255.1"
+        )
+        self.assertTrue(restored.group_name_exists("gpu_client"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from lx_administration.models.ansible import AnsibleInventory
+
+
+class TestInventoryLazyRoles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for role in ["base", "web"]:
+            vars_dir = self.root / "roles" / role / "vars"
+            vars_dir.mkdir(parents=True)
+            (vars_dir / "main.yml").write_text(f"{role}_port: '80'\n")
+
+        self.inventory = AnsibleInventory()
+        self.inventory.load_roles(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roles_read_on_lookup(self):
+        self.assertEqual(self.inventory.get_role_names(), ["base", "web"])
+        self.assertTrue(self.inventory.role_name_exists("web"))
+        self.assertFalse(self.inventory.roles.is_materialized())
+
+        # vars are read now, the role name prefix replaced
+        web = self.inventory.get_role_by_name("web")
+        self.assertEqual(web.vars, {"role_port": "80"})
+
+        # files changed after the first lookup are not read again
+        vars_file = self.root / "roles" / "web" / "vars" / "main.yml"
+        vars_file.write_text("web_port: '8080'\n")
+        web = self.inventory.get_role_by_name("web")
+        self.assertEqual(web.vars, {"role_port": "80"})
+
+    def test_validate_reads_all_roles(self):
+        self.inventory.validate()
+        self.assertTrue(self.inventory.roles.is_materialized())
+        dumped = self.inventory.model_dump()
+        self.assertEqual([_["name"] for _ in dumped["roles"]], ["base", "web"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace
+
+from lx_administration.models.indexing import NameIndex, TrackedList
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.items = [SimpleNamespace(name="a"), SimpleNamespace(name="b")]
+        self.index = NameIndex("name")
+
+    def test_get(self):
+        """Lookups return the matching item or None."""
+        self.assertIs(self.index.get(self.items, "b"), self.items[1])
+        self.assertIsNone(self.index.get(self.items, "missing"))
+
+    def test_add_and_external_extend(self):
+        """Items added via add() or appended to the list directly are found."""
+        added = SimpleNamespace(name="c")
+        self.items.append(added)
+        self.index.add(self.items, added)
+        self.assertIs(self.index.get(self.items, "c"), added)
+
+        extended = SimpleNamespace(name="d")
+        self.items.extend([extended])
+        self.assertIs(self.index.get(self.items, "d"), extended)
+
+    def test_duplicates(self):
+        """Duplicate keys raise on get() like the linear lookups did."""
+        duplicate = SimpleNamespace(name="a")
+        self.items.append(duplicate)
+        with self.assertRaises(ValueError):
+            self.index.get(self.items, "a")
+        self.assertIs(self.index.get_first(self.items, "a"), self.items[0])
+        self.assertEqual(len(self.index.get_all(self.items, "a")), 2)
+
+    def test_tracked_list_same_length_changes(self):
+        """Remove + append and in-place replacement keep the length but are seen."""
+        items = TrackedList(self.items)
+        self.assertIs(self.index.get(items, "a"), items[0])
+
+        items.remove(items[0])
+        items.append(SimpleNamespace(name="c"))
+        self.assertIsNone(self.index.get(items, "a"))
+        self.assertIs(self.index.get(items, "c"), items[1])
+
+        items[0] = SimpleNamespace(name="e")
+        self.assertIsNone(self.index.get(items, "b"))
+        self.assertIs(self.index.get(items, "e"), items[0])
+
+        added = SimpleNamespace(name="f")
+        items.append(added)
+        self.index.add(items, added)
+        self.assertIs(self.index.get(items, "f"), added)
+
+    def test_plain_list_same_length_changes(self):
+        """Plain lists carry no version and are re-indexed on every lookup."""
+        self.assertIs(self.index.get(self.items, "a"), self.items[0])
+        self.items[0] = SimpleNamespace(name="c")
+        self.assertIsNone(self.index.get(self.items, "a"))
+        self.assertIs(self.index.get(self.items, "c"), self.items[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+import yaml
+
+from lx_administration.models import Vault
+from lx_administration.models.lazy import LazyItem, LazyModelList
+from lx_administration.models.vault import PreSharedKey, Secret
+
+
+def _raw_secret(i):
+    return {
+        "name": f"secret_{i}",
+        "file": f"/tmp/secret_{i}",
+        "owner_type": "roles",
+        "template_name": "role1",
+        "target_name": f"target_{i}",
+    }
+
+
+class TestLazyModelList(unittest.TestCase):
+    def setUp(self):
+        self.items = LazyModelList(Secret, [_raw_secret(i) for i in range(3)])
+
+    def test_validates_on_access(self):
+        """Only accessed items are validated and cached in place."""
+        self.assertIsInstance(self.items[1], Secret)
+        self.assertIs(self.items[1], self.items[1])
+        self.assertIsInstance(list.__getitem__(self.items, 0), dict)
+        self.assertFalse(self.items.is_materialized())
+
+        self.assertEqual(
+            [s.name for s in self.items], ["secret_0", "secret_1", "secret_2"]
+        )
+        self.assertTrue(self.items.is_materialized())
+
+    def test_stream_does_not_cache(self):
+        """stream() yields models but leaves the raw items untouched."""
+        self.assertTrue(all(isinstance(s, Secret) for s in self.items.stream()))
+        self.assertIsInstance(list.__getitem__(self.items, 0), dict)
+
+    def test_lazy_item(self):
+        """LazyItems are loaded on access; a subclass without load() is rejected."""
+
+        class RawSecret(LazyItem):
+            def load(self):
+                return _raw_secret(3)
+
+        class Incomplete(LazyItem):
+            pass
+
+        items = LazyModelList(Secret, [RawSecret()])
+        self.assertFalse(items.is_materialized())
+        self.assertEqual(items[0].name, "secret_3")
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_comparisons(self):
+        """Membership and equality work on validated models."""
+        secret = Secret.model_validate(_raw_secret(2))
+        self.assertIn(secret, self.items)
+        self.assertEqual(self.items.index(secret), 2)
+        self.assertEqual(
+            self.items, [Secret.model_validate(_raw_secret(i)) for i in range(3)]
+        )
+
+
+class TestLazyVault(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.vault_file = self.test_dir / "vault.yml"
+        with open(self.vault_file, "w") as f:
+            yaml.safe_dump(
+                {
+                    "dir": self.test_dir.as_posix(),
+                    "secrets": [_raw_secret(i) for i in range(5)],
+                    "pre_shared_keys": [
+                        {"name": name, "file": (self.test_dir / name).as_posix()}
+                        for name in ["h-01", "h-02"]
+                    ],
+                },
+                f,
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_lazy_lookups(self):
+        """summary() and name lookups only validate what they return."""
+        (self.test_dir / "h-02").write_text("password")
+        vault = Vault.load_dir(self.test_dir.as_posix(), lazy=True)
+        self.assertIn("Secrets: 5", vault.summary())
+
+        psk = vault.get_client_psk("h-02")
+        self.assertIsInstance(psk, PreSharedKey)
+        self.assertIsInstance(list.__getitem__(vault.pre_shared_keys, 0), dict)
+
+        self.assertEqual(vault.get_secret_by_name("secret_3").target_name, "target_3")
+        self.assertFalse(vault.secrets.is_materialized())
+
+    def test_lazy_save_matches_eager(self):
+        """Saving a lazy vault writes the same vault.yml as an eager one."""
+        Vault.load_dir(self.test_dir.as_posix()).save_to_file(self.vault_file)
+        eager_content = self.vault_file.read_text()
+
+        lazy_vault = Vault.load_dir(self.test_dir.as_posix(), lazy=True)
+        lazy_vault.save_to_file(self.vault_file)
+        self.assertEqual(self.vault_file.read_text(), eager_content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -194,6 +194,7 @@ class TestVaultModel(unittest.TestCase):
             "subnet": self.vault.subnet,
             "secret_templates": [],
             "pre_shared_keys": [],
+            "encryption_engine": "native",
         }
 
         # Call the method under test
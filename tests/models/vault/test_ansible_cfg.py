@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.models import Vault
+from lx_administration.models.ansible import AnsibleInventory, AnsibleInventoryHost
+from lx_administration.models.vault import AnsibleCfg
+
+
+class TestAnsibleCfgSession(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.cfg_path = (self.test_dir / "ansible.cfg").as_posix()
+        self.pwd_files = []
+        for name in ["h-01", "h-02"]:
+            pwd_file = self.test_dir / f"{name}.psk"
+            pwd_file.write_text("password")
+            self.pwd_files.append(pwd_file.as_posix())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_single_write(self):
+        """A session writes once, drops missing files and skips no-op commits."""
+        with patch.object(AnsibleCfg, "save_to_file", autospec=True) as mock_save:
+            with AnsibleCfg.session(self.cfg_path) as session:
+                session.ensure_vault_id_pwdfile("h-01", self.pwd_files[0])
+                session.ensure_vault_id_pwdfile("h-02", self.pwd_files[1])
+                session.ensure_vault_id_pwdfile("gone", "/nonexistent/psk")
+            mock_save.assert_called_once()
+
+        with AnsibleCfg.session(self.cfg_path) as session:
+            session.ensure_vault_id_pwdfile("h-01", self.pwd_files[0])
+            session.ensure_vault_id_pwdfile("h-02", self.pwd_files[1])
+            session.ensure_vault_id_pwdfile("gone", "/nonexistent/psk")
+
+        vid_dict = AnsibleCfg.from_file(self.cfg_path).defaults.get_vid_dict()
+        self.assertEqual(
+            vid_dict, {"h-01": self.pwd_files[0], "h-02": self.pwd_files[1]}
+        )
+
+        with patch.object(AnsibleCfg, "save_to_file") as mock_save:
+            with AnsibleCfg.session(self.cfg_path) as session:
+                session.ensure_vault_id_pwdfile("h-01", self.pwd_files[0])
+            mock_save.assert_not_called()
+
+    def test_sync_client_psk_writes_once(self):
+        """Syncing PSKs for all hosts rewrites ansible.cfg a single time."""
+        vault = Vault(
+            dir=self.test_dir.as_posix(),
+            ansible_cfg_path=self.cfg_path,
+            inventory=AnsibleInventory(
+                all=[AnsibleInventoryHost(hostname=f"h-{i:02}") for i in range(5)]
+            ),
+        )
+
+        with patch.object(
+            AnsibleCfg, "from_file", wraps=AnsibleCfg.from_file
+        ) as mock_load:
+            created = vault._sync_client_psk()
+            self.assertEqual(mock_load.call_count, 1)
+
+        self.assertEqual(len(created), 5)
+        vid_dict = AnsibleCfg.from_file(self.cfg_path).defaults.get_vid_dict()
+        self.assertEqual(sorted(vid_dict), [f"h-{i:02}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+from lx_administration.models import Vault
+from lx_administration.models.ansible import AnsibleInventory, AnsibleInventoryHost
+from lx_administration.models.vault import Secret, SecretTemplate
+from lx_administration.models.vault.assignment import SecretAssignment
+
+
+def _template(name, owner_type):
+    return SecretTemplate(
+        name=name,
+        owner_type=owner_type,
+        secret_type="password",
+        secret_names=[f"{name}_secret"],
+    )
+
+
+def _secret(name, owner_type):
+    return Secret(
+        name=f"{name}_secret",
+        file=f"/tmp/{name}.secret",
+        owner_type=owner_type,
+        template_name=name,
+        target_name=f"{name}_target",
+    )
+
+
+class TestSecretAssignment(unittest.TestCase):
+    def setUp(self):
+        self.owners = [
+            ("role1", "roles"),
+            ("group1", "groups"),
+            ("admin@h-01", "local"),
+            ("h-02", "clients"),
+            ("role2", "roles"),
+        ]
+        self.hosts = [
+            AnsibleInventoryHost(
+                hostname="h-01",
+                ansible_role_names=["role1", "role2"],
+                ansible_group_names=["group1"],
+            ),
+            AnsibleInventoryHost(hostname="h-02", ansible_role_names=["role2"]),
+        ]
+        self.templates = [_template(name, owner) for name, owner in self.owners]
+
+    def test_resolve_hosts_matches_resolve_host(self):
+        """The whole-inventory pass agrees with per-host resolution."""
+        assignment = SecretAssignment(self.templates)
+        assigned = assignment.resolve_hosts(self.hosts)
+
+        for host in self.hosts:
+            self.assertEqual(
+                assigned[host.hostname],
+                assignment.resolve_host(
+                    host.hostname, host.ansible_role_names, host.ansible_group_names
+                ),
+            )
+        self.assertEqual(
+            [st.name for st in assigned["h-01"]],
+            ["role1", "group1", "admin@h-01", "role2"],
+        )
+        self.assertEqual([st.name for st in assigned["h-02"]], ["role2"])
+
+    def test_unknown_owner_type(self):
+        """Templates with an unknown owner_type are rejected."""
+        template = _template("x", "roles")
+        template.owner_type = "unknown"
+        with self.assertRaises(ValueError):
+            SecretAssignment([template])
+
+    def test_vault_host_secret_map_cache(self):
+        """The vault map is cached and rebuilt when templates change."""
+        vault = Vault(
+            inventory=AnsibleInventory(all=self.hosts),
+            secret_templates=self.templates[:2],
+            secrets=[_secret(name, owner) for name, owner in self.owners],
+        )
+
+        first = vault.get_host_secret_map()
+        self.assertIs(vault.get_host_secret_map(), first)
+        self.assertEqual(len(first["h-01"]), 2)
+        self.assertEqual(vault.get_host_secrets("h-01"), first["h-01"])
+
+        vault.add_secret_template(self.templates[2])
+        second = vault.get_host_secret_map()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second["h-01"]), 3)
+        self.assertEqual(vault.get_host_secrets("h-01"), second["h-01"])
+
+    def test_vault_caches_see_in_place_edits(self):
+        """Editing a template or host in place invalidates the cached map."""
+        vault = Vault(
+            inventory=AnsibleInventory(all=self.hosts),
+            secret_templates=self.templates[:2],
+            secrets=[_secret(name, owner) for name, owner in self.owners],
+        )
+        self.assertEqual(len(vault.get_host_secret_map()["h-02"]), 0)
+
+        vault.secret_templates[0].owner_type = "groups"
+        vault.secret_templates[0].name = "group1"
+        vault.secret_templates[0].secret_names[0] = "group1_secret"
+        self.assertEqual(len(vault.get_host_secrets("h-01")), 2)
+        self.assertEqual(
+            [s.name for s in vault.get_host_secret_map()["h-01"]],
+            ["group1_secret", "group1_secret"],
+        )
+
+        vault.inventory.get_host_by_name("h-02").ansible_group_names.append("group1")
+        self.assertEqual(len(vault.get_host_secret_map()["h-02"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.models import Vault
+from lx_administration.models.ansible import AnsibleInventory, AnsibleInventoryHost
+from lx_administration.models.vault import PreSharedKey, Secret, SecretTemplate
+from lx_administration.models.vault import vault_lib
+
+
+class TestExportSecretsByClient(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.hostnames = ["h-01", "h-02", "h-03"]
+
+        pre_shared_keys = []
+        for name in ["local-host"] + self.hostnames:
+            psk_file = self.test_dir / "psk" / f"{name}.psk"
+            psk_file.parent.mkdir(parents=True, exist_ok=True)
+            psk_file.write_text(f"{name}-password\n")
+            pre_shared_keys.append(PreSharedKey(name=name, file=psk_file.as_posix()))
+
+        self.vault = Vault(
+            dir=self.test_dir.as_posix(),
+            ansible_cfg_path=(self.test_dir / "ansible.cfg").as_posix(),
+            pre_shared_keys=pre_shared_keys,
+            inventory=AnsibleInventory(
+                all=[
+                    AnsibleInventoryHost(hostname=name, ansible_role_names=["role1"])
+                    for name in self.hostnames
+                ]
+            ),
+        )
+
+        self.gethostname = patch("socket.gethostname", return_value="local-host")
+        self.gethostname.start()
+
+        secret_file = self.test_dir / "secrets" / "role1_pw"
+        secret_file.parent.mkdir(parents=True)
+        Secret.create_secret("role-secret", secret_file.as_posix(), self.vault)
+        self.vault.secret_templates.append(
+            SecretTemplate(
+                name="role1",
+                owner_type="roles",
+                secret_type="system_password",
+                secret_names=["role1_pw"],
+            )
+        )
+        self.vault.secrets.append(
+            Secret(
+                name="role1_pw",
+                file=secret_file.as_posix(),
+                owner_type="roles",
+                template_name="role1",
+                target_name="SCRT_roles_system_password_role1_pw",
+            )
+        )
+
+    def tearDown(self):
+        self.gethostname.stop()
+        shutil.rmtree(self.test_dir)
+
+    def _assert_deployed(self):
+        for hostname in self.hostnames:
+            target = (
+                self.test_dir
+                / "deploy"
+                / hostname
+                / "SCRT_roles_system_password_role1_pw"
+            )
+            self.assertIsNone(vault_lib.get_vault_id(target))
+            self.assertEqual(
+                vault_lib.decrypt_file(target, f"{hostname}-password"),
+                b"role-secret",
+            )
+
+    def test_export_serial(self):
+        """A single worker re-keys every secret for every host PSK."""
+        self.vault.export_secrets_by_client(workers=1)
+        self._assert_deployed()
+
+    def test_export_process_pool(self):
+        """The process pool produces the same deploy tree."""
+        self.vault.export_secrets_by_client(workers=2)
+        self._assert_deployed()
+
+    def test_export_decrypts_each_source_once(self):
+        """Each source secret is decrypted once regardless of host count."""
+        with patch.object(
+            vault_lib, "decrypt_file", wraps=vault_lib.decrypt_file
+        ) as mock_decrypt:
+            self.vault.export_secrets_by_client(workers=1)
+            self.assertEqual(mock_decrypt.call_count, 1)
+
+    def test_incremental_export_skips_unchanged(self):
+        """A rerun without changes does not rewrite any deploy file."""
+        self.vault.export_secrets_by_client(workers=1)
+        with patch.object(vault_lib, "encrypt_bytes") as mock_encrypt:
+            self.vault.export_secrets_by_client(workers=1)
+            mock_encrypt.assert_not_called()
+        self._assert_deployed()
+
+    def test_incremental_export_changed_psk(self):
+        """Only the host whose PSK changed is re-keyed."""
+        self.vault.export_secrets_by_client(workers=1)
+        (self.test_dir / "psk" / "h-02.psk").write_text("h-02-password")
+        with patch.object(
+            vault_lib, "encrypt_bytes", wraps=vault_lib.encrypt_bytes
+        ) as mock_encrypt:
+            self.vault.export_secrets_by_client(workers=1)
+            self.assertEqual(mock_encrypt.call_count, 1)
+        self._assert_deployed()
+
+    def test_incremental_export_removes_orphans(self):
+        """Files and hosts that are no longer exported are deleted."""
+        self.vault.export_secrets_by_client(workers=1)
+        orphan_file = self.test_dir / "deploy" / "h-01" / "stale"
+        orphan_file.write_text("stale")
+        self.vault.inventory.all.pop()
+        self.vault.export_secrets_by_client(workers=1)
+
+        self.assertFalse(orphan_file.exists())
+        self.assertFalse((self.test_dir / "deploy" / "h-03").exists())
+
+    def test_failed_rekey_removes_outdated_file(self):
+        """A target that fails to re-key is deleted and reported, not kept."""
+        self.vault.export_secrets_by_client(workers=1)
+        target = (
+            self.test_dir / "deploy" / "h-02" / "SCRT_roles_system_password_role1_pw"
+        )
+        (self.test_dir / "psk" / "h-02.psk").write_text("h-02-new-password")
+
+        with patch.object(vault_lib, "encrypt_bytes", side_effect=OSError("disk full")):
+            manifest = self.vault.export_secrets_by_client(workers=1)
+
+        self.assertFalse(target.exists())
+        self.assertEqual(
+            manifest.failed,
+            {"h-02": {"SCRT_roles_system_password_role1_pw": "disk full"}},
+        )
+        self.assertNotIn(
+            "SCRT_roles_system_password_role1_pw", manifest.hosts["h-02"].files
+        )
+        self.assertTrue((self.test_dir / "deploy" / "h-01" / target.name).exists())
+
+        # the next run re-keys it
+        manifest = self.vault.export_secrets_by_client(workers=1)
+        self.assertEqual(manifest.failed, {})
+        self.assertEqual(
+            vault_lib.decrypt_file(target, "h-02-new-password"), b"role-secret"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
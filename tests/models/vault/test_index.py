@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import os
+import shutil
+import tempfile
+
+from lx_administration.models import Vault
+from lx_administration.models.vault import PreSharedKey, Secret
+from lx_administration.models.vault.index import VAULT_INDEX_FILE, VaultIndex
+
+
+class TestVaultIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.vault_file = self.test_dir / "vault.yml"
+        self.index_file = self.test_dir / VAULT_INDEX_FILE
+        self.vault = Vault(
+            dir=self.test_dir.as_posix(),
+            subnet="10.0.0.",
+            secrets=[
+                Secret(
+                    name=f"secret_{i}",
+                    file=(self.test_dir / f"secret_{i}").as_posix(),
+                    owner_type="roles",
+                    template_name="role1",
+                    target_name=f"target_{i}",
+                )
+                for i in range(5)
+            ],
+            pre_shared_keys=[
+                PreSharedKey(name=name, file=(self.test_dir / name).as_posix())
+                for name in ["local-host", "h-01"]
+            ],
+        )
+
+        self.gethostname = patch("socket.gethostname", return_value="local-host")
+        self.gethostname.start()
+
+    def tearDown(self):
+        self.gethostname.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_save_writes_index(self):
+        """Saving the vault writes an index matching vault.yml."""
+        self.vault.save_to_file(self.vault_file)
+        with VaultIndex(self.index_file) as index:
+            self.assertTrue(index.is_current(self.vault_file))
+            self.assertEqual(index.count("secret"), 5)
+            self.assertEqual(index.get_settings()["subnet"], "10.0.0.")
+
+    def test_from_index_loads_named_entries(self):
+        """from_index only loads the requested secrets and the local PSK."""
+        self.vault.save_to_file(self.vault_file)
+
+        with patch.object(Vault, "load_dir") as mock_load_dir:
+            vault = Vault.from_index(
+                self.test_dir.as_posix(), secret_names=["secret_3"]
+            )
+            mock_load_dir.assert_not_called()
+
+        self.assertEqual([s.name for s in vault.secrets], ["secret_3"])
+        self.assertEqual([p.name for p in vault.pre_shared_keys], ["local-host"])
+        self.assertEqual(vault.subnet, "10.0.0.")
+        with self.assertRaises(ValueError):
+            vault.save_to_file(self.vault_file)
+
+    def test_from_index_rebuilds_stale_index(self):
+        """A vault.yml changed behind the index's back triggers a rebuild."""
+        self.vault.save_to_file(self.vault_file)
+        with open(self.vault_file, "a") as f:
+            f.write("# edited\n")
+        os.utime(self.vault_file, ns=(0, 0))
+
+        vault = Vault.from_index(self.test_dir.as_posix(), secret_names=["secret_0"])
+        self.assertEqual([s.name for s in vault.secrets], ["secret_0"])
+        with VaultIndex(self.index_file) as index:
+            self.assertTrue(index.is_current(self.vault_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
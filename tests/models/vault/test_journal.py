@@ -0,0 +1,150 @@
+from datetime import datetime
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.models import Vault
+from lx_administration.models.vault import PreSharedKey, Secret
+from lx_administration.models.vault.journal import (
+    VAULT_JOURNAL_FILE,
+    append_entries,
+    read_entries,
+)
+
+# set on the secrets a test updates, so the journaled change is visible
+UPDATED = datetime(2026, 1, 1)
+
+
+class TestVaultJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.vault_file = self.test_dir / "vault.yml"
+        self.journal_file = self.test_dir / VAULT_JOURNAL_FILE
+
+        psk_file = self.test_dir / "local-host.psk"
+        psk_file.write_text("psk-password\n")
+        self.vault = Vault(
+            dir=self.test_dir.as_posix(),
+            ansible_cfg_path=(self.test_dir / "ansible.cfg").as_posix(),
+            pre_shared_keys=[PreSharedKey(name="local-host", file=psk_file.as_posix())],
+            secrets=[
+                Secret(
+                    name=f"secret_{i}",
+                    file=(self.test_dir / f"secret_{i}").as_posix(),
+                    owner_type="roles",
+                    template_name="role1",
+                    target_name=f"target_{i}",
+                )
+                for i in range(3)
+            ],
+        )
+
+        self.gethostname = patch("socket.gethostname", return_value="local-host")
+        self.gethostname.start()
+        self.vault.save_to_file()
+
+    def tearDown(self):
+        self.gethostname.stop()
+        shutil.rmtree(self.test_dir)
+
+    def _update(self, vault, name, value):
+        vault.get_secret_by_name(name).updated = UPDATED
+        vault.update_secret_value(name, value)
+
+    def test_update_is_journaled_and_replayed(self):
+        """Secret updates append to the journal and survive a reload."""
+        vault_content = self.vault_file.read_text()
+        self._update(self.vault, "secret_1", "new-value")
+
+        self.assertEqual(self.vault_file.read_text(), vault_content)
+        self.assertEqual(len(read_entries(self.journal_file)), 1)
+
+        for lazy in (False, True):
+            reloaded = Vault.load_dir(self.test_dir.as_posix(), lazy=lazy)
+            self.assertEqual(reloaded.get_secret_by_name("secret_1").updated, UPDATED)
+            self.assertIsNone(reloaded.get_secret_by_name("secret_0").updated)
+            self.assertEqual(len(reloaded.secrets), 3)
+
+        reloaded.save_to_file()
+        self.assertFalse(self.journal_file.exists())
+        reloaded = Vault.load_dir(self.test_dir.as_posix())
+        self.assertEqual(reloaded.get_secret_by_name("secret_1").updated, UPDATED)
+
+    def test_update_keeps_timestamps(self):
+        """Journaling an update does not stamp the secret."""
+        self.vault.update_secret_value("secret_1", "new-value")
+        (entry,) = read_entries(self.journal_file)
+        self.assertNotIn("updated", entry["data"])
+
+    def test_compaction(self):
+        """Reaching the threshold folds the journal into vault.yml."""
+        with patch(
+            "lx_administration.models.vault.manager.JOURNAL_COMPACT_THRESHOLD", 2
+        ):
+            self._update(self.vault, "secret_0", "a")
+            self.assertTrue(self.journal_file.exists())
+            self._update(self.vault, "secret_2", "b")
+
+        self.assertFalse(self.journal_file.exists())
+        self.assertIn("updated", self.vault_file.read_text())
+
+    def test_partial_vault_compaction(self):
+        """A partial vault compacts through a full load of the vault."""
+        with patch(
+            "lx_administration.models.vault.manager.JOURNAL_COMPACT_THRESHOLD", 2
+        ):
+            partial = Vault.from_index(
+                self.test_dir.as_posix(), secret_names=["secret_0", "secret_2"]
+            )
+            self._update(partial, "secret_0", "a")
+            self.assertTrue(self.journal_file.exists())
+            self._update(partial, "secret_2", "b")
+
+        self.assertFalse(self.journal_file.exists())
+        reloaded = Vault.load_dir(self.test_dir.as_posix())
+        self.assertEqual(len(reloaded.secrets), 3)
+        self.assertEqual(reloaded.get_secret_by_name("secret_2").updated, UPDATED)
+
+    def test_save_keeps_entries_appended_later(self):
+        """Saving only drops the journal entries the saved vault had replayed."""
+        self._update(self.vault, "secret_0", "a")
+        loaded = Vault.load_dir(self.test_dir.as_posix())
+
+        # appended by another process after `loaded` read the journal
+        other = Vault.load_dir(self.test_dir.as_posix())
+        self._update(other, "secret_1", "b")
+
+        loaded.save_to_file()
+        self.assertEqual(
+            [e["data"]["name"] for e in read_entries(self.journal_file)], ["secret_1"]
+        )
+        reloaded = Vault.load_dir(self.test_dir.as_posix())
+        self.assertEqual(reloaded.get_secret_by_name("secret_0").updated, UPDATED)
+        self.assertEqual(reloaded.get_secret_by_name("secret_1").updated, UPDATED)
+
+    def test_append_counts_from_position(self):
+        entry = {"op": "secret", "data": {"name": "x"}}
+        position = append_entries(self.journal_file, [entry, entry])
+        self.assertEqual(position.entries, 2)
+        self.assertEqual(position.offset, self.journal_file.stat().st_size)
+
+        append_entries(self.journal_file, [entry])  # another writer
+        position = append_entries(self.journal_file, [entry], position)
+        self.assertEqual(position.entries, 4)
+
+    def test_torn_line(self):
+        """A line torn by a crash is skipped and does not corrupt later appends."""
+        entry = {"op": "secret", "data": {"name": "x"}}
+        append_entries(self.journal_file, [entry])
+        with open(self.journal_file, "a") as f:
+            f.write('{"op": "secr')
+
+        self.assertEqual(read_entries(self.journal_file), [entry])
+        self.assertEqual(append_entries(self.journal_file, [entry]).entries, 3)
+        self.assertEqual(read_entries(self.journal_file), [entry, entry])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+import shutil
+import tempfile
+
+from ansible.parsing.vault import VaultLib, VaultSecret
+
+from lx_administration.models import Vault
+from lx_administration.models.vault import PreSharedKey, Secret
+from lx_administration.models.vault import vault_lib
+
+
+class TestVaultLib(unittest.TestCase):
+    def setUp(self):
+        self.salt = b"0123456789abcdef0123456789abcdef"
+
+    def test_roundtrip(self):
+        """Encrypted data decrypts back to the original plaintext."""
+        vaulttext = vault_lib.encrypt_bytes("top secret", b"password", "gc-06")
+        self.assertEqual(vault_lib.decrypt_bytes(vaulttext, "password"), b"top secret")
+
+    def test_header_with_vault_id(self):
+        """A vault id bumps the format to 1.2 and is written to the header."""
+        vaulttext = vault_lib.encrypt_bytes("x", b"pw", vault_id="gc-06")
+        header = vaulttext.splitlines()[0]
+        self.assertEqual(header, b"$ANSIBLE_VAULT;1.2;AES256;gc-06")
+
+    def test_header_without_vault_id(self):
+        """Without a vault id the format stays at 1.1."""
+        vaulttext = vault_lib.encrypt_bytes("x", b"pw")
+        self.assertEqual(vaulttext.splitlines()[0], b"$ANSIBLE_VAULT;1.1;AES256")
+        self.assertIsNone(vault_lib.parse_envelope(vaulttext)[2])
+
+    def test_fixed_salt_is_deterministic(self):
+        """With a fixed salt the output is stable and wrapped to 80 columns."""
+        first = vault_lib.encrypt_bytes("value", b"pw", "a", salt=self.salt)
+        second = vault_lib.encrypt_bytes("value", b"pw", "a", salt=self.salt)
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith(b"\n"))
+        for line in first.splitlines()[1:]:
+            self.assertLessEqual(len(line), 80)
+
+    def test_wrong_password(self):
+        """Decrypting with the wrong password raises ValueError."""
+        vaulttext = vault_lib.encrypt_bytes("value", b"pw")
+        with self.assertRaises(ValueError):
+            vault_lib.decrypt_bytes(vaulttext, b"other")
+
+    def test_not_encrypted(self):
+        """Plain data is rejected."""
+        self.assertFalse(vault_lib.is_encrypted(b"plain"))
+        with self.assertRaises(ValueError):
+            vault_lib.decrypt_bytes(b"plain", b"pw")
+
+
+class TestAnsibleCompatibility(unittest.TestCase):
+    # written by `ansible-vault encrypt --vault-id gc-06@<file>`
+    ANSIBLE_VAULTTEXT = b"""$ANSIBLE_VAULT;1.2;AES256;gc-06
+38363931646463326535613765663430383665303833336566326230303536386461323138303234
+6235666563396534313638653732346664366464646565370a333932313433633462303461303163
+30316334663437643230393237616261323565316535393762333838396263666230356536663934
+6132663965396363610a626334643363616465383265313532393437333533646637636436333939
+34336162343731623335666436656131653932666139353439643937393930373638
+"""
+
+    def test_fixed_salt_matches_ansible(self):
+        """With the same salt the output is byte-identical to ansible's VaultLib."""
+        salt = b"0123456789abcdef0123456789abcdef"
+        for vault_id in (None, "gc-06"):
+            expected = VaultLib().encrypt(
+                b"top secret", VaultSecret(b"password"), vault_id=vault_id, salt=salt
+            )
+            self.assertEqual(
+                vault_lib.encrypt_bytes("top secret", b"password", vault_id, salt=salt),
+                expected,
+            )
+
+    def test_decrypt_ansible_vault(self):
+        """A file encrypted by ansible-vault decrypts natively."""
+        self.assertEqual(
+            vault_lib.decrypt_bytes(self.ANSIBLE_VAULTTEXT, "fixture-password"),
+            b"db_password: hunter2\n",
+        )
+        self.assertEqual(vault_lib.parse_envelope(self.ANSIBLE_VAULTTEXT)[2], "gc-06")
+
+    def test_ansible_decrypts_native(self):
+        """ansible's VaultLib decrypts what encrypt_bytes writes."""
+        vaulttext = vault_lib.encrypt_bytes("value", b"pw", "gc-06")
+        ansible_vault = VaultLib([("gc-06", VaultSecret(b"pw"))])
+        self.assertEqual(ansible_vault.decrypt(vaulttext), b"value")
+
+
+class TestNativeSecretEncryption(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        psk_file = self.test_dir / "test-host.psk"
+        psk_file.write_text("psk-password\n")
+        self.vault = Vault(
+            dir=self.test_dir.as_posix(),
+            ansible_cfg_path=(self.test_dir / "ansible.cfg").as_posix(),
+            pre_shared_keys=[PreSharedKey(name="test-host", file=psk_file.as_posix())],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @patch("socket.gethostname")
+    def test_create_secret_native(self, mock_gethostname):
+        """Secret.create_secret encrypts in-process with the local vault id."""
+        mock_gethostname.return_value = "test-host"
+        secret_file = self.test_dir / "secret"
+
+        with patch("subprocess.run") as mock_run:
+            Secret.create_secret("s3cret", secret_file.as_posix(), self.vault)
+            mock_run.assert_not_called()
+
+        self.assertEqual(vault_lib.get_vault_id(secret_file), "test-host")
+        self.assertEqual(
+            vault_lib.decrypt_file(secret_file, b"psk-password"), b"s3cret"
+        )
+
+        secret = Secret(
+            name="secret",
+            file=secret_file.as_posix(),
+            owner_type="local",
+            template_name="secret",
+            target_name="secret",
+        )
+        self.assertEqual(secret.decrypt(self.vault), "s3cret")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.utils.jinja import get_environment
+
+
+class TestGetEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.template_dir = self.test_dir / "templates"
+        self.template_dir.mkdir()
+        (self.template_dir / "default.nix.j2").write_text(
+            '{ hostname = "{{ hostname }}"; }'
+        )
+        self.cache_dir = self.test_dir / "cache"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_environment_is_shared(self):
+        """The same directory and options return one environment and template."""
+        env = get_environment(self.template_dir, bytecode_cache_dir=self.cache_dir)
+        self.assertIs(
+            get_environment(
+                self.template_dir.as_posix(), bytecode_cache_dir=self.cache_dir
+            ),
+            env,
+        )
+        self.assertIsNot(
+            get_environment(
+                self.template_dir, bytecode_cache_dir=self.cache_dir, trim_blocks=True
+            ),
+            env,
+        )
+
+        template = env.get_template("default.nix.j2")
+        self.assertIs(env.get_template("default.nix.j2"), template)
+        self.assertEqual(template.render(hostname="h-01"), '{ hostname = "h-01"; }')
+
+    def test_bytecode_cache(self):
+        """Compiled templates are written to the bytecode cache directory."""
+        env = get_environment(
+            self.template_dir,
+            filters={"upper": str.upper},
+            bytecode_cache_dir=self.cache_dir,
+        )
+        env.get_template("default.nix.j2")
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
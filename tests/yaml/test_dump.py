@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.yaml import dump_yaml
+
+
+class TestDumpYaml(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.data = {
+            "subnet": "172.16.255.",
+            "empty": [],
+            "unset": None,
+            "secrets": [
+                {
+                    "name": "secret",
+                    "created": "2024-01-01T00:00:00",
+                    "validity": "P180D",
+                    "nested": {"names": ["a", "b"]},
+                }
+            ],
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_canonical_matches_formatted(self):
+        """The one-pass writer produces the same file as dump + format_yaml."""
+        formatted_file = self.test_dir / "formatted.yml"
+        canonical_file = self.test_dir / "canonical.yml"
+        dump_yaml(self.data, formatted_file)
+        dump_yaml(self.data, canonical_file, format_func=None, canonical=True)
+
+        self.assertEqual(canonical_file.read_text(), formatted_file.read_text())
+
+    def test_canonical_atomic_write(self):
+        """Canonical writes replace the file, keep its mode and leave no temp files."""
+        file = self.test_dir / "vault.yml"
+        file.write_text("old")
+        file.chmod(0o600)
+        lint = MagicMock()
+
+        dump_yaml(self.data, file, format_func=None, lint_func=lint, canonical=True)
+
+        self.assertEqual(file.stat().st_mode & 0o777, 0o600)
+        self.assertEqual([p.name for p in self.test_dir.iterdir()], ["vault.yml"])
+        lint.assert_called_once_with(file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+from pathlib import Path
+import shutil
+import tempfile
+
+from lx_administration.yaml.loader import (
+    load_yaml,
+    load_yaml_files,
+    set_yaml_cache_file,
+)
+
+
+class TestYamlLoader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.cache_file = self.test_dir / "cache" / "yaml.pickle"
+        set_yaml_cache_file(self.cache_file)
+        self.files = []
+        for i in range(3):
+            file = self.test_dir / f"host-{i}.yml"
+            file.write_text(f"name: host-{i}\nroles: [a, b]\n")
+            self.files.append(file)
+
+    def tearDown(self):
+        set_yaml_cache_file(None)
+        shutil.rmtree(self.test_dir)
+
+    def test_load_files_in_order(self):
+        documents = load_yaml_files(self.files)
+        self.assertEqual([d["name"] for d in documents], ["host-0", "host-1", "host-2"])
+        self.assertTrue(self.cache_file.exists())
+
+    def test_persistent_cache(self):
+        """Cached files are not parsed again until mtime or size change."""
+        load_yaml_files(self.files)
+        set_yaml_cache_file(self.cache_file)  # fresh process state
+
+        stat = os.stat(self.files[0])
+        with open(self.files[0], "w") as f:
+            f.write("name: HOST-0\nroles: [a, b]\n")  # same size
+        os.utime(self.files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(load_yaml(self.files[0])["name"], "host-0")
+
+        os.utime(self.files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertEqual(load_yaml(self.files[0])["name"], "HOST-0")
+
+    def test_memory_only_by_default(self):
+        set_yaml_cache_file(None)
+        load_yaml_files(self.files)
+        self.assertFalse(self.cache_file.exists())
+
+    def test_loads_return_copies(self):
+        load_yaml(self.files[1])["roles"].append("c")
+        self.assertEqual(load_yaml(self.files[1])["roles"], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()